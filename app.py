@@ -1,27 +1,35 @@
 """
 株式検索システム - メインアプリケーション
 """
-import os
-import sys
 
-# プロジェクトルートをパスに追加
-from backend.utils.path_utils import setup_project_path
-setup_project_path()
 
-# アプリケーションファクトリーのインポート
-from backend.app_factory import create_app
-from backend.utils.database_utils import init_database
-from config.settings import get_config
+def __getattr__(name: str):
+    """
+    `app` 属性を初回参照時に生成する（PEP 562）
+
+    gunicorn（app:app）などから参照された時点でアプリケーションを作成し、
+    単なるインポートではFlaskやルート定義を読み込まない。
+    """
+    if name == 'app':
+        from backend.app_factory import create_app
+        application = create_app()
+        globals()['app'] = application
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# アプリケーションの作成
-app = create_app()
 
 if __name__ == '__main__':
+    from backend.utils.database_utils import init_database
+    from config.settings import get_config
+    
     # 設定の取得
     config = get_config()
     
     # データベースの初期化
     init_database()
     
+    # アプリケーションの作成
+    app = __getattr__('app')
+    
     # 開発サーバーの起動
     app.run(debug=config.DEBUG, host=config.HOST, port=config.PORT)
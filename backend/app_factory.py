@@ -4,7 +4,8 @@
 import os
 from flask import Flask
 from config.settings import get_config
-from backend.middleware.error_handlers import register_error_handlers
+from backend.utils.logger import start_log_listener
+from backend.utils.json_provider import configure_json_provider
 
 
 def create_app(environment: str = None) -> Flask:
@@ -28,15 +29,26 @@ def create_app(environment: str = None) -> Flask:
                 template_folder=os.path.join(project_root, config.TEMPLATE_FOLDER),
                 static_folder=os.path.join(project_root, config.STATIC_FOLDER))
     
+    # ログ出力をバックグラウンドスレッドで開始
+    start_log_listener()
+    
     # 設定の適用
     app.config['SECRET_KEY'] = config.SECRET_KEY
     app.config['DEBUG'] = config.DEBUG
     
+    # jsonify()のシリアライズをorjsonで行う（未導入時はFlask標準のまま）
+    configure_json_provider(app)
+    
+    # データベース接続プール（モデルと共有し、リクエスト間で接続を再利用）
+    from backend.models.database import db_manager
+    app.extensions['db_pool'] = db_manager.pool
+    
     # ブループリントの登録
     register_blueprints(app, config)
     
     # エラーハンドラーの登録
-    register_error_handlers(app)
+    from backend.middleware.error_handlers import register_error_handlers
+    register_error_handlers(app, config.API_PREFIX)
     
     return app
 
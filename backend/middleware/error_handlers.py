@@ -1,41 +1,89 @@
 """
 エラーハンドラー
 """
-from flask import jsonify, request
+import json
+from flask import current_app, request
 
 
-def register_error_handlers(app):
-    """エラーハンドラーの登録"""
-    
+def _json_error_body(message: str, code: int) -> bytes:
+    """APIエラーレスポンスのJSONボディを生成"""
+    return json.dumps({
+        'success': False,
+        'error': message,
+        'code': code
+    }).encode('utf-8')
+
+
+# エラーレスポンスのボディは固定なので登録時に一度だけシリアライズしておく
+_API_ERROR_BODIES = {
+    404: _json_error_body('エンドポイントが見つかりません', 404),
+    500: _json_error_body('サーバー内部エラーが発生しました', 500),
+    400: _json_error_body('不正なリクエストです', 400),
+}
+
+_PAGE_ERROR_BODIES = {
+    404: "ページが見つかりません",
+    500: "サーバーエラーが発生しました",
+    400: "不正なリクエストです",
+}
+
+
+def _api_error_response(code: int):
+    """事前シリアライズ済みのボディからAPIエラーレスポンスを作成"""
+    return current_app.response_class(_API_ERROR_BODIES[code], status=code,
+                                      mimetype='application/json')
+
+
+def _page_error_response(code: int):
+    """ページ用エラーレスポンスを作成"""
+    return _PAGE_ERROR_BODIES[code], code
+
+
+def register_blueprint_error_handlers(blueprint, as_json: bool) -> None:
+    """
+    ブループリント単位のエラーハンドラーを登録
+
+    ブループリント内のビューで発生したエラーはFlaskのハンドラー表で直接振り分けられるため、
+    パスによる判定が不要になる。
+
+    Args:
+        blueprint: 対象ブループリント（app.register_blueprint前に呼ぶこと）
+        as_json: JSONレスポンスを返すか（Falseの場合はテキスト）
+    """
+    respond = _api_error_response if as_json else _page_error_response
+    for code in (404, 500, 400):
+        blueprint.register_error_handler(code, lambda error, code=code: respond(code))
+
+
+def register_error_handlers(app, api_prefix: str = '/api'):
+    """
+    アプリケーション全体のエラーハンドラーの登録
+
+    どのブループリントにも一致しないURL（未定義ルートの404など）向けのフォールバック。
+
+    Args:
+        app: Flaskアプリケーション
+        api_prefix: APIのURLプレフィックス
+    """
+    api_path_prefix = api_prefix.rstrip('/') + '/'
+
+    def error_response(code: int):
+        """パスに応じてJSONまたはテキストのエラーレスポンスを作成"""
+        if request.path.startswith(api_path_prefix):
+            return _api_error_response(code)
+        return _page_error_response(code)
+
     @app.errorhandler(404)
     def not_found(error):
         """404エラーハンドラー"""
-        if request.path.startswith('/api/'):
-            return jsonify({
-                'success': False,
-                'error': 'エンドポイントが見つかりません',
-                'code': 404
-            }), 404
-        return "ページが見つかりません", 404
-    
+        return error_response(404)
+
     @app.errorhandler(500)
     def internal_error(error):
         """500エラーハンドラー"""
-        if request.path.startswith('/api/'):
-            return jsonify({
-                'success': False,
-                'error': 'サーバー内部エラーが発生しました',
-                'code': 500
-            }), 500
-        return "サーバーエラーが発生しました", 500
-    
+        return error_response(500)
+
     @app.errorhandler(400)
     def bad_request(error):
         """400エラーハンドラー"""
-        if request.path.startswith('/api/'):
-            return jsonify({
-                'success': False,
-                'error': '不正なリクエストです',
-                'code': 400
-            }), 400
-        return "不正なリクエストです", 400
+        return error_response(400)
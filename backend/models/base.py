@@ -1,36 +1,154 @@
 """
 データベースモデル共通基底クラス
 """
+import logging
+import math
 import sqlite3
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Union, Any, Tuple
-from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Union, Any, Tuple
 from backend.utils.logger import get_logger, log_database_operation
+from backend.utils.database_utils import retry_on_busy, register_index, namedtuple_row_factory
+from backend.utils.cache import record_cache, bust_table_cache
+
+_MISSING = object()
+_NUMBER_TYPES = (int, float)
+_checked_plans = set()
+
+# 一括登録後に統計情報を更新する件数の閾値
+ANALYZE_THRESHOLD = 500
+
+
+@lru_cache(maxsize=64)
+def _where_fragment(fields: Tuple[str, ...]) -> str:
+    """条件フィールドの組み合わせごとにWHERE句を生成（結果はキャッシュ）"""
+    if not fields:
+        return ""
+    return " WHERE " + " AND ".join(f"{field} = ?" for field in fields)
+
+
+@lru_cache(maxsize=256)
+def _build_update_sql(table_name: str, fields: Tuple[str, ...],
+                      where_fields: Tuple[str, ...]) -> str:
+    """更新フィールドと条件フィールドの組み合わせごとにUPDATE文を生成（結果はキャッシュ）"""
+    set_clause = ", ".join(f"{field} = ?" for field in fields)
+    return f"UPDATE {table_name} SET {set_clause}{_where_fragment(where_fields)}"
+
+
+@lru_cache(maxsize=64)
+def _build_insert_sql(table_name: str, fields: Tuple[str, ...]) -> str:
+    """作成フィールドの組み合わせごとにINSERT文を生成（結果はキャッシュ）"""
+    placeholders = ", ".join("?" * len(fields))
+    return f"INSERT INTO {table_name} ({', '.join(fields)}) VALUES ({placeholders})"
 
 
 class BaseModel(ABC):
     """データベースモデルの共通基底クラス"""
     
-    def __init__(self, db_manager, table_name: str, unique_fields: List[str]):
+    def __init__(self, db_pool, table_name: str, unique_fields: List[str]):
         """
         初期化
         
         Args:
-            db_manager: データベースマネージャー
+            db_pool: データベース接続プール（ConnectionPool）
             table_name: テーブル名
             unique_fields: 一意性チェック用フィールド
         """
-        self.db = db_manager
+        self.db = db_pool
         self.table_name = table_name
         self.unique_fields = unique_fields
         self.logger = get_logger(f'model.{table_name}')
+        self._db_logger = get_logger('database')
+        self._warned_unbounded = False
+        
+        # 固定SQLは初期化時に一度だけ組み立てる（sqlite3の文キャッシュを有効活用）
+        self._sql_get_by_id = f"SELECT * FROM {table_name} WHERE id = ?"
+        self._sql_delete = f"DELETE FROM {table_name} WHERE id = ?"
+        self._sql_get_all = f"SELECT * FROM {table_name} ORDER BY id"
+        self._sql_get_all_paged = self._sql_get_all + " LIMIT ? OFFSET ?"
+        self._unique_where = " WHERE " + " AND ".join(f"{f} = ?" for f in unique_fields)
+        self._find_conflict_sql = f"SELECT * FROM {table_name}{self._unique_where} LIMIT 1"
+        
+        # 一意キーの複合インデックスを init_database() で作成するよう登録
+        if unique_fields:
+            register_index(table_name, unique_fields)
     
     def _log_operation(self, operation: str, record_id: Optional[int] = None, 
                       execution_time: float = None, error: Optional[str] = None):
         """操作ログを記録"""
         log_database_operation(operation, self.table_name, record_id, execution_time, error)
     
-    def get_by_id(self, record_id: int) -> Optional[sqlite3.Row]:
+    @staticmethod
+    def _read(conn: sqlite3.Connection, query: str, params: tuple = ()) -> sqlite3.Cursor:
+        """
+        行をnamedtupleで返すカーソルでクエリを実行
+        
+        Args:
+            conn: 使用する接続
+            query: SQLクエリ
+            params: パラメータ
+            
+        Returns:
+            sqlite3.Cursor: 実行済みカーソル
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = namedtuple_row_factory
+        return cursor.execute(query, params)
+    
+    def _check_query_plan(self, conn: sqlite3.Connection, query: str, params: tuple) -> None:
+        """
+        DEBUG時にクエリプランを確認し、全件スキャンなら警告（同一SQLにつき1回のみ）
+        
+        Args:
+            conn: 使用中の接続
+            query: SQLクエリ
+            params: パラメータ
+        """
+        if query in _checked_plans or not self._db_logger.isEnabledFor(logging.DEBUG):
+            return
+        _checked_plans.add(query)
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall():
+            detail = row[-1]
+            if detail.startswith('SCAN') and 'INDEX' not in detail:
+                self.logger.warning(f"インデックスが使用されていません: {detail} ({query})")
+    
+    def _log_success(self, operation: str, start: float, record_id: Optional[int] = None) -> None:
+        """
+        正常終了した操作を記録（DEBUGレベル無効時は計測・出力を省略）
+        
+        Args:
+            operation: 操作種別
+            start: 開始時刻（time.perf_counter()の値）
+            record_id: 対象レコードID
+        """
+        if not self._db_logger.isEnabledFor(logging.DEBUG):
+            return
+        self._log_operation(operation, record_id, time.perf_counter() - start)
+    
+    def _execute_write(self, query: str, params: tuple = ()) -> int:
+        """
+        書き込みクエリを実行（ロック競合時は再試行）
+        
+        Args:
+            query: SQLクエリ
+            params: パラメータ
+            
+        Returns:
+            int: 影響を受けた行数
+        """
+        def run() -> int:
+            with self.db.acquire_write() as conn:
+                return conn.execute(query, params).rowcount
+        
+        return retry_on_busy(run)
+    
+    def _invalidate_cache(self) -> None:
+        """このテーブルのレコードキャッシュを破棄"""
+        bust_table_cache(self.table_name)
+    
+    def get_by_id(self, record_id: int) -> Optional[tuple]:
         """
         IDで単一レコードを取得
         
@@ -38,25 +156,31 @@ class BaseModel(ABC):
             record_id: レコードID
             
         Returns:
-            Optional[sqlite3.Row]: 見つかったレコードまたはNone
+            Optional[tuple]: 見つかったレコード（namedtuple）またはNone
         """
-        start_time = datetime.now()
+        cache_key = (self.table_name, record_id)
+        cached = record_cache.get(cache_key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        
+        start = time.perf_counter()
         
         try:
-            query = f"SELECT * FROM {self.table_name} WHERE id = ?"
-            results = self.db.execute_query(query, (record_id,))
+            with self.db.acquire_read() as conn:
+                results = self._read(conn, self._sql_get_by_id, (record_id,)).fetchall()
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._log_operation("SELECT", record_id, execution_time)
+            self._log_success("SELECT", start, record_id)
             
-            return results[0] if results else None
+            record = results[0] if results else None
+            record_cache.set(cache_key, record)
+            return record
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("SELECT", record_id, execution_time, str(e))
             raise
     
-    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> List[sqlite3.Row]:
+    def get_all(self, limit: Optional[int] = None, offset: int = 0) -> List[tuple]:
         """
         全レコードを取得
         
@@ -65,28 +189,55 @@ class BaseModel(ABC):
             offset: オフセット
             
         Returns:
-            List[sqlite3.Row]: 取得されたレコードリスト
+            List[tuple]: 取得されたレコード（namedtuple）のリスト
         """
-        start_time = datetime.now()
+        start = time.perf_counter()
         
         try:
-            query = f"SELECT * FROM {self.table_name} ORDER BY id"
-            
-            if limit:
-                query += f" LIMIT {limit} OFFSET {offset}"
+            with self.db.acquire_read() as conn:
+                if limit:
+                    results = self._read(conn, self._sql_get_all_paged, (limit, offset)).fetchall()
+                else:
+                    results = self._read(conn, self._sql_get_all).fetchall()
             
-            results = self.db.execute_query(query)
+            if not limit and not self._warned_unbounded:
+                # 件数制限なしの全件取得は大きなテーブルでメモリを圧迫するため一度だけ警告
+                self._warned_unbounded = True
+                self.logger.warning(f"{self.table_name}: limitなしのget_allです。iter_all()の利用を検討してください")
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._log_operation("SELECT_ALL", execution_time=execution_time)
+            self._log_success("SELECT_ALL", start)
             
             return results
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("SELECT_ALL", execution_time=execution_time, error=str(e))
             raise
     
+    def iter_all(self, chunk_size: int = 500) -> Iterator[tuple]:
+        """
+        全レコードを逐次取得（全件をリストに展開しない）
+        
+        読み取り接続はイテレーションが終わるまで占有されるため、最後まで消費するか
+        close() すること。
+        
+        Args:
+            chunk_size: 1回に読み込む件数
+            
+        Yields:
+            tuple: レコード（namedtuple）
+        """
+        with self.db.acquire_read() as conn:
+            cursor = self._read(conn, self._sql_get_all)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+    
     def delete(self, record_id: int) -> int:
         """
         レコードを削除
@@ -97,19 +248,18 @@ class BaseModel(ABC):
         Returns:
             int: 削除された行数
         """
-        start_time = datetime.now()
+        start = time.perf_counter()
         
         try:
-            query = f"DELETE FROM {self.table_name} WHERE id = ?"
-            rows_affected = self.db.execute_update(query, (record_id,))
+            rows_affected = self._execute_write(self._sql_delete, (record_id,))
+            self._invalidate_cache()
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._log_operation("DELETE", record_id, execution_time)
+            self._log_success("DELETE", start, record_id)
             
             return rows_affected
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("DELETE", record_id, execution_time, str(e))
             raise
     
@@ -126,18 +276,11 @@ class BaseModel(ABC):
         if not conditions:
             return "", ()
         
-        where_parts = []
-        params = []
-        
-        for field, value in conditions.items():
-            if value is not None:
-                where_parts.append(f"{field} = ?")
-                params.append(value)
-        
-        where_clause = " WHERE " + " AND ".join(where_parts) if where_parts else ""
-        return where_clause, tuple(params)
+        fields = tuple(field for field, value in conditions.items() if value is not None)
+        params = tuple(conditions[field] for field in fields)
+        return _where_fragment(fields), params
     
-    def find_by_conditions(self, conditions: Dict[str, Any]) -> List[sqlite3.Row]:
+    def find_by_conditions(self, conditions: Dict[str, Any]) -> List[tuple]:
         """
         条件でレコードを検索
         
@@ -145,27 +288,54 @@ class BaseModel(ABC):
             conditions: 検索条件
             
         Returns:
-            List[sqlite3.Row]: 見つかったレコードリスト
+            List[tuple]: 見つかったレコードリスト
         """
-        start_time = datetime.now()
+        # トランザクション中は最新の状態を読むためキャッシュを使わない
+        use_cache = not self.db.in_transaction()
+        cache_key = (self.table_name, tuple(sorted(conditions.items())))
+        if use_cache:
+            cached = record_cache.get(cache_key, _MISSING)
+            if cached is not _MISSING:
+                return list(cached)
+        
+        start = time.perf_counter()
         
         try:
             where_clause, params = self._build_where_clause(conditions)
             query = f"SELECT * FROM {self.table_name}{where_clause} ORDER BY id"
             
-            results = self.db.execute_query(query, params)
+            with self.db.acquire_read() as conn:
+                self._check_query_plan(conn, query, params)
+                results = self._read(conn, query, params).fetchall()
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._log_operation("SELECT_BY_CONDITIONS", execution_time=execution_time)
+            self._log_success("SELECT_BY_CONDITIONS", start)
             
+            if use_cache:
+                record_cache.set(cache_key, tuple(results))
             return results
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("SELECT_BY_CONDITIONS", execution_time=execution_time, error=str(e))
             raise
     
-    def get_conflicting_record(self, unique_data: Dict[str, Any]) -> Optional[sqlite3.Row]:
+    def exists_by_conditions(self, conditions: Dict[str, Any]) -> bool:
+        """
+        条件に一致するレコードが存在するかを確認（行データは取得しない）
+        
+        Args:
+            conditions: 検索条件
+            
+        Returns:
+            bool: 存在する場合True
+        """
+        where_clause, params = self._build_where_clause(conditions)
+        query = f"SELECT 1 FROM {self.table_name}{where_clause} LIMIT 1"
+        
+        with self.db.acquire_read() as conn:
+            return conn.execute(query, params).fetchone() is not None
+    
+    def get_conflicting_record(self, unique_data: Dict[str, Any]) -> Optional[tuple]:
         """
         一意制約に違反するレコードを取得
         
@@ -173,11 +343,18 @@ class BaseModel(ABC):
             unique_data: 一意性チェック用データ
             
         Returns:
-            Optional[sqlite3.Row]: 競合するレコードまたはNone
+            Optional[tuple]: 競合するレコードまたはNone
         """
-        conditions = {field: unique_data.get(field) for field in self.unique_fields}
-        results = self.find_by_conditions(conditions)
-        return results[0] if results else None
+        params = tuple(unique_data.get(field) for field in self.unique_fields)
+        if None in params:
+            # None値の条件は無視する仕様のため汎用検索にフォールバック
+            conditions = dict(zip(self.unique_fields, params))
+            results = self.find_by_conditions(conditions)
+            return results[0] if results else None
+        
+        with self.db.acquire_read() as conn:
+            self._check_query_plan(conn, self._find_conflict_sql, params)
+            return self._read(conn, self._find_conflict_sql, params).fetchone()
     
     def create_or_update_generic(self, unique_data: Dict[str, Any], 
                                update_data: Dict[str, Any]) -> Dict[str, Union[int, str]]:
@@ -191,43 +368,50 @@ class BaseModel(ABC):
         Returns:
             Dict[str, Union[int, str]]: 処理結果
         """
-        start_time = datetime.now()
+        start = time.perf_counter()
         
         try:
-            # 既存レコードの確認
-            existing = self.get_conflicting_record(unique_data)
+            # 競合確認と新規作成を同一トランザクションで実行
+            with self.db.write_transaction():
+                # 既存レコードの確認（存在する場合のみ行全体を取得）
+                conditions = {field: unique_data.get(field) for field in self.unique_fields}
+                existing = None
+                if self.exists_by_conditions(conditions):
+                    existing = self.get_conflicting_record(unique_data)
+                
+                if not existing:
+                    # 新規作成
+                    all_data = {**unique_data, **update_data}
+                    new_id = self._create_record(all_data)
             
             if existing:
-                # データ比較
-                has_difference = self._has_data_difference(existing, update_data)
+                # データ比較（辞書変換は1回だけ行い警告レスポンスでも再利用）
+                existing_dict = existing._asdict()
+                has_difference = self._has_data_difference_dict(existing_dict, update_data)
                 
                 if has_difference:
-                    execution_time = (datetime.now() - start_time).total_seconds()
-                    self._log_operation("CHECK_CONFLICT", existing['id'], execution_time)
+                    self._log_success("CHECK_CONFLICT", start, existing.id)
                     
                     return {
-                        'id': existing['id'],
+                        'id': existing.id,
                         'status': 'warning',
                         'message': f'競合するデータが既に存在します。',
-                        'existing_data': dict(existing),
+                        'existing_data': existing_dict,
                         'new_data': update_data
                     }
                 else:
-                    execution_time = (datetime.now() - start_time).total_seconds()
-                    self._log_operation("NO_CHANGE", existing['id'], execution_time)
+                    self._log_success("NO_CHANGE", start, existing.id)
                     
                     return {
-                        'id': existing['id'],
+                        'id': existing.id,
                         'status': 'unchanged',
                         'message': '同じデータが既に存在します'
                     }
             else:
-                # 新規作成
-                all_data = {**unique_data, **update_data}
-                new_id = self._create_record(all_data)
+                # コミット後にキャッシュを破棄
+                self._invalidate_cache()
                 
-                execution_time = (datetime.now() - start_time).total_seconds()
-                self._log_operation("INSERT", new_id, execution_time)
+                self._log_success("INSERT", start, new_id)
                 
                 return {
                     'id': new_id,
@@ -236,10 +420,148 @@ class BaseModel(ABC):
                 }
                 
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("CREATE_OR_UPDATE", execution_time=execution_time, error=str(e))
             raise
     
+    def _fetch_existing_by_keys(self, conn: sqlite3.Connection,
+                                keys: List[tuple]) -> Dict[tuple, tuple]:
+        """
+        一意キーの組み合わせに一致する既存レコードをまとめて取得
+        
+        Args:
+            conn: 使用する接続
+            keys: 一意キー値のタプルのリスト
+            
+        Returns:
+            Dict[tuple, tuple]: 一意キー → 既存レコード
+        """
+        existing = {}
+        if not keys:
+            return existing
+        
+        field_count = len(self.unique_fields)
+        columns = ", ".join(self.unique_fields)
+        placeholder = "(" + ", ".join("?" * field_count) + ")"
+        # SQLiteのバインド変数上限を超えないよう分割して問い合わせる
+        chunk_size = max(1, 999 // field_count)
+        
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            query = (f"SELECT * FROM {self.table_name} WHERE ({columns}) IN "
+                     f"(VALUES {', '.join([placeholder] * len(chunk))})")
+            params = tuple(value for key in chunk for value in key)
+            for row in self._read(conn, query, params).fetchall():
+                existing[self._normalize_key(tuple(getattr(row, f) for f in self.unique_fields))] = row
+        
+        return existing
+    
+    @staticmethod
+    def _normalize_key(values: tuple) -> tuple:
+        """一意キー値を比較用に正規化（日付型はISO文字列に揃える）"""
+        return tuple(v.isoformat() if hasattr(v, 'isoformat') else v for v in values)
+    
+    def bulk_create_or_update(self, items: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+                              overwrite: bool = False) -> List[Dict[str, Any]]:
+        """
+        複数レコードの一括作成または更新処理
+        
+        既存レコードの確認を1回のSELECTで行い、新規分はexecutemanyでまとめて挿入する。
+        
+        Args:
+            items: (一意性チェック用データ, 更新用データ) のリスト
+            overwrite: 差異がある既存レコードを上書きするか（Falseの場合は警告を返す）
+            
+        Returns:
+            List[Dict[str, Any]]: itemsと同順の処理結果
+        """
+        start = time.perf_counter()
+        
+        try:
+            keys = [self._normalize_key(tuple(unique_data.get(f) for f in self.unique_fields))
+                    for unique_data, _ in items]
+            create_fields = self._get_create_fields()
+            insert_sql = self._get_insert_sql()
+            unique_fields = tuple(self.unique_fields)
+            
+            results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+            new_rows: Dict[tuple, tuple] = {}
+            new_indexes: Dict[tuple, List[int]] = {}
+            update_groups: Dict[tuple, List[tuple]] = {}
+            
+            def run() -> None:
+                new_rows.clear()
+                new_indexes.clear()
+                update_groups.clear()
+                with self.db.write_transaction() as conn:
+                    existing_map = self._fetch_existing_by_keys(conn, list(dict.fromkeys(keys)))
+                    
+                    for index, ((unique_data, update_data), key) in enumerate(zip(items, keys)):
+                        existing = existing_map.get(key)
+                        existing_dict = existing._asdict() if existing is not None else None
+                        if existing is None:
+                            # 同一バッチ内で重複したキーは後勝ち
+                            all_data = {**unique_data, **update_data}
+                            new_rows[key] = tuple(all_data.get(f) for f in create_fields)
+                            new_indexes.setdefault(key, []).append(index)
+                        elif not self._has_data_difference_dict(existing_dict, update_data):
+                            results[index] = {
+                                'id': existing.id,
+                                'status': 'unchanged',
+                                'message': '同じデータが既に存在します'
+                            }
+                        elif overwrite:
+                            fields = tuple(update_data.keys())
+                            update_groups.setdefault(fields, []).append(
+                                tuple(update_data.values()) + tuple(unique_data.get(f) for f in unique_fields))
+                            results[index] = {
+                                'id': existing.id,
+                                'status': 'updated',
+                                'message': '既存データを更新しました'
+                            }
+                        else:
+                            results[index] = {
+                                'id': existing.id,
+                                'status': 'warning',
+                                'message': '競合するデータが既に存在します。',
+                                'existing_data': existing_dict,
+                                'new_data': update_data
+                            }
+                    
+                    if new_rows:
+                        conn.executemany(insert_sql, list(new_rows.values()))
+                        if len(new_rows) >= ANALYZE_THRESHOLD:
+                            # 大量登録後はプランナーの統計情報を更新
+                            conn.execute(f"ANALYZE {self.table_name}")
+                    for fields, rows in update_groups.items():
+                        conn.executemany(
+                            _build_update_sql(self.table_name, fields, unique_fields), rows)
+                    
+                    # 新規作成分のIDを取得
+                    created = self._fetch_existing_by_keys(conn, list(new_rows.keys()))
+                
+                for key, indexes in new_indexes.items():
+                    row = created.get(key)
+                    for index in indexes:
+                        results[index] = {
+                            'id': row.id if row else None,
+                            'status': 'created',
+                            'message': '新規データを作成しました'
+                        }
+            
+            retry_on_busy(run)
+            if new_rows or update_groups:
+                self._invalidate_cache()
+            
+            self._log_success("BULK_CREATE_OR_UPDATE", start)
+            
+            return results
+            
+        except Exception as e:
+            execution_time = time.perf_counter() - start
+            self._log_operation("BULK_CREATE_OR_UPDATE", execution_time=execution_time, error=str(e))
+            raise
+    
     def force_update_generic(self, unique_data: Dict[str, Any], 
                            update_data: Dict[str, Any]) -> int:
         """
@@ -252,69 +574,93 @@ class BaseModel(ABC):
         Returns:
             int: 更新された行数
         """
-        start_time = datetime.now()
+        start = time.perf_counter()
         
         try:
-            where_clause, where_params = self._build_where_clause(unique_data)
-            
-            if not where_clause:
+            where_fields = tuple(sorted(f for f, v in unique_data.items() if v is not None))
+            if not where_fields:
                 raise ValueError("更新条件が指定されていません")
             
-            # SET句の構築
-            set_parts = []
-            set_params = []
-            
-            for field, value in update_data.items():
-                set_parts.append(f"{field} = ?")
-                set_params.append(value)
-            
-            if not set_parts:
+            fields = tuple(sorted(update_data))
+            if not fields:
                 raise ValueError("更新データが指定されていません")
             
-            # UPDATE文の実行
-            query = f"UPDATE {self.table_name} SET {', '.join(set_parts)}{where_clause}"
-            params = tuple(set_params + list(where_params))
+            # UPDATE文の実行（同じ形の更新はキャッシュ済みのSQLを再利用）
+            query = _build_update_sql(self.table_name, fields, where_fields)
+            params = (tuple(update_data[f] for f in fields)
+                      + tuple(unique_data[f] for f in where_fields))
+            
+            def run() -> int:
+                with self.db.write_transaction() as conn:
+                    return conn.execute(query, params).rowcount
             
-            rows_affected = self.db.execute_update(query, params)
+            rows_affected = retry_on_busy(run)
+            self._invalidate_cache()
             
-            execution_time = (datetime.now() - start_time).total_seconds()
-            self._log_operation("UPDATE", execution_time=execution_time)
+            self._log_success("UPDATE", start)
             
             return rows_affected
             
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
+            execution_time = time.perf_counter() - start
             self._log_operation("UPDATE", execution_time=execution_time, error=str(e))
             raise
     
-    def _has_data_difference(self, existing_record: sqlite3.Row, 
+    def _has_data_difference(self, existing_record: tuple, 
                            new_data: Dict[str, Any], tolerance: float = 0.0001) -> bool:
         """
         既存レコードと新データの差異をチェック
         
         Args:
-            existing_record: 既存レコード
+            existing_record: 既存レコード（namedtuple）
             new_data: 新しいデータ
             tolerance: 数値比較の許容誤差
             
         Returns:
             bool: 差異がある場合True
         """
-        for field, new_value in new_data.items():
-            if field not in existing_record.keys():
-                continue
-            
-            existing_value = existing_record[field]
+        existing_values = {}
+        for field in new_data:
+            value = getattr(existing_record, field, _MISSING)
+            if value is not _MISSING:
+                existing_values[field] = value
+        return self._has_data_difference_dict(existing_values, new_data, tolerance)
+    
+    def _has_data_difference_dict(self, existing_dict: Dict[str, Any],
+                                  new_data: Dict[str, Any], tolerance: float = 0.0001) -> bool:
+        """
+        既存レコード（辞書変換済み）と新データの差異をチェック
+        
+        Args:
+            existing_dict: dict()変換済みの既存レコード
+            new_data: 新しいデータ
+            tolerance: 数値比較の許容誤差
             
-            # None値の比較
-            if existing_value is None and new_value is None:
-                continue
+        Returns:
+            bool: 差異がある場合True
+        """
+        shared = [field for field in new_data if field in existing_dict]
+        if not shared:
+            return False
+        
+        # 共通フィールドの値をまとめて取り出して1回のループで比較
+        getter = itemgetter(*shared)
+        existing_values = getter(existing_dict)
+        new_values = getter(new_data)
+        if len(shared) == 1:
+            existing_values, new_values = (existing_values,), (new_values,)
+        
+        for existing_value, new_value in zip(existing_values, new_values):
             if existing_value is None or new_value is None:
-                return True
-            
-            # 数値の比較（許容誤差あり）
-            if isinstance(existing_value, (int, float)) and isinstance(new_value, (int, float)):
-                if abs(float(existing_value) - float(new_value)) > tolerance:
+                # None値の比較
+                if existing_value is not new_value:
+                    return True
+            elif isinstance(existing_value, _NUMBER_TYPES) and isinstance(new_value, _NUMBER_TYPES):
+                # 数値の比較（許容誤差あり）
+                if not math.isclose(existing_value, new_value, rel_tol=0.0, abs_tol=tolerance):
+                    return True
+            elif type(existing_value) is str and type(new_value) is str:
+                if existing_value != new_value:
                     return True
             # 文字列の比較
             elif str(existing_value) != str(new_value):
@@ -322,10 +668,19 @@ class BaseModel(ABC):
         
         return False
     
+    def _get_insert_sql(self) -> str:
+        """
+        _get_create_fields() に対応するINSERT文を取得（_create_record実装から利用可能）
+        
+        Returns:
+            str: キャッシュ済みのINSERT文
+        """
+        return _build_insert_sql(self.table_name, tuple(self._get_create_fields()))
+    
     @abstractmethod
     def _create_record(self, data: Dict[str, Any]) -> int:
         """
-        レコード作成の具象実装
+        レコード作成の具象実装（self.db.acquire_write() の接続を使用すること）
         
         Args:
             data: 作成するデータ
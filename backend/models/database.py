@@ -1,53 +1,567 @@
 import sqlite3
 import os
-import sys
-from datetime import datetime
-from typing import List, Dict, Optional, Union
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import product
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Union
+from backend.utils.database_utils import ConnectionPool, CONNECTION_PRAGMAS
+from backend.utils.cache import record_cache, bust_table_cache
+from config.settings import get_config
 
-# プロジェクトルートをパスに追加（相対インポート回避）
-from backend.utils.path_utils import setup_project_path
-setup_project_path()
+# (company_id, 日付) で検索・並び替えする参照系クエリ用のインデックス
+# 既存データベースにも反映されるよう起動時に作成する（schema.sqlと同じ定義）
+LOOKUP_INDEX_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_stock_prices_company_date_covering "
+    "ON stock_prices(company_id, price_date DESC, price, volume)",
+    # カバリングインデックスに包含されるため不要になった旧インデックス
+    "DROP INDEX IF EXISTS idx_stock_prices_company_date",
+    # UNIQUE制約の自動インデックスと同じ列の重複インデックス（書き込みのたびに二重に更新される）
+    # 財務指標・テクニカル指標の最新行の取得（ORDER BY 日付 DESC LIMIT 1）も
+    # UNIQUE(company_id, 日付) の自動インデックスを逆順に走査して一時B-treeなしで処理される
+    "DROP INDEX IF EXISTS idx_price_statistics_company_period",
+    "DROP INDEX IF EXISTS idx_companies_symbol",
+    "DROP INDEX IF EXISTS idx_financial_metrics_company_date",
+    "DROP INDEX IF EXISTS idx_technical_indicators_company_date",
+)
+
+# 企業検索用の全文検索インデックス（FTS5・trigramで日本語の部分一致に対応）
+# companiesを外部コンテンツとし、トリガーで同期する
+COMPANY_FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS companies_fts USING fts5("
+    "symbol, name, sector, content='companies', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_insert AFTER INSERT ON companies BEGIN "
+    "INSERT INTO companies_fts(rowid, symbol, name, sector) "
+    "VALUES (new.id, new.symbol, new.name, new.sector); END",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_delete AFTER DELETE ON companies BEGIN "
+    "INSERT INTO companies_fts(companies_fts, rowid, symbol, name, sector) "
+    "VALUES ('delete', old.id, old.symbol, old.name, old.sector); END",
+    "CREATE TRIGGER IF NOT EXISTS companies_fts_update AFTER UPDATE ON companies BEGIN "
+    "INSERT INTO companies_fts(companies_fts, rowid, symbol, name, sector) "
+    "VALUES ('delete', old.id, old.symbol, old.name, old.sector); "
+    "INSERT INTO companies_fts(rowid, symbol, name, sector) "
+    "VALUES (new.id, new.symbol, new.name, new.sector); END",
+    # 既存の企業情報をインデックスに取り込む
+    "INSERT INTO companies_fts(companies_fts) VALUES ('rebuild')",
+)
+
+# 企業ごとの最新株価・最新財務指標（企業検索で結合なしに参照するための非正規化テーブル）
+# 元テーブルのトリガーで同期するため、書き込み側のコードは変更不要
+LATEST_PRICE_COLUMNS = ('price', 'price_date', 'volume')
+LATEST_METRICS_COLUMNS = ('pbr', 'per', 'equity_ratio', 'roe', 'roa', 'report_date')
+
+
+def _latest_sync_triggers(source_table: str, date_column: str, columns: Sequence[str]) -> tuple:
+    """
+    元テーブルの追加・更新・削除を company_latest に反映するトリガーを生成
+    
+    追加時は日付が最新以上の場合のみ上書きし、更新・削除時は対象企業の最新行を取り直す。
+    UPSERT（ON CONFLICT DO UPDATE）の更新で起動した場合は外側の文の競合処理が優先され
+    INSERT OR IGNORE が無視されるため、更新時の行作成は NOT EXISTS で判定する。
+    
+    Args:
+        source_table: 元テーブル名
+        date_column: 最新を判定する日付列（columns に含まれること）
+        columns: company_latest に写す列（元テーブルと同名）
+        
+    Returns:
+        tuple: CREATE TRIGGER 文
+    """
+    column_list = ', '.join(columns)
+    new_values = ', '.join(f"NEW.{column}" for column in columns)
+    assignments = ', '.join(f"{column} = excluded.{column}" for column in columns)
+    latest_row = (f"SELECT {column_list} FROM {source_table} "
+                  f"WHERE company_id = company_latest.company_id ORDER BY {date_column} DESC LIMIT 1")
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS company_latest_{source_table}_insert "
+        f"AFTER INSERT ON {source_table} BEGIN "
+        f"INSERT INTO company_latest (company_id, {column_list}) VALUES (NEW.company_id, {new_values}) "
+        f"ON CONFLICT(company_id) DO UPDATE SET {assignments} "
+        f"WHERE company_latest.{date_column} IS NULL "
+        f"OR excluded.{date_column} >= company_latest.{date_column}; END",
+        f"CREATE TRIGGER IF NOT EXISTS company_latest_{source_table}_update "
+        f"AFTER UPDATE ON {source_table} BEGIN "
+        f"INSERT INTO company_latest (company_id) SELECT NEW.company_id "
+        f"WHERE NOT EXISTS (SELECT 1 FROM company_latest WHERE company_id = NEW.company_id); "
+        f"UPDATE company_latest SET ({column_list}) = ({latest_row}) "
+        f"WHERE company_id IN (OLD.company_id, NEW.company_id); END",
+        f"CREATE TRIGGER IF NOT EXISTS company_latest_{source_table}_delete "
+        f"AFTER DELETE ON {source_table} BEGIN "
+        f"UPDATE company_latest SET ({column_list}) = ({latest_row}) "
+        f"WHERE company_id = OLD.company_id; END",
+    )
+
+
+def _latest_rows_query(source_table: str, date_column: str, columns: Sequence[str]) -> str:
+    """企業ごとの最新行（rn = 1）を取得するサブクエリ"""
+    return (f"SELECT company_id, {', '.join(columns)}, "
+            f"ROW_NUMBER() OVER (PARTITION BY company_id ORDER BY {date_column} DESC) AS rn "
+            f"FROM {source_table}")
+
+
+COMPANY_LATEST_STATEMENTS = (
+    "CREATE TABLE IF NOT EXISTS company_latest ("
+    "company_id INTEGER PRIMARY KEY, "
+    "price DECIMAL(10,2), price_date DATE, volume INTEGER, "
+    "pbr DECIMAL(10,4), per DECIMAL(10,4), equity_ratio DECIMAL(10,4), "
+    "roe DECIMAL(10,4), roa DECIMAL(10,4), report_date DATE)",
+    *_latest_sync_triggers('stock_prices', 'price_date', LATEST_PRICE_COLUMNS),
+    *_latest_sync_triggers('financial_metrics', 'report_date', LATEST_METRICS_COLUMNS),
+    "CREATE TRIGGER IF NOT EXISTS company_latest_companies_delete AFTER DELETE ON companies BEGIN "
+    "DELETE FROM company_latest WHERE company_id = OLD.id; END",
+    # 既存データから初期値を作成
+    "INSERT OR REPLACE INTO company_latest "
+    f"(company_id, {', '.join(LATEST_PRICE_COLUMNS + LATEST_METRICS_COLUMNS)}) "
+    "SELECT c.id, "
+    f"{', '.join('p.' + column for column in LATEST_PRICE_COLUMNS)}, "
+    f"{', '.join('m.' + column for column in LATEST_METRICS_COLUMNS)} "
+    "FROM companies c "
+    f"LEFT JOIN ({_latest_rows_query('stock_prices', 'price_date', LATEST_PRICE_COLUMNS)}) p "
+    "ON p.company_id = c.id AND p.rn = 1 "
+    f"LEFT JOIN ({_latest_rows_query('financial_metrics', 'report_date', LATEST_METRICS_COLUMNS)}) m "
+    "ON m.company_id = c.id AND m.rn = 1",
+)
 
 class DatabaseManager:
     """データベース管理クラス"""
     
     def __init__(self, db_path: str = 'database/kabu_system.db'):
         self.db_path = db_path
+        self._pool: Optional[ConnectionPool] = None
+        self._pool_lock = threading.Lock()
+        # ファイル作成やPRAGMA設定は初回接続時まで遅延する（インポート時にI/Oを発生させない）
+        self._initialized = False
+        self.company_fts_enabled = False
+    
+    def _initialize(self):
+        """データベースファイルの準備とPRAGMA・インデックスの設定（初回接続時に一度だけ）"""
         self.ensure_database_exists()
+        self.configure_database()
+        self.ensure_lookup_indexes()
+        self.company_fts_enabled = self.ensure_company_fts()
+        self.ensure_company_latest()
+        self._initialized = True
     
     def ensure_database_exists(self):
         """データベースファイルとディレクトリの存在確認"""
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+    
+    @contextmanager
+    def _setup_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        初期設定用の一時接続を取得
+        
+        プールの接続と同じく isolation_level=None（自動コミット）で開き、
+        複数文をまとめる場合は _execute_statements で明示的にトランザクションを張る。
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _execute_statements(conn: sqlite3.Connection, statements: Iterable[str]):
+        """複数のSQL文を BEGIN IMMEDIATE 〜 COMMIT の1トランザクションで実行"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in statements:
+                conn.execute(statement)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+    
+    @staticmethod
+    def _table_names(conn: sqlite3.Connection) -> set:
+        """作成済みのテーブル名を取得"""
+        return {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+    
+    def configure_database(self):
+        """WALモードなどデータベース単位のPRAGMAを一度だけ設定"""
+        if self.db_path.endswith(':memory:'):
+            return
+        with self._setup_connection() as conn:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+    
+    def ensure_lookup_indexes(self):
+        """参照系クエリ用の複合インデックスを作成（テーブル未作成の場合はスキップ）"""
+        if self.db_path.endswith(':memory:'):
+            return
+        with self._setup_connection() as conn:
+            if not {'stock_prices', 'financial_metrics', 'technical_indicators'} <= self._table_names(conn):
+                # 未初期化のデータベースはinit_database（schema.sql）で作成される
+                return
+            self._execute_statements(conn, LOOKUP_INDEX_STATEMENTS)
+    
+    def ensure_company_fts(self) -> bool:
+        """
+        企業検索用の全文検索テーブルを作成（初回のみ既存データを取り込む）
+        
+        Returns:
+            bool: 全文検索が利用可能か（FTS5非対応のSQLiteやテーブル未作成の場合はFalse）
+        """
+        if self.db_path.endswith(':memory:'):
+            return False
+        with self._setup_connection() as conn:
+            existing = self._table_names(conn)
+            if 'companies' not in existing:
+                return False
+            if 'companies_fts' in existing:
+                return True
+            try:
+                self._execute_statements(conn, COMPANY_FTS_STATEMENTS)
+            except sqlite3.OperationalError:
+                # FTS5（trigram）非対応の場合はLIKE検索のまま運用する
+                return False
+            return True
+    
+    def ensure_company_latest(self):
+        """
+        企業ごとの最新株価・財務指標テーブルと同期トリガーを作成（初回のみ既存データを取り込む）
+        
+        企業検索で株価・財務指標を企業ごとに集計せず1行の結合で参照するために使う。
+        """
+        if self.db_path.endswith(':memory:'):
+            return
+        with self._setup_connection() as conn:
+            existing = self._table_names(conn)
+            if not {'companies', 'stock_prices', 'financial_metrics'} <= existing:
+                return
+            if 'company_latest' in existing:
+                # 旧定義の更新トリガー（INSERT OR IGNORE）はUPSERTの更新で失敗するため作り直す
+                outdated = [row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+                    "AND name LIKE 'company_latest_%_update' AND sql LIKE '%INSERT OR IGNORE%'"
+                )]
+                if outdated:
+                    self._execute_statements(conn, [f"DROP TRIGGER {name}" for name in outdated] + [
+                        statement for statement in COMPANY_LATEST_STATEMENTS if statement.startswith('CREATE TRIGGER')
+                    ])
+                return
+            self._execute_statements(conn, COMPANY_LATEST_STATEMENTS)
+    
+    def supports_company_fts(self) -> bool:
+        """企業検索で全文検索テーブルを使えるか"""
+        self.pool  # 初回接続時の初期化（全文検索テーブルの確認）を済ませる
+        return self.company_fts_enabled
     
-    def get_connection(self):
-        """データベース接続を取得"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    @property
+    def pool(self) -> ConnectionPool:
+        """接続プール（初回アクセス時に作成し、以降は全クエリで再利用）"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    if not self._initialized:
+                        self._initialize()
+                    self._pool = ConnectionPool(self.db_path)
+        return self._pool
     
-    def execute_query(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
+    @contextmanager
+    def get_connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        書き込み用の接続をトランザクション付きで取得
+        
+        ブロックを正常に抜けるとCOMMIT、例外時はROLLBACKされる。
+        """
+        with self.pool.write_transaction() as conn:
+            yield conn
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        複数の操作を1つのトランザクション（BEGIN IMMEDIATE 〜 COMMIT）にまとめる
+        
+        ブロック内で同じスレッドから呼ばれた execute_* やモデルのメソッドは
+        この接続・トランザクションに参加するため、COMMIT（fsync）は最後の1回だけになる。
+        """
+        with self.pool.write_transaction() as conn:
+            yield conn
+    
+    def execute_query(self, query: str, params: tuple = (),
+                      conn: Optional[sqlite3.Connection] = None) -> List[sqlite3.Row]:
         """クエリ実行（SELECT用）"""
-        with self.get_connection() as conn:
+        if conn is not None:
+            return conn.execute(query, params).fetchall()
+        with self.pool.acquire_read() as conn:
             cursor = conn.execute(query, params)
             return cursor.fetchall()
     
-    def execute_update(self, query: str, params: tuple = ()) -> int:
+    def execute_query_fast(self, query: str, params: tuple = (),
+                           conn: Optional[sqlite3.Connection] = None) -> List[tuple]:
+        """
+        クエリ実行（SELECT用・タプルで返す高速版）
+        
+        sqlite3.Rowを生成しないため、列を位置で参照する内部処理向け。
+        
+        Args:
+            query: SQLクエリ
+            params: パラメータ
+            conn: 既存トランザクションの接続（省略時は読み取り用接続）
+            
+        Returns:
+            List[tuple]: 結果行のタプルのリスト
+        """
+        if conn is not None:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
+        with self.pool.acquire_read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            return cursor.execute(query, params).fetchall()
+    
+    def execute_query_iter(self, query: str, params: tuple = (),
+                           chunk_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """
+        クエリ実行（SELECT用・結果を逐次取得）
+    
+        大量行をリストに展開せずfetchmanyで分割して返す。取得中は読み取り用接続を
+        保持するため、最後まで読むか close() すること。
+    
+        Args:
+            query: SQLクエリ
+            params: パラメータ
+            chunk_size: 1回のfetchmanyで取得する件数
+    
+        Yields:
+            sqlite3.Row: 結果行
+        """
+        with self.pool.acquire_read() as conn:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+    
+    def execute_update(self, query: str, params: tuple = (),
+                       conn: Optional[sqlite3.Connection] = None) -> int:
         """クエリ実行（INSERT/UPDATE/DELETE用）"""
+        if conn is not None:
+            return conn.execute(query, params).rowcount
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
-            conn.commit()
             return cursor.rowcount
     
-    def execute_insert(self, query: str, params: tuple = ()) -> int:
+    def execute_insert(self, query: str, params: tuple = (),
+                       conn: Optional[sqlite3.Connection] = None) -> int:
         """INSERT実行してIDを返す"""
+        if conn is not None:
+            return conn.execute(query, params).lastrowid
         with self.get_connection() as conn:
             cursor = conn.execute(query, params)
-            conn.commit()
             return cursor.lastrowid
+    
+    def execute_many(self, query: str, seq_of_params: Iterable[tuple],
+                     conn: Optional[sqlite3.Connection] = None) -> int:
+        """
+        同一クエリを複数パラメータで一括実行（単一トランザクション）
+        
+        Args:
+            query: SQLクエリ
+            seq_of_params: パラメータのイテラブル（ジェネレータ可）
+            conn: 既存トランザクションの接続（省略時は新規トランザクション）
+            
+        Returns:
+            int: 影響を受けた行数
+        """
+        if conn is not None:
+            return conn.executemany(query, seq_of_params).rowcount
+        with self.get_connection() as conn:
+            cursor = conn.executemany(query, seq_of_params)
+            return cursor.rowcount
+
+_NUMBER_TYPES = (int, float)
+
+
+@lru_cache(maxsize=1)
+def _date_for_minute(minute: int) -> date:
+    """指定した分（エポック分）のローカル日付（直近の1件のみキャッシュ）"""
+    return datetime.now().date()
+
+def _today() -> date:
+    """
+    今日の日付を取得（日付省略時の既定値用）
+    
+    取り込み処理では行ごとに呼ばれるため、同じ1分間の呼び出しは同じdateオブジェクトを返す。
+    タイムゾーンの時差は分単位なので、1分の区切りが日付の境目をまたぐことはない。
+    """
+    return _date_for_minute(int(time.time() // 60))
+
+# IN句に渡すIDの最大件数（SQLiteのパラメータ上限999未満）
+IN_CLAUSE_CHUNK_SIZE = 900
+
+def _id_chunks(ids: Iterable[int]) -> Iterator[tuple]:
+    """ID・コードを重複除去してIN句の上限以内の件数ごとに分割"""
+    unique_ids = tuple(dict.fromkeys(ids))
+    for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK_SIZE):
+        yield unique_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+
+def _placeholders(count: int) -> str:
+    """IN句用のプレースホルダー文字列を作成"""
+    return ', '.join(['?'] * count)
+
+def _fill_default_date(rows: Iterable[tuple], index: int, default_date) -> Iterator[tuple]:
+    """
+    日付列がNoneの行に既定の日付を補完する
+    
+    Args:
+        rows: 行タプルのイテラブル
+        index: 日付列の位置
+        default_date: 補完する日付（呼び出し側でバッチごとに1回だけ算出する）
+        
+    Yields:
+        tuple: 日付を補完した行
+    """
+    for row in rows:
+        if row[index] is None:
+            row = row[:index] + (default_date,) + row[index + 1:]
+        yield row
+
+
+def _values_differ(existing_values: Iterable, new_values: Iterable, tolerance: float = 0.0001) -> bool:
+    """
+    既存値と新規値の並びに差異があるか（数値はtolerance以内を同一とみなす）
+    
+    SQLiteのREAL/NUMERIC列は既にint/floatで返るため、両方が数値の場合は
+    float()変換を省略して直接比較する（JSONの文字列値などは従来どおり変換）。
+    
+    Args:
+        existing_values: 既存データの値（列順）
+        new_values: 新規データの値（同じ列順）
+        tolerance: 数値を同一とみなす許容差
+        
+    Returns:
+        bool: 差異がある場合True
+    """
+    for existing_val, new_val in zip(existing_values, new_values):
+        if existing_val is None or new_val is None:
+            if existing_val is not new_val:
+                return True
+        elif type(existing_val) in _NUMBER_TYPES and type(new_val) in _NUMBER_TYPES:
+            if abs(existing_val - new_val) > tolerance:
+                return True
+        elif abs(float(existing_val) - float(new_val)) > tolerance:
+            return True
+    return False
+
+def _build_company_search_queries(columns: str) -> Dict[tuple, str]:
+    """
+    企業検索クエリを条件の有無（8通り）ごとに事前生成
+    
+    SQL文字列を固定することで、SQLiteのステートメントキャッシュが常に効くようにする。
+    
+    Args:
+        columns: 取得する列
+        
+    Returns:
+        Dict[tuple, str]: (コード指定有無, 企業名指定有無, 業種指定有無) をキーとしたクエリ
+    """
+    queries = {}
+    for use_symbol, use_name, use_sector in product((False, True), repeat=3):
+        query = f"SELECT {columns} FROM companies WHERE 1=1"
+        if use_symbol:
+            query += " AND symbol LIKE ?"
+        if use_name:
+            query += " AND name LIKE ?"
+        if use_sector:
+            query += " AND sector LIKE ?"
+        queries[(use_symbol, use_name, use_sector)] = query + " ORDER BY symbol"
+    return queries
+
+def _with_latest_details(search_query: str) -> str:
+    """
+    企業検索クエリに最新株価・最新財務指標・価格統計（当月・当年・全期間）を付加
+    
+    検索クエリのパラメータの後に当月（'YYYY-MM'）・当年（'YYYY'）を渡す。
+    
+    Args:
+        search_query: companiesの列を返す企業検索クエリ
+        
+    Returns:
+        str: 詳細付きの企業検索クエリ
+    """
+    latest_columns = ', '.join(
+        f"l.{column}" for column in LATEST_PRICE_COLUMNS[1:] + LATEST_METRICS_COLUMNS
+    )
+    return f"""
+        WITH matched AS ({search_query})
+        SELECT c.*, l.price AS current_price, {latest_columns},
+               ms.min_price AS monthly_min, ms.max_price AS monthly_max,
+               ys.min_price AS yearly_min, ys.max_price AS yearly_max,
+               ats.min_price AS all_time_min, ats.max_price AS all_time_max
+        FROM matched c
+        LEFT JOIN company_latest l ON l.company_id = c.id
+        LEFT JOIN price_statistics ms
+            ON ms.company_id = c.id AND ms.period_type = 'monthly' AND ms.period_value = ?
+        LEFT JOIN price_statistics ys
+            ON ys.company_id = c.id AND ys.period_type = 'yearly' AND ys.period_value = ?
+        LEFT JOIN price_statistics ats
+            ON ats.company_id = c.id AND ats.period_type = 'all_time' AND ats.period_value = 'all'
+        ORDER BY c.symbol
+        """
 
 class Company:
     """企業情報モデル"""
     
+    # 画面で参照する列のみ取得（企業詳細で作成日時・更新日時を表示する）
+    COLUMNS = "id, symbol, name, sector, market, created_at, updated_at"
+    
+    GET_BY_SYMBOL_QUERY = f"SELECT {COLUMNS} FROM companies WHERE symbol = ?"
+    
+    GET_BY_SYMBOLS_QUERY = f"SELECT {COLUMNS} FROM companies WHERE symbol IN ({{placeholders}})"
+    
+    GET_BY_ID_QUERY = f"SELECT {COLUMNS} FROM companies WHERE id = ?"
+    
+    # 企業一覧のページ取得（idの昇順。after_idより後の行から取得するキーセット方式）
+    PAGE_QUERY = f"SELECT {COLUMNS} FROM companies WHERE id > ? ORDER BY id LIMIT ? OFFSET ?"
+    
+    UPSERT_QUERY = """
+        INSERT INTO companies (symbol, name, sector, market)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(symbol) DO UPDATE SET
+            name = excluded.name, sector = excluded.sector, market = excluded.market
+        """
+    
+    # 企業登録（既存の企業コードは企業名と、指定された業種・市場のみ更新）
+    REGISTER_QUERY = """
+        INSERT INTO companies (symbol, name, sector, market)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(symbol) DO UPDATE SET
+            name = excluded.name, sector = COALESCE(?, sector), market = COALESCE(?, market)
+        RETURNING id
+        """
+    
+    # 検索条件（コード・企業名・業種）の有無の組み合わせごとのクエリ
+    SEARCH_QUERIES = _build_company_search_queries(COLUMNS)
+    
+    # 企業一覧（企業コード順。ページ番号指定の一覧ではLIMIT/OFFSETを付けて取得する）
+    LIST_QUERY = SEARCH_QUERIES[(False, False, False)]
+    
+    FTS_SEARCH_QUERY = f"""
+        SELECT {', '.join('c.' + column for column in COLUMNS.split(', '))}
+        FROM companies_fts f
+        JOIN companies c ON c.id = f.rowid
+        WHERE companies_fts MATCH ?
+        ORDER BY c.symbol
+        """
+    
+    # 最新株価・財務指標・価格統計付きの検索クエリ（企業検索画面用）
+    DETAIL_SEARCH_QUERIES = {key: _with_latest_details(query) for key, query in SEARCH_QUERIES.items()}
+    
+    FTS_DETAIL_SEARCH_QUERY = _with_latest_details(FTS_SEARCH_QUERY)
+    
+    # trigramトークナイザーは3文字未満の語を検索できない
+    FTS_MIN_TERM_LENGTH = 3
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
@@ -57,39 +571,171 @@ class Company:
         INSERT INTO companies (symbol, name, sector, market)
         VALUES (?, ?, ?, ?)
         """
-        return self.db.execute_insert(query, (symbol, name, sector, market))
+        company_id = self.db.execute_insert(query, (symbol, name, sector, market))
+        self.clear_cache()
+        return company_id
+    
+    def upsert_many(self, rows: Iterable[tuple]) -> int:
+        """
+        企業情報を一括作成（株式コードが既存の場合は企業名・業種・市場を更新）
+        
+        Args:
+            rows: (symbol, name, sector, market) のイテラブル（ジェネレータ可）
+            
+        Returns:
+            int: 作成・更新した行数
+        """
+        affected = self.db.execute_many(self.UPSERT_QUERY, rows)
+        self.clear_cache()
+        return affected
+    
+    def register(self, symbol: str, name: str, sector: Optional[str] = None,
+                 market: Optional[str] = None) -> int:
+        """
+        企業情報を登録（企業コードが既存の場合は更新）し、企業IDを返す
+        
+        存在確認・作成・更新を1つのUPSERT文で行う。
+        
+        Args:
+            symbol: 企業コード
+            name: 企業名
+            sector: 業種（Noneの場合、新規は空文字・既存は変更しない）
+            market: 市場（Noneの場合、新規は空文字・既存は変更しない）
+            
+        Returns:
+            int: 企業ID
+        """
+        params = (symbol, name, sector or '', market or '', sector, market)
+        with self.db.transaction() as conn:
+            company_id = conn.execute(self.REGISTER_QUERY, params).fetchone()[0]
+        self.clear_cache()
+        return company_id
+    
+    def clear_cache(self) -> None:
+        """企業情報のレコードキャッシュを破棄（companiesを更新・削除した後に呼ぶ）"""
+        bust_table_cache('companies')
+    
+    def _get_cached(self, key_name: str, value, query: str) -> Optional[sqlite3.Row]:
+        """
+        キャッシュ経由で企業情報を1件取得
+        
+        companiesは更新が稀で、株価取り込みのたびにコード→ID変換で参照されるため
+        インプロセスのキャッシュに保持する（複数ワーカーの場合は他プロセスの更新を
+        検知できないためrecord_cacheが保持せず、毎回取得する）。未コミットのデータを
+        保持しないようトランザクション中はキャッシュを使わない。
+        
+        Args:
+            key_name: キャッシュキーの種別（'symbol' または 'id'）
+            value: 検索値
+            query: 取得クエリ
+            
+        Returns:
+            Optional[sqlite3.Row]: 企業情報（見つからない場合はNone）
+        """
+        use_cache = not self.db.pool.in_transaction()
+        cache_key = ('companies', key_name, value)
+        if use_cache:
+            cached = record_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        results = self.db.execute_query(query, (value,))
+        if not results:
+            return None
+        
+        company = results[0]
+        if use_cache:
+            record_cache.set(cache_key, company)
+        return company
     
     def get_by_symbol(self, symbol: str) -> Optional[sqlite3.Row]:
         """企業コードで企業情報を取得"""
-        query = "SELECT * FROM companies WHERE symbol = ?"
-        results = self.db.execute_query(query, (symbol,))
-        return results[0] if results else None
+        return self._get_cached('symbol', symbol, self.GET_BY_SYMBOL_QUERY)
+    
+    def get_by_symbols(self, symbols: Iterable[str]) -> Dict[str, sqlite3.Row]:
+        """
+        複数の企業コードの企業情報をまとめて取得
+        
+        Args:
+            symbols: 企業コードのイテラブル
+            
+        Returns:
+            Dict[str, sqlite3.Row]: 企業コードをキーとした企業情報（未登録のコードは含まない）
+        """
+        companies: Dict[str, sqlite3.Row] = {}
+        for chunk in _id_chunks(symbols):
+            query = self.GET_BY_SYMBOLS_QUERY.format(placeholders=_placeholders(len(chunk)))
+            for row in self.db.execute_query(query, chunk):
+                companies[row['symbol']] = row
+        return companies
     
     def get_by_id(self, company_id: int) -> Optional[sqlite3.Row]:
         """IDで企業情報を取得"""
-        query = "SELECT * FROM companies WHERE id = ?"
-        results = self.db.execute_query(query, (company_id,))
-        return results[0] if results else None
+        return self._get_cached('id', company_id, self.GET_BY_ID_QUERY)
     
-    def search(self, symbol: str = '', name: str = '', sector: str = '') -> List[sqlite3.Row]:
-        """企業情報を検索"""
-        query = "SELECT * FROM companies WHERE 1=1"
-        params = []
+    def _search_condition(self, symbol: str, name: str, sector: str) -> tuple:
+        """
+        検索条件から検索方式とパラメータを決定
         
-        if symbol:
-            query += " AND symbol LIKE ?"
-            params.append(f"%{symbol}%")
+        Returns:
+            tuple: (全文検索を使うか, 条件の有無のキー, パラメータ)
+        """
+        terms = {'symbol': symbol, 'name': name, 'sector': sector}
+        # JSONで数値が渡された場合（{"symbol": 7203} など）もLIKE検索と同じく文字列として扱う
+        specified = {column: str(value) for column, value in terms.items() if value}
+        if (specified
+                and all(len(value) >= self.FTS_MIN_TERM_LENGTH for value in specified.values())
+                and self.db.supports_company_fts()):
+            # 全文検索（転置インデックス）で部分一致検索
+            match = ' AND '.join(
+                f'{column}:"{value.replace(chr(34), chr(34) * 2)}"'
+                for column, value in specified.items()
+            )
+            return True, None, (match,)
         
-        if name:
-            query += " AND name LIKE ?"
-            params.append(f"%{name}%")
+        # 短い検索語はLIKEで部分一致検索
+        key = (bool(symbol), bool(name), bool(sector))
+        params = tuple(f"%{value}%" for value in (symbol, name, sector) if value)
+        return False, key, params
+    
+    def search(self, symbol: str = '', name: str = '', sector: str = '') -> List[sqlite3.Row]:
+        """企業情報を検索"""
+        use_fts, key, params = self._search_condition(symbol, name, sector)
+        query = self.FTS_SEARCH_QUERY if use_fts else self.SEARCH_QUERIES[key]
+        return self.db.execute_query(query, params)
+    
+    def get_page(self, limit: int, offset: int = 0, after_id: int = 0) -> List[sqlite3.Row]:
+        """
+        企業情報をid順に1ページ分取得
         
-        if sector:
-            query += " AND sector LIKE ?"
-            params.append(f"%{sector}%")
+        Args:
+            limit: 取得件数
+            offset: スキップする件数
+            after_id: このidより後の企業から取得（前ページ最後のidを渡すとOFFSETなしで続きを取得できる）
+            
+        Returns:
+            List[sqlite3.Row]: 企業情報
+        """
+        return self.db.execute_query(self.PAGE_QUERY, (after_id, limit, offset))
+    
+    def search_with_details(self, symbol: str = '', name: str = '', sector: str = '',
+                            current_month: str = '', current_year: str = '') -> List[sqlite3.Row]:
+        """
+        企業情報を検索し、最新株価・最新財務指標・価格統計を1クエリで取得
         
-        query += " ORDER BY symbol"
-        return self.db.execute_query(query, tuple(params))
+        Args:
+            symbol: 企業コード（部分一致）
+            name: 企業名（部分一致）
+            sector: 業種（部分一致）
+            current_month: 月次統計の対象月（'YYYY-MM'）
+            current_year: 年次統計の対象年（'YYYY'）
+            
+        Returns:
+            List[sqlite3.Row]: 企業情報（current_price, pbr, monthly_min 等の列を含む）
+        """
+        use_fts, key, params = self._search_condition(symbol, name, sector)
+        query = self.FTS_DETAIL_SEARCH_QUERY if use_fts else self.DETAIL_SEARCH_QUERIES[key]
+        return self.db.execute_query(query, params + (current_month, current_year))
     
     def update(self, company_id: int, **kwargs) -> int:
         """企業情報を更新"""
@@ -106,69 +752,145 @@ class Company:
         
         params.append(company_id)
         query = f"UPDATE companies SET {', '.join(fields)} WHERE id = ?"
-        return self.db.execute_update(query, tuple(params))
+        rows_updated = self.db.execute_update(query, tuple(params))
+        self.clear_cache()
+        return rows_updated
 
 class StockPrice:
     """株価情報モデル"""
     
+    INSERT_OR_REPLACE_QUERY = """
+        INSERT OR REPLACE INTO stock_prices (company_id, price, price_date, volume)
+        VALUES (?, ?, ?, ?)
+        """
+    
+    EXISTING_QUERY = """
+        SELECT id, price, volume FROM stock_prices 
+        WHERE company_id = ? AND price_date = ?
+        """
+    
+    INSERT_QUERY = """
+        INSERT INTO stock_prices (company_id, price, price_date, volume)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(company_id, price_date) DO NOTHING
+        """
+    
+    # 既存行は削除せずに値のみ更新（INSERT OR REPLACEと異なりidが変わらない）
+    UPSERT_QUERY = """
+        INSERT INTO stock_prices (company_id, price, price_date, volume)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(company_id, price_date) DO UPDATE SET
+            price = excluded.price, volume = excluded.volume
+        """
+    
+    LATEST_QUERY = """
+        SELECT id, company_id, price, price_date, volume FROM stock_prices 
+        WHERE company_id = ? 
+        ORDER BY price_date DESC 
+        LIMIT 1
+        """
+    
+    # 企業ごとに最新の1件を取得（{placeholders} はIN句のプレースホルダー）
+    LATEST_BULK_QUERY = """
+        SELECT id, company_id, price, price_date, volume FROM (
+            SELECT id, company_id, price, price_date, volume,
+                   ROW_NUMBER() OVER (PARTITION BY company_id ORDER BY price_date DESC) AS row_number
+            FROM stock_prices 
+            WHERE company_id IN ({placeholders})
+        )
+        WHERE row_number = 1
+        """
+    
+    HISTORY_QUERY = """
+        SELECT * FROM stock_prices 
+        WHERE company_id = ? 
+        ORDER BY price_date DESC 
+        LIMIT ?
+        """
+    
+    # 全企業の最新株価日（(company_id, price_date) の一意インデックスのみを走査して集計する）
+    LATEST_DATES_QUERY = """
+        SELECT company_id, MAX(price_date) FROM stock_prices 
+        GROUP BY company_id
+        """
+    
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
     def create(self, company_id: int, price: float, price_date: str = None, volume: int = 0) -> int:
         """株価情報を作成（旧形式：下位互換性のため残存）"""
         if price_date is None:
-            price_date = datetime.now().date()
+            price_date = _today()
         
-        query = """
-        INSERT OR REPLACE INTO stock_prices (company_id, price, price_date, volume)
-        VALUES (?, ?, ?, ?)
+        return self.db.execute_insert(self.INSERT_OR_REPLACE_QUERY, (company_id, price, price_date, volume))
+    
+    def create_many(self, rows: Iterable[tuple], default_date=None, skip_existing: bool = False) -> int:
+        """
+        株価情報を一括作成（INSERT OR REPLACE）
+        
+        Args:
+            rows: (company_id, price, price_date, volume) のイテラブル（ジェネレータ可）
+            default_date: price_date が None の行に使う日付（省略時は補完しない）
+            skip_existing: Trueの場合、同じ企業・日付の既存データは置き換えずに残す
+            
+        Returns:
+            int: 影響を受けた行数
+        """
+        if default_date is not None:
+            rows = _fill_default_date(rows, 2, default_date)
+        query = self.INSERT_QUERY if skip_existing else self.INSERT_OR_REPLACE_QUERY
+        return self.db.execute_many(query, rows)
+    
+    def upsert_many(self, rows: Iterable[tuple]) -> int:
+        """
+        株価情報を一括作成・更新（同じ企業・日付の既存データは価格・出来高を上書き）
+        
+        Args:
+            rows: (company_id, price, price_date, volume) のイテラブル（ジェネレータ可）
+            
+        Returns:
+            int: 影響を受けた行数
         """
-        return self.db.execute_insert(query, (company_id, price, price_date, volume))
+        return self.db.execute_many(self.UPSERT_QUERY, rows)
     
     def create_or_update(self, company_id: int, price: float, price_date: str = None, volume: int = 0) -> Dict[str, Union[int, str]]:
         """株価情報を作成または更新（重複チェック付き）"""
         if price_date is None:
-            price_date = datetime.now().date()
+            price_date = _today()
         
-        # 既存データの確認
-        existing_query = """
-        SELECT id, price, volume FROM stock_prices 
-        WHERE company_id = ? AND price_date = ?
-        """
-        existing = self.db.execute_query(existing_query, (company_id, price_date))
+        with self.db.transaction() as conn:
+            # 新規作成（一意キーが競合する場合は何もしない）
+            cursor = conn.execute(self.INSERT_QUERY, (company_id, price, price_date, volume))
+            if cursor.rowcount == 1:
+                return {
+                    'id': cursor.lastrowid,
+                    'status': 'created',
+                    'message': '新規データを作成しました'
+                }
+            
+            # 競合した既存データを取得して比較
+            existing = self.db.execute_query_fast(self.EXISTING_QUERY, (company_id, price_date), conn=conn)
         
         if existing:
             # 既存データがある場合：データ内容を比較
-            existing_data = existing[0]
-            if (abs(float(existing_data['price']) - float(price)) > 0.01 or 
-                existing_data['volume'] != volume):
+            existing_id, existing_price, existing_volume = existing[0]
+            if (abs(float(existing_price) - float(price)) > 0.01 or 
+                existing_volume != volume):
                 # データが異なる場合は警告を返す
                 return {
-                    'id': existing_data['id'],
+                    'id': existing_id,
                     'status': 'warning',
-                    'message': f'同日の異なるデータが既に存在します。既存: 価格{existing_data["price"]}, 出来高{existing_data["volume"]} vs 新規: 価格{price}, 出来高{volume}',
-                    'existing_data': dict(existing_data),
+                    'message': f'同日の異なるデータが既に存在します。既存: 価格{existing_price}, 出来高{existing_volume} vs 新規: 価格{price}, 出来高{volume}',
+                    'existing_data': {'id': existing_id, 'price': existing_price, 'volume': existing_volume},
                     'new_data': {'price': price, 'volume': volume}
                 }
             else:
                 # 同じデータの場合は何もしない
                 return {
-                    'id': existing_data['id'],
+                    'id': existing_id,
                     'status': 'unchanged',
                     'message': '同じデータが既に存在します'
                 }
-        else:
-            # 新規作成
-            query = """
-            INSERT INTO stock_prices (company_id, price, price_date, volume)
-            VALUES (?, ?, ?, ?)
-            """
-            new_id = self.db.execute_insert(query, (company_id, price, price_date, volume))
-            return {
-                'id': new_id,
-                'status': 'created',
-                'message': '新規データを作成しました'
-            }
 
     def force_update(self, company_id: int, price: float, price_date: str, volume: int = 0) -> int:
         """強制更新（データ修正用）"""
@@ -182,7 +904,7 @@ class StockPrice:
     def get_conflicting_data(self, company_id: int, price_date: str) -> Optional[sqlite3.Row]:
         """指定日の既存データを確認"""
         query = """
-        SELECT * FROM stock_prices 
+        SELECT id, company_id, price, price_date, volume FROM stock_prices 
         WHERE company_id = ? AND price_date = ?
         """
         results = self.db.execute_query(query, (company_id, price_date))
@@ -190,215 +912,519 @@ class StockPrice:
     
     def get_latest_price(self, company_id: int) -> Optional[sqlite3.Row]:
         """最新の株価を取得"""
-        query = """
-        SELECT * FROM stock_prices 
-        WHERE company_id = ? 
-        ORDER BY price_date DESC 
-        LIMIT 1
-        """
+        query = self.LATEST_QUERY
         results = self.db.execute_query(query, (company_id,))
         return results[0] if results else None
     
+    def get_latest_prices_bulk(self, company_ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+        """
+        複数企業の最新株価をまとめて取得
+        
+        Args:
+            company_ids: 企業IDのイテラブル
+            
+        Returns:
+            Dict[int, sqlite3.Row]: 企業IDをキーとした最新株価（データがない企業は含まない）
+        """
+        latest = {}
+        for chunk in _id_chunks(company_ids):
+            query = self.LATEST_BULK_QUERY.format(placeholders=_placeholders(len(chunk)))
+            for row in self.db.execute_query(query, chunk):
+                latest[row['company_id']] = row
+        return latest
+    
+    def get_latest_price_dates(self) -> Dict[int, str]:
+        """
+        全企業の最新株価日を1回のクエリで取得
+        
+        Returns:
+            Dict[int, str]: 企業IDをキーとした最新の株価日（データがない企業は含まない）
+        """
+        return {company_id: price_date for company_id, price_date in self.db.execute_query_fast(self.LATEST_DATES_QUERY)}
+    
     def get_price_history(self, company_id: int, days: int = 30) -> List[sqlite3.Row]:
         """株価履歴を取得"""
-        query = """
-        SELECT * FROM stock_prices 
-        WHERE company_id = ? 
-        ORDER BY price_date DESC 
-        LIMIT ?
+        return self.db.execute_query(self.HISTORY_QUERY, (company_id, days))
+    
+    def iter_price_history(self, company_id: int, days: int = 30,
+                           chunk_size: int = 500) -> Iterator[sqlite3.Row]:
+        """
+        株価履歴を新しい順に逐次取得（全件をリストに展開しない）
+        
+        取得中は読み取り用接続を保持するため、最後まで読むか close() すること。
+        
+        Args:
+            company_id: 企業ID
+            days: 取得件数の上限
+            chunk_size: 1回のfetchmanyで取得する件数
+            
+        Yields:
+            sqlite3.Row: 株価履歴の行
         """
-        return self.db.execute_query(query, (company_id, days))
+        with self.db.pool.acquire_read() as conn:
+            cursor = conn.execute(self.HISTORY_QUERY, (company_id, days))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
 
-class FinancialMetrics:
-    """財務指標モデル"""
+class DatedValueModel:
+    """
+    企業ID・日付ごとに数値項目を持つモデルの共通処理（財務指標・テクニカル指標）
+    
+    サブクラスはテーブル名・日付列・値の列・表示用ラベルを定義するだけでよい。
+    SQLと行タプルの列順はクラス定義時に一度だけ生成し、各メソッドは値を
+    VALUE_FIELDS の列順のタプルとして扱う（辞書はレスポンス用にのみ組み立てる）。
+    """
+    
+    TABLE_NAME = ''
+    DATE_COLUMN = ''
+    VALUE_FIELDS: tuple = ()
+    # 行タプル（create_many の入力・INSERT文）の列順（company_id と VALUE_FIELDS の間に日付列）
+    ROW_LAYOUT: tuple = ()
+    DATA_LABEL = ''
+    DATE_LABEL = ''
+    
+    # 行値IN句1組あたりのパラメータ数は2のため、SQLiteの上限(999)に収まる件数で分割する
+    EXISTING_MANY_CHUNK_SIZE = 499
+    
+    def __init_subclass__(cls, **kwargs):
+        """サブクラスの定義からSQLと応答メッセージを生成"""
+        super().__init_subclass__(**kwargs)
+        table, date_column = cls.TABLE_NAME, cls.DATE_COLUMN
+        if tuple(column for column in cls.ROW_LAYOUT if column != date_column) != ('company_id', *cls.VALUE_FIELDS):
+            raise TypeError(f"{cls.__name__}.ROW_LAYOUT は company_id, VALUE_FIELDS, {date_column} で構成してください")
+        
+        values = ', '.join(cls.VALUE_FIELDS)
+        layout = ', '.join(cls.ROW_LAYOUT)
+        placeholders = ', '.join(['?'] * len(cls.ROW_LAYOUT))
+        
+        cls.DATE_INDEX = cls.ROW_LAYOUT.index(date_column)
+        cls.INSERT_OR_REPLACE_QUERY = f"""
+        INSERT OR REPLACE INTO {table} 
+        ({layout})
+        VALUES ({placeholders})
+        """
+        cls.INSERT_QUERY = f"""
+        INSERT INTO {table} 
+        ({layout})
+        VALUES ({placeholders})
+        ON CONFLICT(company_id, {date_column}) DO NOTHING
+        """
+        cls.UPSERT_QUERY = f"""
+        INSERT INTO {table} 
+        ({layout})
+        VALUES ({placeholders})
+        ON CONFLICT(company_id, {date_column}) DO UPDATE SET
+            {', '.join(f'{field} = excluded.{field}' for field in cls.VALUE_FIELDS)}
+        """
+        cls.EXISTING_QUERY = f"""
+        SELECT id, {values} FROM {table} 
+        WHERE company_id = ? AND {date_column} = ?
+        """
+        cls.CONFLICT_QUERY = f"""
+        SELECT id, company_id, {date_column}, {values}
+        FROM {table} 
+        WHERE company_id = ? AND {date_column} = ?
+        """
+        cls.LATEST_QUERY = f"""
+        SELECT id, company_id, {date_column}, {values}
+        FROM {table} 
+        WHERE company_id = ? 
+        ORDER BY {date_column} DESC 
+        LIMIT 1
+        """
+        # MAX()の集計ではSQLiteは他の列を最大値の行から返すため、UNIQUE(company_id, 日付) の
+        # 自動インデックスの走査だけで企業ごとの最新行が得られる（並び替え不要）
+        cls.LATEST_BULK_QUERY = f"""
+        SELECT id, company_id, MAX({date_column}) AS {date_column}, {values}
+        FROM {table} 
+        WHERE company_id IN ({{placeholders}})
+        GROUP BY company_id
+        """
+        cls.FORCE_UPDATE_QUERY = f"""
+        UPDATE {table} 
+        SET {', '.join(f'{field} = ?' for field in cls.VALUE_FIELDS)}
+        WHERE company_id = ? AND {date_column} = ?
+        """
+        
+        cls.CREATED_MESSAGE = f'新規{cls.DATA_LABEL}データを作成しました'
+        cls.WARNING_MESSAGE = f'同一{cls.DATE_LABEL}の異なる{cls.DATA_LABEL}データが既に存在します。'
+        cls.UNCHANGED_MESSAGE = f'同じ{cls.DATA_LABEL}データが既に存在します'
     
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
-    def create(self, company_id: int, report_date: str = None, **metrics) -> int:
-        """財務指標を作成（旧形式：下位互換性のため残存）"""
-        if report_date is None:
-            report_date = datetime.now().date()
-        
-        query = """
-        INSERT OR REPLACE INTO financial_metrics 
-        (company_id, pbr, per, equity_ratio, roe, roa, net_sales, operating_profit, report_date)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        params = (
-            company_id,
-            metrics.get('pbr'),
-            metrics.get('per'),
-            metrics.get('equity_ratio'),
-            metrics.get('roe'),
-            metrics.get('roa'),
-            metrics.get('net_sales'),
-            metrics.get('operating_profit'),
-            report_date
+    def _value_tuple(self, values: Dict) -> tuple:
+        """値の辞書を VALUE_FIELDS の列順のタプルに変換（未指定の項目はNone）"""
+        return tuple(map(values.get, self.VALUE_FIELDS))
+    
+    def _build_row(self, company_id: int, date_value, value_tuple: tuple) -> tuple:
+        """ROW_LAYOUT の列順の行タプルを作成"""
+        row = (company_id,) + value_tuple
+        return row[:self.DATE_INDEX] + (date_value,) + row[self.DATE_INDEX:]
+    
+    def _compare_result(self, existing_id: int, existing_values: Sequence,
+                        new_values: Sequence) -> Dict[str, Union[int, str]]:
+        """既存データと新規データを比較して create_or_update の結果を作成"""
+        if _values_differ(existing_values, new_values):
+            # データが異なる場合は警告を返す
+            return {
+                'id': existing_id,
+                'status': 'warning',
+                'message': self.WARNING_MESSAGE,
+                'existing_data': dict(zip(self.VALUE_FIELDS, existing_values)),
+                'new_data': dict(zip(self.VALUE_FIELDS, new_values))
+            }
+        # 同じデータの場合は何もしない
+        return {
+            'id': existing_id,
+            'status': 'unchanged',
+            'message': self.UNCHANGED_MESSAGE
+        }
+    
+    def _create(self, company_id: int, date_value, values: Dict) -> int:
+        """データを作成（INSERT OR REPLACE）"""
+        if date_value is None:
+            date_value = _today()
+        return self.db.execute_insert(
+            self.INSERT_OR_REPLACE_QUERY,
+            self._build_row(company_id, date_value, self._value_tuple(values))
         )
-        
-        return self.db.execute_insert(query, params)
     
-    def create_or_update(self, company_id: int, report_date: str = None, **metrics) -> Dict[str, Union[int, str]]:
-        """財務指標を作成または更新（重複チェック付き）"""
-        if report_date is None:
-            report_date = datetime.now().date()
-        
-        # 既存データの確認
-        existing_query = """
-        SELECT id, pbr, per, equity_ratio, roe, roa, net_sales, operating_profit FROM financial_metrics 
-        WHERE company_id = ? AND report_date = ?
+    def create_many(self, rows: Iterable[tuple], default_date=None, skip_existing: bool = False) -> int:
         """
-        existing = self.db.execute_query(existing_query, (company_id, report_date))
+        データを一括作成（INSERT OR REPLACE）
         
-        if existing:
-            # 既存データがある場合：データ内容を比較
-            existing_data = existing[0]
-            existing_metrics = {
-                'pbr': existing_data['pbr'],
-                'per': existing_data['per'],
-                'equity_ratio': existing_data['equity_ratio'],
-                'roe': existing_data['roe'],
-                'roa': existing_data['roa'],
-                'net_sales': existing_data['net_sales'],
-                'operating_profit': existing_data['operating_profit']
-            }
+        Args:
+            rows: ROW_LAYOUT の列順のタプルのイテラブル（ジェネレータ可）
+            default_date: 日付列が None の行に使う日付（省略時は補完しない）
+            skip_existing: Trueの場合、同じ企業・日付の既存データは置き換えずに残す
             
-            new_metrics = {
-                'pbr': metrics.get('pbr'),
-                'per': metrics.get('per'),
-                'equity_ratio': metrics.get('equity_ratio'),
-                'roe': metrics.get('roe'),
-                'roa': metrics.get('roa'),
-                'net_sales': metrics.get('net_sales'),
-                'operating_profit': metrics.get('operating_profit')
-            }
-            
-            # データ差異をチェック
-            has_difference = False
-            for key in existing_metrics:
-                existing_val = existing_metrics[key]
-                new_val = new_metrics[key]
-                if existing_val is not None and new_val is not None:
-                    if abs(float(existing_val) - float(new_val)) > 0.0001:
-                        has_difference = True
-                        break
-                elif existing_val != new_val:
-                    has_difference = True
-                    break
+        Returns:
+            int: 影響を受けた行数
+        """
+        if default_date is not None:
+            rows = _fill_default_date(rows, self.DATE_INDEX, default_date)
+        query = self.INSERT_QUERY if skip_existing else self.INSERT_OR_REPLACE_QUERY
+        return self.db.execute_many(query, rows)
+    
+    def upsert_many(self, rows: Iterable[tuple]) -> int:
+        """
+        データを一括作成・更新（同じ企業・日付の既存データは全項目を上書き）
+        
+        Args:
+            rows: ROW_LAYOUT の列順のタプルのイテラブル（ジェネレータ可）
             
-            if has_difference:
-                # データが異なる場合は警告を返す
-                return {
-                    'id': existing_data['id'],
-                    'status': 'warning',
-                    'message': f'同一報告日の異なる財務指標データが既に存在します。',
-                    'existing_data': existing_metrics,
-                    'new_data': new_metrics
-                }
-            else:
-                # 同じデータの場合は何もしない
+        Returns:
+            int: 影響を受けた行数
+        """
+        return self.db.execute_many(self.UPSERT_QUERY, rows)
+    
+    def _create_or_update(self, company_id: int, date_value, values: Dict) -> Dict[str, Union[int, str]]:
+        """データを作成または更新（重複チェック付き）"""
+        if date_value is None:
+            date_value = _today()
+        new_values = self._value_tuple(values)
+        
+        with self.db.transaction() as conn:
+            # 新規作成（一意キーが競合する場合は何もしない）
+            cursor = conn.execute(self.INSERT_QUERY, self._build_row(company_id, date_value, new_values))
+            if cursor.rowcount == 1:
                 return {
-                    'id': existing_data['id'],
-                    'status': 'unchanged',
-                    'message': '同じ財務指標データが既に存在します'
+                    'id': cursor.lastrowid,
+                    'status': 'created',
+                    'message': self.CREATED_MESSAGE
                 }
-        else:
-            # 新規作成
-            query = """
-            INSERT INTO financial_metrics 
-            (company_id, pbr, per, equity_ratio, roe, roa, net_sales, operating_profit, report_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            
+            # 競合した既存データを取得して比較
+            existing = self.db.execute_query_fast(self.EXISTING_QUERY, (company_id, date_value), conn=conn)
+        
+        if existing:
+            # EXISTING_QUERYの列順は id + VALUE_FIELDS
+            existing_id, *existing_values = existing[0]
+            return self._compare_result(existing_id, existing_values, new_values)
+    
+    def _fetch_existing_many(self, conn: sqlite3.Connection, keys: List[tuple]) -> Dict[tuple, tuple]:
+        """
+        (company_id, 日付) の組に一致する既存データをまとめて取得
+        
+        Args:
+            conn: トランザクション中の接続
+            keys: (company_id, 日付) のリスト
+            
+        Returns:
+            Dict[tuple, tuple]: (company_id, 日付) をキーとした (id, VALUE_FIELDS の値タプル)
+        """
+        existing = {}
+        columns = ', '.join(self.VALUE_FIELDS)
+        for start in range(0, len(keys), self.EXISTING_MANY_CHUNK_SIZE):
+            chunk = keys[start:start + self.EXISTING_MANY_CHUNK_SIZE]
+            placeholders = ', '.join(['(?, ?)'] * len(chunk))
+            query = f"""
+            SELECT id, company_id, {self.DATE_COLUMN}, {columns} FROM {self.TABLE_NAME}
+            WHERE (company_id, {self.DATE_COLUMN}) IN (VALUES {placeholders})
             """
+            params = tuple(value for key in chunk for value in key)
+            for row in self.db.execute_query_fast(query, params, conn=conn):
+                existing[(row[1], str(row[2]))] = (row[0], row[3:])
+        return existing
+    
+    def create_or_update_many(self, batch: Iterable[Dict]) -> List[Dict[str, Union[int, str]]]:
+        """
+        データを一括で作成または更新（重複チェック付き）
+        
+        既存データを1回のSELECTでまとめて取得して差分を判定し、新規分は
+        executemanyで1トランザクションに挿入する。結果は create_or_update と同じ形式。
+        
+        Args:
+            batch: company_id、日付列（DATE_COLUMN）と各値をキーに持つ辞書のイテラブル
             
-            params = (
-                company_id,
-                metrics.get('pbr'),
-                metrics.get('per'),
-                metrics.get('equity_ratio'),
-                metrics.get('roe'),
-                metrics.get('roa'),
-                metrics.get('net_sales'),
-                metrics.get('operating_profit'),
-                report_date
-            )
+        Returns:
+            List[Dict[str, Union[int, str]]]: 入力順の処理結果
+        """
+        items = []
+        today = _today()
+        for item in batch:
+            date_value = item.get(self.DATE_COLUMN) or today
+            items.append(((item['company_id'], str(date_value)), self._value_tuple(item)))
+        
+        if not items:
+            return []
+        
+        results: List[Optional[Dict[str, Union[int, str]]]] = [None] * len(items)
+        
+        with self.db.transaction() as conn:
+            existing_rows = self._fetch_existing_many(conn, list({key for key, _ in items}))
             
-            new_id = self.db.execute_insert(query, params)
-            return {
-                'id': new_id,
-                'status': 'created',
-                'message': '新規財務指標データを作成しました'
-            }
-
-    def force_update(self, company_id: int, report_date: str, **metrics) -> int:
+            # バッチ内で同じキーが重複する場合は最初の行を新規データとして扱う
+            pending = {}
+            for index, (key, _) in enumerate(items):
+                if key in existing_rows or key in pending:
+                    continue
+                pending[key] = index
+            
+            if pending:
+                self.db.execute_many(
+                    self.INSERT_QUERY,
+                    (self._build_row(key[0], key[1], items[index][1]) for key, index in pending.items()),
+                    conn=conn
+                )
+                created_rows = self._fetch_existing_many(conn, list(pending))
+                for key, index in pending.items():
+                    existing_rows[key] = created_rows[key]
+                    results[index] = {
+                        'id': created_rows[key][0],
+                        'status': 'created',
+                        'message': self.CREATED_MESSAGE
+                    }
+        
+        for index, (key, new_values) in enumerate(items):
+            if results[index] is None:
+                existing_id, existing_values = existing_rows[key]
+                results[index] = self._compare_result(existing_id, existing_values, new_values)
+        
+        return results
+    
+    def _force_update(self, company_id: int, date_value, values: Dict) -> int:
         """強制更新（データ修正用）"""
-        query = """
-        UPDATE financial_metrics 
-        SET pbr = ?, per = ?, equity_ratio = ?, roe = ?, roa = ?, net_sales = ?, operating_profit = ?
-        WHERE company_id = ? AND report_date = ?
-        """
-        
-        params = (
-            metrics.get('pbr'),
-            metrics.get('per'),
-            metrics.get('equity_ratio'),
-            metrics.get('roe'),
-            metrics.get('roa'),
-            metrics.get('net_sales'),
-            metrics.get('operating_profit'),
-            company_id,
-            report_date
+        return self.db.execute_update(
+            self.FORCE_UPDATE_QUERY,
+            self._value_tuple(values) + (company_id, date_value)
         )
+    
+    def _get_conflicting_data(self, company_id: int, date_value) -> Optional[sqlite3.Row]:
+        """指定日の既存データを確認"""
+        results = self.db.execute_query(self.CONFLICT_QUERY, (company_id, date_value))
+        return results[0] if results else None
+    
+    def _get_latest(self, company_id: int) -> Optional[sqlite3.Row]:
+        """最新のデータを取得"""
+        results = self.db.execute_query(self.LATEST_QUERY, (company_id,))
+        return results[0] if results else None
+    
+    def _get_latest_bulk(self, company_ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+        """
+        複数企業の最新データをまとめて取得
         
-        return self.db.execute_update(query, params)
+        Args:
+            company_ids: 企業IDのイテラブル
+            
+        Returns:
+            Dict[int, sqlite3.Row]: 企業IDをキーとした最新データ（データがない企業は含まない）
+        """
+        latest = {}
+        for chunk in _id_chunks(company_ids):
+            query = self.LATEST_BULK_QUERY.format(placeholders=_placeholders(len(chunk)))
+            for row in self.db.execute_query(query, chunk):
+                latest[row['company_id']] = row
+        return latest
 
+class FinancialMetrics(DatedValueModel):
+    """財務指標モデル"""
+    
+    TABLE_NAME = 'financial_metrics'
+    DATE_COLUMN = 'report_date'
+    VALUE_FIELDS = ('pbr', 'per', 'equity_ratio', 'roe', 'roa', 'net_sales', 'operating_profit')
+    ROW_LAYOUT = ('company_id', *VALUE_FIELDS, 'report_date')
+    DATA_LABEL = '財務指標'
+    DATE_LABEL = '報告日'
+    
+    def create(self, company_id: int, report_date: str = None, **metrics) -> int:
+        """財務指標を作成（旧形式：下位互換性のため残存）"""
+        return self._create(company_id, report_date, metrics)
+    
+    def create_or_update(self, company_id: int, report_date: str = None, **metrics) -> Dict[str, Union[int, str]]:
+        """財務指標を作成または更新（重複チェック付き）"""
+        return self._create_or_update(company_id, report_date, metrics)
+    
+    def force_update(self, company_id: int, report_date: str, **metrics) -> int:
+        """強制更新（データ修正用）"""
+        return self._force_update(company_id, report_date, metrics)
+    
     def get_conflicting_data(self, company_id: int, report_date: str) -> Optional[sqlite3.Row]:
         """指定報告日の既存データを確認"""
-        query = """
-        SELECT * FROM financial_metrics 
-        WHERE company_id = ? AND report_date = ?
-        """
-        results = self.db.execute_query(query, (company_id, report_date))
-        return results[0] if results else None
+        return self._get_conflicting_data(company_id, report_date)
     
     def get_latest_metrics(self, company_id: int) -> Optional[sqlite3.Row]:
         """最新の財務指標を取得"""
-        query = """
-        SELECT * FROM financial_metrics 
-        WHERE company_id = ? 
-        ORDER BY report_date DESC 
-        LIMIT 1
-        """
-        results = self.db.execute_query(query, (company_id,))
-        return results[0] if results else None
+        return self._get_latest(company_id)
+    
+    def get_latest_metrics_bulk(self, company_ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+        """複数企業の最新の財務指標をまとめて取得（企業IDをキーとした辞書）"""
+        return self._get_latest_bulk(company_ids)
 
 class PriceStatistics:
     """価格統計モデル"""
     
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
+    # 期間の指定はバインド変数で渡し、SQL文字列を固定してステートメントキャッシュを効かせる
+    # 日付は範囲条件で絞り込むため (company_id, price_date) のインデックスが使われる
+    PERIOD_STATS_QUERY = """
+        SELECT 
+            MIN(price) as min_price,
+            MAX(price) as max_price,
+            AVG(price) as avg_price
+        FROM stock_prices 
+        WHERE company_id = ? AND price_date >= ? AND price_date < ?
+        """
     
-    def update_statistics(self, company_id: int, period_type: str, period_value: str):
-        """価格統計を更新"""
-        if period_type == 'monthly':
-            date_filter = f"strftime('%Y-%m', price_date) = '{period_value}'"
-        elif period_type == 'yearly':
-            date_filter = f"strftime('%Y', price_date) = '{period_value}'"
-        else:  # all_time
-            date_filter = "1=1"
-        
-        # 統計計算
-        stats_query = f"""
+    ALL_TIME_STATS_QUERY = """
         SELECT 
             MIN(price) as min_price,
             MAX(price) as max_price,
             AVG(price) as avg_price
         FROM stock_prices 
-        WHERE company_id = ? AND {date_filter}
+        WHERE company_id = ?
+        """
+    
+    # 全企業・全期間の統計を1回の集計（GROUP BY）で再構築するクエリ
+    # price_date は 'YYYY-MM-DD' 形式のため先頭7文字/4文字が年月/年になる
+    REBUILD_QUERIES = {
+        'monthly': """
+            INSERT OR REPLACE INTO price_statistics 
+            (company_id, period_type, period_value, min_price, max_price, avg_price)
+            SELECT company_id, 'monthly', substr(price_date, 1, 7), MIN(price), MAX(price), AVG(price)
+            FROM stock_prices 
+            GROUP BY company_id, substr(price_date, 1, 7)
+            """,
+        'yearly': """
+            INSERT OR REPLACE INTO price_statistics 
+            (company_id, period_type, period_value, min_price, max_price, avg_price)
+            SELECT company_id, 'yearly', substr(price_date, 1, 4), MIN(price), MAX(price), AVG(price)
+            FROM stock_prices 
+            GROUP BY company_id, substr(price_date, 1, 4)
+            """,
+        'all_time': """
+            INSERT OR REPLACE INTO price_statistics 
+            (company_id, period_type, period_value, min_price, max_price, avg_price)
+            SELECT company_id, 'all_time', 'all', MIN(price), MAX(price), AVG(price)
+            FROM stock_prices 
+            GROUP BY company_id
+            """,
+    }
+    
+    # 指定企業の1期間分の統計をまとめて書き込むクエリ（{placeholders} はIN句のプレースホルダー）
+    BULK_PERIOD_UPDATE_QUERY = """
+        INSERT OR REPLACE INTO price_statistics 
+        (company_id, period_type, period_value, min_price, max_price, avg_price)
+        SELECT company_id, ?, ?, MIN(price), MAX(price), AVG(price)
+        FROM stock_prices 
+        WHERE company_id IN ({placeholders}) AND price_date >= ? AND price_date < ?
+        GROUP BY company_id
+        """
+    
+    BULK_ALL_TIME_UPDATE_QUERY = """
+        INSERT OR REPLACE INTO price_statistics 
+        (company_id, period_type, period_value, min_price, max_price, avg_price)
+        SELECT company_id, 'all_time', 'all', MIN(price), MAX(price), AVG(price)
+        FROM stock_prices 
+        WHERE company_id IN ({placeholders})
+        GROUP BY company_id
+        """
+    
+    # 当月・当年・全期間の統計を企業ごとに株価を1回走査して集計し、3期間分をまとめて書き込むクエリ
+    # （{placeholders} はIN句のプレースホルダー。集計結果は3回参照するためMATERIALIZEDで1回だけ計算する）
+    CURRENT_PERIODS_UPDATE_QUERY = """
+        INSERT OR REPLACE INTO price_statistics 
+        (company_id, period_type, period_value, min_price, max_price, avg_price)
+        WITH prices AS (
+            SELECT company_id, price,
+                   price_date >= ? AND price_date < ? AS in_month,
+                   price_date >= ? AND price_date < ? AS in_year
+            FROM stock_prices 
+            WHERE company_id IN ({placeholders})
+        ),
+        stats AS MATERIALIZED (
+            SELECT company_id,
+                   MIN(CASE WHEN in_month THEN price END) AS month_min,
+                   MAX(CASE WHEN in_month THEN price END) AS month_max,
+                   AVG(CASE WHEN in_month THEN price END) AS month_avg,
+                   MIN(CASE WHEN in_year THEN price END) AS year_min,
+                   MAX(CASE WHEN in_year THEN price END) AS year_max,
+                   AVG(CASE WHEN in_year THEN price END) AS year_avg,
+                   MIN(price) AS all_min, MAX(price) AS all_max, AVG(price) AS all_avg
+            FROM prices 
+            GROUP BY company_id
+        )
+        SELECT company_id, 'monthly', ?, month_min, month_max, month_avg FROM stats WHERE month_min IS NOT NULL
+        UNION ALL
+        SELECT company_id, 'yearly', ?, year_min, year_max, year_avg FROM stats WHERE year_min IS NOT NULL
+        UNION ALL
+        SELECT company_id, 'all_time', 'all', all_min, all_max, all_avg FROM stats
+        """
+    
+    def __init__(self, db_manager: DatabaseManager):
+        self.db = db_manager
+    
+    @staticmethod
+    def _period_range(period_type: str, period_value: str) -> tuple:
         """
+        期間を日付範囲（開始日以上・終了日未満）に変換
+        
+        Args:
+            period_type: 'monthly' または 'yearly'
+            period_value: 'YYYY-MM' または 'YYYY'
+            
+        Returns:
+            tuple: (開始日, 終了日) の 'YYYY-MM-DD' 文字列
+        """
+        if period_type == 'monthly':
+            year, month = (int(part) for part in period_value.split('-'))
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+        year = int(period_value)
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    
+    def update_statistics(self, company_id: int, period_type: str, period_value: str):
+        """価格統計を更新"""
+        # 統計計算
+        if period_type in ('monthly', 'yearly'):
+            start_date, end_date = self._period_range(period_type, period_value)
+            results = self.db.execute_query(self.PERIOD_STATS_QUERY, (company_id, start_date, end_date))
+        else:  # all_time
+            results = self.db.execute_query(self.ALL_TIME_STATS_QUERY, (company_id,))
         
-        results = self.db.execute_query(stats_query, (company_id,))
         if not results or not results[0]['min_price']:
             return 0
         
@@ -416,6 +1442,112 @@ class PriceStatistics:
             stats['min_price'], stats['max_price'], stats['avg_price']
         ))
     
+    def update_statistics_bulk(self, company_ids: Iterable[int], period_type: str, period_value: str) -> int:
+        """
+        複数企業の価格統計を1期間分まとめて更新
+        
+        update_statistics を企業ごとに呼ぶ代わりに、IN句の分割ごとに1回の集計で書き込む。
+        株価がない企業の統計は作成しない。
+        
+        Args:
+            company_ids: 企業IDのイテラブル
+            period_type: 'monthly'、'yearly'、'all_time'
+            period_value: 'YYYY-MM'、'YYYY'、'all'
+            
+        Returns:
+            int: 書き込んだ統計の件数
+        """
+        rows_written = 0
+        with self.db.transaction() as conn:
+            for chunk in _id_chunks(company_ids):
+                placeholders = _placeholders(len(chunk))
+                if period_type in ('monthly', 'yearly'):
+                    start_date, end_date = self._period_range(period_type, period_value)
+                    query = self.BULK_PERIOD_UPDATE_QUERY.format(placeholders=placeholders)
+                    params = (period_type, period_value) + chunk + (start_date, end_date)
+                else:  # all_time
+                    query = self.BULK_ALL_TIME_UPDATE_QUERY.format(placeholders=placeholders)
+                    params = chunk
+                rows_written += self.db.execute_update(query, params, conn=conn)
+        return rows_written
+    
+    def update_current_statistics_bulk(self, company_ids: Iterable[int], current_month: str) -> int:
+        """
+        複数企業の当月・当年・全期間の価格統計をまとめて更新
+        
+        update_statistics_bulk を期間ごとに3回呼ぶと企業ごとの株価を3回走査するため、
+        条件付き集計で1回の走査にまとめる。
+        
+        Args:
+            company_ids: 企業IDのイテラブル
+            current_month: 当月（'YYYY-MM'、当年は先頭4文字）
+            
+        Returns:
+            int: 書き込んだ統計の件数
+        """
+        current_year = current_month[:4]
+        period_params = (self._period_range('monthly', current_month)
+                         + self._period_range('yearly', current_year))
+        rows_written = 0
+        with self.db.transaction() as conn:
+            for chunk in _id_chunks(company_ids):
+                query = self.CURRENT_PERIODS_UPDATE_QUERY.format(placeholders=_placeholders(len(chunk)))
+                params = period_params + chunk + (current_month, current_year)
+                rows_written += self.db.execute_update(query, params, conn=conn)
+        return rows_written
+    
+    def rebuild_all(self, period_type: str = None) -> int:
+        """
+        全企業の価格統計を一括で再計算
+        
+        期間ごとに update_statistics を呼ぶ代わりに、stock_prices を1回走査して
+        すべての期間の統計をまとめて書き込む。
+        
+        Args:
+            period_type: 'monthly'、'yearly'、'all_time'（省略時はすべて）
+            
+        Returns:
+            int: 書き込んだ統計の件数
+        """
+        if period_type is None:
+            period_types = list(self.REBUILD_QUERIES)
+        elif period_type in self.REBUILD_QUERIES:
+            period_types = [period_type]
+        else:
+            raise ValueError(f"不正な期間タイプです: {period_type}")
+        
+        rows_written = 0
+        with self.db.transaction() as conn:
+            for target in period_types:
+                rows_written += self.db.execute_update(self.REBUILD_QUERIES[target], conn=conn)
+        return rows_written
+    
+    def get_statistics_bulk(self, company_ids: Iterable[int], period_type: str,
+                            period_value: str = None) -> Dict[int, List[sqlite3.Row]]:
+        """
+        複数企業の価格統計をまとめて取得
+        
+        Args:
+            company_ids: 企業IDのイテラブル
+            period_type: 期間タイプ（'monthly'、'yearly'、'all_time'）
+            period_value: 期間の値（指定時はその期間のみ）
+            
+        Returns:
+            Dict[int, List[sqlite3.Row]]: 企業IDをキーとした価格統計（期間の新しい順）
+        """
+        statistics: Dict[int, List[sqlite3.Row]] = {}
+        period_filter = " AND period_value = ?" if period_value is not None else ""
+        extra_params = (period_type,) + ((period_value,) if period_value is not None else ())
+        for chunk in _id_chunks(company_ids):
+            query = f"""
+            SELECT * FROM price_statistics 
+            WHERE company_id IN ({_placeholders(len(chunk))}) AND period_type = ?{period_filter}
+            ORDER BY period_value DESC
+            """
+            for row in self.db.execute_query(query, chunk + extra_params):
+                statistics.setdefault(row['company_id'], []).append(row)
+        return statistics
+    
     def get_statistics(self, company_id: int, period_type: str = None) -> List[sqlite3.Row]:
         """価格統計を取得"""
         query = "SELECT * FROM price_statistics WHERE company_id = ?"
@@ -428,168 +1560,42 @@ class PriceStatistics:
         query += " ORDER BY period_value DESC"
         return self.db.execute_query(query, tuple(params))
 
-class TechnicalIndicators:
+class TechnicalIndicators(DatedValueModel):
     """テクニカル指標モデル"""
     
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
+    TABLE_NAME = 'technical_indicators'
+    DATE_COLUMN = 'indicator_date'
+    VALUE_FIELDS = ('rsi', 'macd', 'sma_25', 'sma_75', 'bollinger_upper', 'bollinger_lower')
+    ROW_LAYOUT = ('company_id', 'indicator_date', *VALUE_FIELDS)
+    DATA_LABEL = 'テクニカル指標'
+    DATE_LABEL = '日付'
     
     def create(self, company_id: int, indicator_date: str = None, **indicators) -> int:
         """テクニカル指標を作成（旧形式：下位互換性のため残存）"""
-        if indicator_date is None:
-            indicator_date = datetime.now().date()
-        
-        query = """
-        INSERT OR REPLACE INTO technical_indicators 
-        (company_id, indicator_date, rsi, macd, sma_25, sma_75, bollinger_upper, bollinger_lower)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """
-        
-        params = (
-            company_id,
-            indicator_date,
-            indicators.get('rsi'),
-            indicators.get('macd'),
-            indicators.get('sma_25'),
-            indicators.get('sma_75'),
-            indicators.get('bollinger_upper'),
-            indicators.get('bollinger_lower')
-        )
-        
-        return self.db.execute_insert(query, params)
+        return self._create(company_id, indicator_date, indicators)
     
     def create_or_update(self, company_id: int, indicator_date: str = None, **indicators) -> Dict[str, Union[int, str]]:
         """テクニカル指標を作成または更新（重複チェック付き）"""
-        if indicator_date is None:
-            indicator_date = datetime.now().date()
-        
-        # 既存データの確認
-        existing_query = """
-        SELECT id, rsi, macd, sma_25, sma_75, bollinger_upper, bollinger_lower 
-        FROM technical_indicators 
-        WHERE company_id = ? AND indicator_date = ?
-        """
-        existing = self.db.execute_query(existing_query, (company_id, indicator_date))
-        
-        if existing:
-            # 既存データがある場合：データ内容を比較
-            existing_data = existing[0]
-            existing_indicators = {
-                'rsi': existing_data['rsi'],
-                'macd': existing_data['macd'],
-                'sma_25': existing_data['sma_25'],
-                'sma_75': existing_data['sma_75'],
-                'bollinger_upper': existing_data['bollinger_upper'],
-                'bollinger_lower': existing_data['bollinger_lower']
-            }
-            
-            new_indicators = {
-                'rsi': indicators.get('rsi'),
-                'macd': indicators.get('macd'),
-                'sma_25': indicators.get('sma_25'),
-                'sma_75': indicators.get('sma_75'),
-                'bollinger_upper': indicators.get('bollinger_upper'),
-                'bollinger_lower': indicators.get('bollinger_lower')
-            }
-            
-            # データ差異をチェック
-            has_difference = False
-            for key in existing_indicators:
-                existing_val = existing_indicators[key]
-                new_val = new_indicators[key]
-                if existing_val is not None and new_val is not None:
-                    if abs(float(existing_val) - float(new_val)) > 0.0001:
-                        has_difference = True
-                        break
-                elif existing_val != new_val:
-                    has_difference = True
-                    break
-            
-            if has_difference:
-                # データが異なる場合は警告を返す
-                return {
-                    'id': existing_data['id'],
-                    'status': 'warning',
-                    'message': f'同一日付の異なるテクニカル指標データが既に存在します。',
-                    'existing_data': existing_indicators,
-                    'new_data': new_indicators
-                }
-            else:
-                # 同じデータの場合は何もしない
-                return {
-                    'id': existing_data['id'],
-                    'status': 'unchanged',
-                    'message': '同じテクニカル指標データが既に存在します'
-                }
-        else:
-            # 新規作成
-            query = """
-            INSERT INTO technical_indicators 
-            (company_id, indicator_date, rsi, macd, sma_25, sma_75, bollinger_upper, bollinger_lower)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            params = (
-                company_id,
-                indicator_date,
-                indicators.get('rsi'),
-                indicators.get('macd'),
-                indicators.get('sma_25'),
-                indicators.get('sma_75'),
-                indicators.get('bollinger_upper'),
-                indicators.get('bollinger_lower')
-            )
-            
-            new_id = self.db.execute_insert(query, params)
-            return {
-                'id': new_id,
-                'status': 'created',
-                'message': '新規テクニカル指標データを作成しました'
-            }
-
+        return self._create_or_update(company_id, indicator_date, indicators)
+    
     def force_update(self, company_id: int, indicator_date: str, **indicators) -> int:
         """強制更新（データ修正用）"""
-        query = """
-        UPDATE technical_indicators 
-        SET rsi = ?, macd = ?, sma_25 = ?, sma_75 = ?, bollinger_upper = ?, bollinger_lower = ?
-        WHERE company_id = ? AND indicator_date = ?
-        """
-        
-        params = (
-            indicators.get('rsi'),
-            indicators.get('macd'),
-            indicators.get('sma_25'),
-            indicators.get('sma_75'),
-            indicators.get('bollinger_upper'),
-            indicators.get('bollinger_lower'),
-            company_id,
-            indicator_date
-        )
-        
-        return self.db.execute_update(query, params)
-
+        return self._force_update(company_id, indicator_date, indicators)
+    
     def get_conflicting_data(self, company_id: int, indicator_date: str) -> Optional[sqlite3.Row]:
         """指定日の既存データを確認"""
-        query = """
-        SELECT * FROM technical_indicators 
-        WHERE company_id = ? AND indicator_date = ?
-        """
-        results = self.db.execute_query(query, (company_id, indicator_date))
-        return results[0] if results else None
+        return self._get_conflicting_data(company_id, indicator_date)
     
     def get_latest_indicators(self, company_id: int) -> Optional[sqlite3.Row]:
         """最新のテクニカル指標を取得"""
-        query = """
-        SELECT * FROM technical_indicators 
-        WHERE company_id = ? 
-        ORDER BY indicator_date DESC 
-        LIMIT 1
-        """
-        results = self.db.execute_query(query, (company_id,))
-        return results[0] if results else None
+        return self._get_latest(company_id)
+    
+    def get_latest_indicators_bulk(self, company_ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+        """複数企業の最新のテクニカル指標をまとめて取得（企業IDをキーとした辞書）"""
+        return self._get_latest_bulk(company_ids)
 
-# データベースマネージャーのシングルトンインスタンス
-db_manager = DatabaseManager()
+# データベースマネージャーのシングルトンインスタンス（設定のDATABASE_PATHを使い、接続は初回利用時に確立）
+db_manager = DatabaseManager(get_config().DATABASE_PATH)
 
 # モデルインスタンス
 company_model = Company(db_manager)
@@ -1,36 +1,167 @@
-from flask import Blueprint, request, jsonify
-from datetime import datetime
+from flask import Blueprint, request, jsonify, send_from_directory, current_app, url_for
+from datetime import datetime, timedelta
+import hashlib
+import itertools
 import json
 import os
-import sys
 import logging
+from operator import itemgetter
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import traceback
 
-# プロジェクトルートをパスに追加
-from backend.utils.path_utils import setup_project_path
-setup_project_path()
+try:
+    import orjson
+except ImportError:  # orjsonが無い環境では標準のjsonでシリアライズする
+    orjson = None
+
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:  # ijsonが無い環境ではインポートデータを一括で解析する
+    ijson = None
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
 
+from backend.middleware.error_handlers import register_blueprint_error_handlers
+from backend.utils.api_helpers import SqlPageSource, paginate_response
+from backend.utils.cache import response_cache
+from backend.utils.task_manager import task_manager
+from backend.utils.statistics_queue import statistics_queue
+from backend.utils.token_manager import JQuantsTokenManager
+
+# 外部データ取得モジュールは起動時に1回だけ読み込む（yfinance・pandas等の読み込みをリクエストで待たせない）
+# 依存パッケージが無い環境でも他のAPIは利用できるよう、失敗時は取得APIの呼び出し時にエラーを返す
+try:
+    from backend.utils.stock_batch_processor import StockBatchProcessor
+    _STOCK_PROCESSOR_ERROR = None
+except ImportError as e:
+    StockBatchProcessor = None
+    _STOCK_PROCESSOR_ERROR = e
+
+try:
+    from backend.utils.jquants_data_fetcher import JQuantsDataFetcher
+    from backend.utils.jquants_batch_processor import JQuantsBatchProcessor
+    _JQUANTS_MODULE_ERROR = None
+except ImportError as e:
+    JQuantsDataFetcher = JQuantsBatchProcessor = None
+    _JQUANTS_MODULE_ERROR = e
+
 # データベースモデルのインポート
 from backend.models.database import (
-    company_model, stock_price_model, financial_metrics_model,
+    Company, company_model, stock_price_model, financial_metrics_model,
     price_statistics_model, technical_indicators_model, db_manager
 )
 
 # APIブループリントの作成
 api = Blueprint('api', __name__, url_prefix='/api')
+register_blueprint_error_handlers(api, as_json=True)
+
+# レスポンスキャッシュのキーと有効期限（秒）
+COMPANIES_CACHE_KEY = 'companies:all'
+COMPANIES_CACHE_TTL = 300
+COMPANY_DETAIL_CACHE_TTL = 600
+SEARCH_CACHE_TTL = 60
+JQUANTS_TOKEN_STATUS_CACHE_TTL = 10
+
+# 企業一覧のページ取得（?limit= / ?per_page=）の既定件数と上限
+COMPANIES_PAGE_SIZE = 100
+COMPANIES_PAGE_SIZE_MAX = 1000
+
+# データを書き換えるエンドポイント（リクエスト後にレスポンスキャッシュを破棄）
+DATA_WRITE_ENDPOINTS = {
+    'api.register_company', 'api.add_stock_price_safe', 'api.add_financial_metrics_safe',
+    'api.add_technical_indicators_safe', 'api.force_update_stock_price', 'api.import_data',
+    'api.fetch_stock_data', 'api.fetch_single_stock_data', 'api.fetch_jquants_data',
+    'api.fetch_single_jquants_data', 'api.load_and_import_file', 'api.create_company',
+    'api.update_company', 'api.delete_company',
+}
+
+def invalidate_response_cache():
+    """企業一覧・企業詳細・検索結果のレスポンスキャッシュを破棄"""
+    response_cache.delete(COMPANIES_CACHE_KEY)
+    response_cache.delete_prefix('company:')
+    response_cache.delete_prefix('search:')
+
+# 価格統計のバックグラウンド更新が終わったら、統計を含むレスポンスのキャッシュを破棄
+statistics_queue.on_drained = invalidate_response_cache
+
+def _cached_response(cache_key: str):
+    """キャッシュ済みのレスポンス本文があれば、再シリアライズせずにレスポンスを返す（無い場合はNone）"""
+    body = response_cache.get_text(cache_key)
+    if body is None:
+        return None
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+def _cache_response(cache_key: str, result: dict, ttl: float):
+    """結果をJSONに1回だけシリアライズし、その本文をキャッシュしてレスポンスを返す"""
+    body = current_app.json.dumps(result)
+    response_cache.set_text(cache_key, body, ttl=ttl)
+    return current_app.response_class(body, mimetype=current_app.json.mimetype)
+
+@api.after_request
+def invalidate_cache_after_write(response):
+    """書き込み系エンドポイントの処理後にキャッシュを破棄（途中で失敗した場合も含む）"""
+    if request.endpoint in DATA_WRITE_ENDPOINTS:
+        invalidate_response_cache()
+    return response
 
 @api.route('/companies', methods=['GET'])
 def get_companies():
-    """企業一覧を取得"""
+    """
+    企業一覧を取得
+    
+    page・per_page を指定した場合は企業コード順の指定ページと件数情報（pagination）を返す。
+    limit・offset・after_id のいずれかを指定した場合はid順の1ページ分を返す。
+    次ページは next_after_id を after_id に指定して取得する。
+    """
     try:
+        if 'page' in request.args or 'per_page' in request.args:
+            page = request.args.get('page', 1, type=int)
+            per_page = min(request.args.get('per_page', COMPANIES_PAGE_SIZE, type=int), COMPANIES_PAGE_SIZE_MAX)
+            if page <= 0 or per_page <= 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'pageとper_pageは1以上で指定してください'
+                }), 400
+            
+            # 件数とページをSQLiteで取得する（全件をメモリに展開しない）
+            source = SqlPageSource(db_manager, Company.LIST_QUERY)
+            return jsonify(paginate_response(source, page, per_page))
+        
+        if any(name in request.args for name in ('limit', 'offset', 'after_id')):
+            limit = min(request.args.get('limit', COMPANIES_PAGE_SIZE, type=int), COMPANIES_PAGE_SIZE_MAX)
+            offset = request.args.get('offset', 0, type=int)
+            after_id = request.args.get('after_id', 0, type=int)
+            if limit <= 0 or offset < 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'limitは1以上、offsetは0以上で指定してください'
+                }), 400
+            
+            companies = company_model.get_page(limit, offset, after_id)
+            return jsonify({
+                'success': True,
+                'data': companies,
+                'count': len(companies),
+                'next_after_id': companies[-1]['id'] if len(companies) == limit else None
+            })
+        
+        cached = _cached_response(COMPANIES_CACHE_KEY)
+        if cached is not None:
+            return cached
+        
         companies = company_model.search()
-        return jsonify({
+        result = {
             'success': True,
-            'data': [dict(company) for company in companies],
+            'data': companies,
             'count': len(companies)
-        })
+        }
+        return _cache_response(COMPANIES_CACHE_KEY, result, COMPANIES_CACHE_TTL)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -39,7 +170,12 @@ def get_companies():
 
 @api.route('/companies/search', methods=['POST'])
 def search_companies():
-    """企業検索"""
+    """
+    企業検索
+    
+    検索条件がすべて空の場合は企業一覧（キャッシュ済み）を返す。
+    株価・財務指標などの詳細が必要な場合は include_details: true を指定する。
+    """
     try:
         data = request.get_json() or {}
         
@@ -47,81 +183,30 @@ def search_companies():
         company_name = data.get('company_name', '')
         sector = data.get('sector', '')
         
-        # 基本的な企業検索
-        companies = company_model.search(symbol=symbol, name=company_name, sector=sector)
-        
-        # 各企業の詳細情報を追加
-        detailed_companies = []
-        for company in companies:
-            company_data = dict(company)
-            
-            # 最新株価を取得
-            latest_price = stock_price_model.get_latest_price(company['id'])
-            if latest_price:
-                company_data['current_price'] = latest_price['price']
-                company_data['price_date'] = latest_price['price_date']
-                company_data['volume'] = latest_price['volume']
-            else:
-                company_data['current_price'] = None
-                company_data['price_date'] = None
-                company_data['volume'] = None
-            
-            # 最新財務指標を取得
-            latest_metrics = financial_metrics_model.get_latest_metrics(company['id'])
-            if latest_metrics:
-                company_data['pbr'] = latest_metrics['pbr']
-                company_data['per'] = latest_metrics['per']
-                company_data['equity_ratio'] = latest_metrics['equity_ratio']
-                company_data['roe'] = latest_metrics['roe']
-                company_data['roa'] = latest_metrics['roa']
-                company_data['report_date'] = latest_metrics['report_date']
-            else:
-                company_data.update({
-                    'pbr': None, 'per': None, 'equity_ratio': None,
-                    'roe': None, 'roa': None, 'report_date': None
-                })
-            
-            # 価格統計を取得
-            current_month = datetime.now().strftime('%Y-%m')
-            current_year = datetime.now().strftime('%Y')
-            
-            monthly_stats = price_statistics_model.get_statistics(company['id'], 'monthly')
-            yearly_stats = price_statistics_model.get_statistics(company['id'], 'yearly')
-            all_time_stats = price_statistics_model.get_statistics(company['id'], 'all_time')
-            
-            # 統計データを追加
-            company_data['monthly_min'] = None
-            company_data['monthly_max'] = None
-            company_data['yearly_min'] = None
-            company_data['yearly_max'] = None
-            company_data['all_time_min'] = None
-            company_data['all_time_max'] = None
-            
-            for stat in monthly_stats:
-                if stat['period_value'] == current_month:
-                    company_data['monthly_min'] = stat['min_price']
-                    company_data['monthly_max'] = stat['max_price']
-                    break
-            
-            for stat in yearly_stats:
-                if stat['period_value'] == current_year:
-                    company_data['yearly_min'] = stat['min_price']
-                    company_data['yearly_max'] = stat['max_price']
-                    break
-            
-            for stat in all_time_stats:
-                if stat['period_value'] == 'all':
-                    company_data['all_time_min'] = stat['min_price']
-                    company_data['all_time_max'] = stat['max_price']
-                    break
-            
-            detailed_companies.append(company_data)
-        
-        return jsonify({
+        # 条件なしで詳細も不要な場合は企業一覧のキャッシュを使う
+        if not any([symbol, company_name, sector]) and not data.get('include_details'):
+            return get_companies()
+        
+        # 同じ検索条件の結果はキャッシュから返す
+        cache_key = 'search:' + hashlib.sha1(
+            json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        # 最新株価・財務指標（company_latest）と価格統計を結合して1クエリで取得
+        current_month = datetime.now().strftime('%Y-%m')
+        companies = company_model.search_with_details(
+            symbol=symbol, name=company_name, sector=sector,
+            current_month=current_month, current_year=current_month[:4]
+        )
+        result = {
             'success': True,
-            'data': detailed_companies,
-            'count': len(detailed_companies)
-        })
+            'data': companies,
+            'count': len(companies)
+        }
+        return _cache_response(cache_key, result, SEARCH_CACHE_TTL)
     
     except Exception as e:
         return jsonify({
@@ -133,6 +218,11 @@ def search_companies():
 def get_company_detail(company_id):
     """企業詳細情報を取得"""
     try:
+        cache_key = f'company:{company_id}'
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
         company = company_model.get_by_id(company_id)
         if not company:
             return jsonify({
@@ -144,7 +234,7 @@ def get_company_detail(company_id):
         
         # 株価履歴
         price_history = stock_price_model.get_price_history(company_id, 30)
-        company_data['price_history'] = [dict(price) for price in price_history]
+        company_data['price_history'] = price_history
         
         # 財務指標（売上高・営業利益があるデータを優先取得）
         latest_metrics = financial_metrics_model.get_latest_metrics(company_id)
@@ -172,16 +262,17 @@ def get_company_detail(company_id):
         
         # テクニカル指標
         latest_indicators = technical_indicators_model.get_latest_indicators(company_id)
-        company_data['technical_indicators'] = dict(latest_indicators) if latest_indicators else None
+        company_data['technical_indicators'] = latest_indicators
         
         # 価格統計
         statistics = price_statistics_model.get_statistics(company_id)
-        company_data['price_statistics'] = [dict(stat) for stat in statistics]
+        company_data['price_statistics'] = statistics
         
-        return jsonify({
+        result = {
             'success': True,
             'data': company_data
-        })
+        }
+        return _cache_response(cache_key, result, COMPANY_DETAIL_CACHE_TTL)
     
     except Exception as e:
         return jsonify({
@@ -201,52 +292,41 @@ def register_company():
                 'error': '企業コードと企業名は必須です'
             }), 400
         
-        # 企業情報の登録/更新
-        existing_company = company_model.get_by_symbol(data['symbol'])
-        if existing_company:
-            company_id = existing_company['id']
-            company_model.update(company_id, **{
-                k: v for k, v in data.items() 
-                if k in ['name', 'sector', 'market']
-            })
-        else:
-            company_id = company_model.create(
-                data['symbol'], data['name'],
-                data.get('sector', ''), data.get('market', '')
-            )
-        
-        # 株価情報の登録（旧形式：下位互換性のため）
-        if 'price' in data:
-            stock_price_model.create(
-                company_id, data['price'],
-                data.get('price_date'), data.get('volume', 0)
+        # 企業情報と付随データを1トランザクションで登録（途中で失敗した場合はまとめて取り消す）
+        with db_manager.transaction():
+            # 企業情報の登録/更新（存在確認と作成・更新を1文で行う）
+            company_id = company_model.register(
+                data['symbol'], data['name'], data.get('sector'), data.get('market')
             )
             
-            # 価格統計の更新
-            current_month = datetime.now().strftime('%Y-%m')
-            current_year = datetime.now().strftime('%Y')
+            # 株価情報の登録（旧形式：下位互換性のため）
+            if 'price' in data:
+                stock_price_model.create(
+                    company_id, data['price'],
+                    data.get('price_date'), data.get('volume', 0)
+                )
             
-            price_statistics_model.update_statistics(company_id, 'monthly', current_month)
-            price_statistics_model.update_statistics(company_id, 'yearly', current_year)
-            price_statistics_model.update_statistics(company_id, 'all_time', 'all')
-        
-        # 財務指標の登録（旧形式：下位互換性のため）
-        financial_fields = ['pbr', 'per', 'equity_ratio', 'roe', 'roa', 'net_sales', 'operating_profit']
-        if any(field in data for field in financial_fields):
-            metrics = {field: data.get(field) for field in financial_fields}
-            # report_dateが指定されていない場合は、price_dateを使用
-            report_date = data.get('report_date') or data.get('price_date')
-            financial_metrics_model.create(
-                company_id, report_date, **metrics
-            )
-        
-        # テクニカル指標の登録（旧形式：下位互換性のため）
-        technical_fields = ['rsi', 'macd', 'sma_25', 'sma_75', 'bollinger_upper', 'bollinger_lower']
-        if any(field in data for field in technical_fields):
-            indicators = {field: data.get(field) for field in technical_fields}
-            technical_indicators_model.create(
-                company_id, data.get('indicator_date'), **indicators
-            )
+            # 財務指標の登録（旧形式：下位互換性のため）
+            financial_fields = ['pbr', 'per', 'equity_ratio', 'roe', 'roa', 'net_sales', 'operating_profit']
+            if any(field in data for field in financial_fields):
+                metrics = {field: data.get(field) for field in financial_fields}
+                # report_dateが指定されていない場合は、price_dateを使用
+                report_date = data.get('report_date') or data.get('price_date')
+                financial_metrics_model.create(
+                    company_id, report_date, **metrics
+                )
+            
+            # テクニカル指標の登録（旧形式：下位互換性のため）
+            technical_fields = ['rsi', 'macd', 'sma_25', 'sma_75', 'bollinger_upper', 'bollinger_lower']
+            if any(field in data for field in technical_fields):
+                indicators = {field: data.get(field) for field in technical_fields}
+                technical_indicators_model.create(
+                    company_id, data.get('indicator_date'), **indicators
+                )
+        
+        # 価格統計の更新（コミット後にバックグラウンドで実行）
+        if 'price' in data:
+            statistics_queue.schedule(company_id, data.get('price_date'))
         
         return jsonify({
             'success': True,
@@ -260,25 +340,110 @@ def register_company():
             'error': str(e)
         }), 500
 
+# 安全なデータ投入・強制更新APIの必須項目（指定順に取り出し、最初に欠けている項目でKeyErrorになる）
+STOCK_PRICE_REQUIRED_FIELDS = itemgetter('company_id', 'price')
+DATED_VALUE_REQUIRED_FIELDS = itemgetter('company_id')
+STOCK_PRICE_UPDATE_REQUIRED_FIELDS = itemgetter('company_id', 'price_date', 'price')
+
+def _rows_field_error(rows: list, required_fields: itemgetter):
+    """
+    一括登録（rows）の各行の必須項目を確認
+    
+    Args:
+        rows: 登録する行のリスト
+        required_fields: 各行に必須の項目を取り出すitemgetter
+        
+    Returns:
+        エラーメッセージ（問題が無ければNone）
+    """
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            return f'rows[{index}]はオブジェクトである必要があります'
+        try:
+            required_fields(row)
+        except KeyError as e:
+            return f'rows[{index}]: {e.args[0]}は必須です'
+    return None
+
+def _batch_result(results: list) -> dict:
+    """一括登録の結果に状態ごとの件数（created・warning・unchanged）を付けたレスポンスを作成"""
+    counts = {'created': 0, 'warning': 0, 'unchanged': 0}
+    for result in results:
+        counts[result['status']] += 1
+    return {
+        'success': True,
+        'results': results,
+        'counts': counts
+    }
+
+def _add_dated_values_safe(data: dict, model, date_field: str, value_fields: list, missing_message: str):
+    """
+    財務指標・テクニカル指標を安全に追加（rowsを指定した場合は1トランザクションで一括登録）
+    
+    Args:
+        data: リクエストのJSON
+        model: 登録先のモデル
+        date_field: 日付の項目名
+        value_fields: 受け付ける指標の項目名
+        missing_message: 指標が1つも無い場合のエラーメッセージ
+    """
+    rows = data.get('rows')
+    if not isinstance(rows, list):
+        rows = None
+    
+    # 必須パラメータのチェック
+    error = _rows_field_error(rows if rows is not None else [data], DATED_VALUE_REQUIRED_FIELDS)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error if rows is not None else 'company_idは必須です'
+        }), 400
+    
+    batch = []
+    for index, row in enumerate(rows if rows is not None else [data]):
+        values = {field: row.get(field) for field in value_fields if field in row}
+        if not values:
+            return jsonify({
+                'success': False,
+                'error': f'rows[{index}]: {missing_message}' if rows is not None else missing_message
+            }), 400
+        values['company_id'] = row['company_id']
+        values[date_field] = row.get(date_field)
+        batch.append(values)
+    
+    # 安全なデータ投入
+    if rows is None:
+        values = batch[0]
+        result = model.create_or_update(values.pop('company_id'), values.pop(date_field), **values)
+        return jsonify({
+            'success': True,
+            'result': result
+        })
+    
+    return jsonify(_batch_result(model.create_or_update_many(batch)))
+
 @api.route('/data/stock_price/safe', methods=['POST'])
 def add_stock_price_safe():
-    """株価データを安全に追加（重複チェック付き）"""
+    """株価データを安全に追加（重複チェック付き、rowsを指定した場合は一括登録）"""
     try:
         data = request.get_json()
         
+        if isinstance(data.get('rows'), list):
+            return _add_stock_prices_safe(data['rows'])
+        
         # 必須パラメータのチェック
-        required_fields = ['company_id', 'price']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'{field}は必須です'
-                }), 400
+        try:
+            company_id, price = STOCK_PRICE_REQUIRED_FIELDS(data)
+        except KeyError as e:
+            return jsonify({
+                'success': False,
+                'error': f'{e.args[0]}は必須です'
+            }), 400
         
         # 安全なデータ投入
         result = stock_price_model.create_or_update(
-            data['company_id'],
-            data['price'],
+            company_id,
+            price,
             data.get('price_date'),
             data.get('volume', 0)
         )
@@ -288,23 +453,10 @@ def add_stock_price_safe():
             'result': result
         }
         
-        # 新規作成の場合は価格統計も更新
+        # 新規作成の場合は価格統計も更新（バックグラウンドで実行）
         if result['status'] == 'created':
-            company_id = data['company_id']
-            price_date = data.get('price_date') or datetime.now().date()
-            
-            if isinstance(price_date, str):
-                from datetime import datetime as dt
-                price_date = dt.strptime(price_date, '%Y-%m-%d').date()
-            
-            current_month = price_date.strftime('%Y-%m')
-            current_year = price_date.strftime('%Y')
-            
-            price_statistics_model.update_statistics(company_id, 'monthly', current_month)
-            price_statistics_model.update_statistics(company_id, 'yearly', current_year)
-            price_statistics_model.update_statistics(company_id, 'all_time', 'all')
-            
-            response_data['statistics_updated'] = True
+            statistics_queue.schedule(company_id, data.get('price_date'))
+            response_data['statistics_update_scheduled'] = True
         
         return jsonify(response_data)
     
@@ -314,40 +466,52 @@ def add_stock_price_safe():
             'error': str(e)
         }), 500
 
+def _add_stock_prices_safe(rows: list):
+    """
+    株価データを1トランザクションで一括追加（重複チェック付き）
+    
+    価格統計の更新は新規作成された行の (企業ID, 月) ごとに1回だけ予約する。
+    
+    Args:
+        rows: company_id・price（必須）、price_date・volumeを持つ辞書のリスト
+    """
+    error = _rows_field_error(rows, STOCK_PRICE_REQUIRED_FIELDS)
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error
+        }), 400
+    
+    results = []
+    statistics_keys = set()
+    with db_manager.transaction():
+        for row in rows:
+            company_id, price = STOCK_PRICE_REQUIRED_FIELDS(row)
+            price_date = row.get('price_date')
+            result = stock_price_model.create_or_update(company_id, price, price_date, row.get('volume', 0))
+            results.append(result)
+            if result['status'] == 'created':
+                statistics_keys.add((company_id, str(price_date)[:7] if price_date else None))
+    
+    # 価格統計の更新（コミット後にバックグラウンドで実行）
+    for company_id, month in statistics_keys:
+        statistics_queue.schedule(company_id, month)
+    
+    response_data = _batch_result(results)
+    response_data['statistics_update_scheduled'] = bool(statistics_keys)
+    return jsonify(response_data)
+
 @api.route('/data/financial_metrics/safe', methods=['POST'])
 def add_financial_metrics_safe():
-    """財務指標データを安全に追加（重複チェック付き）"""
+    """財務指標データを安全に追加（重複チェック付き、rowsを指定した場合は一括登録）"""
     try:
-        data = request.get_json()
-        
-        # 必須パラメータのチェック
-        if 'company_id' not in data:
-            return jsonify({
-                'success': False,
-                'error': 'company_idは必須です'
-            }), 400
-        
-        # 財務指標フィールドのチェック
-        financial_fields = ['pbr', 'per', 'equity_ratio', 'roe', 'roa']
-        metrics = {field: data.get(field) for field in financial_fields if field in data}
-        
-        if not metrics:
-            return jsonify({
-                'success': False,
-                'error': '少なくとも一つの財務指標が必要です'
-            }), 400
-        
-        # 安全なデータ投入
-        result = financial_metrics_model.create_or_update(
-            data['company_id'],
-            data.get('report_date'),
-            **metrics
+        return _add_dated_values_safe(
+            request.get_json(),
+            financial_metrics_model,
+            'report_date',
+            ['pbr', 'per', 'equity_ratio', 'roe', 'roa'],
+            '少なくとも一つの財務指標が必要です'
         )
-        
-        return jsonify({
-            'success': True,
-            'result': result
-        })
     
     except Exception as e:
         return jsonify({
@@ -357,38 +521,15 @@ def add_financial_metrics_safe():
 
 @api.route('/data/technical_indicators/safe', methods=['POST'])
 def add_technical_indicators_safe():
-    """テクニカル指標データを安全に追加（重複チェック付き）"""
+    """テクニカル指標データを安全に追加（重複チェック付き、rowsを指定した場合は一括登録）"""
     try:
-        data = request.get_json()
-        
-        # 必須パラメータのチェック
-        if 'company_id' not in data:
-            return jsonify({
-                'success': False,
-                'error': 'company_idは必須です'
-            }), 400
-        
-        # テクニカル指標フィールドのチェック
-        technical_fields = ['rsi', 'macd', 'sma_25', 'sma_75', 'bollinger_upper', 'bollinger_lower']
-        indicators = {field: data.get(field) for field in technical_fields if field in data}
-        
-        if not indicators:
-            return jsonify({
-                'success': False,
-                'error': '少なくとも一つのテクニカル指標が必要です'
-            }), 400
-        
-        # 安全なデータ投入
-        result = technical_indicators_model.create_or_update(
-            data['company_id'],
-            data.get('indicator_date'),
-            **indicators
+        return _add_dated_values_safe(
+            request.get_json(),
+            technical_indicators_model,
+            'indicator_date',
+            ['rsi', 'macd', 'sma_25', 'sma_75', 'bollinger_upper', 'bollinger_lower'],
+            '少なくとも一つのテクニカル指標が必要です'
         )
-        
-        return jsonify({
-            'success': True,
-            'result': result
-        })
     
     except Exception as e:
         return jsonify({
@@ -403,18 +544,16 @@ def force_update_stock_price():
         data = request.get_json()
         
         # 必須パラメータのチェック
-        required_fields = ['company_id', 'price_date', 'price']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({
-                    'success': False,
-                    'error': f'{field}は必須です'
-                }), 400
+        try:
+            company_id, price_date, price = STOCK_PRICE_UPDATE_REQUIRED_FIELDS(data)
+        except KeyError as e:
+            return jsonify({
+                'success': False,
+                'error': f'{e.args[0]}は必須です'
+            }), 400
         
         # 既存データの確認
-        existing = stock_price_model.get_conflicting_data(
-            data['company_id'], data['price_date']
-        )
+        existing = stock_price_model.get_conflicting_data(company_id, price_date)
         
         if not existing:
             return jsonify({
@@ -424,9 +563,9 @@ def force_update_stock_price():
         
         # 強制更新
         rows_updated = stock_price_model.force_update(
-            data['company_id'],
-            data['price'],
-            data['price_date'],
+            company_id,
+            price,
+            price_date,
             data.get('volume', 0)
         )
         
@@ -442,33 +581,173 @@ def force_update_stock_price():
             'error': str(e)
         }), 500
 
+# エクスポートファイルの保存先（ファイル一覧・読み込みAPIと同じjsonfileディレクトリ）
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'jsonfile')
+
+# jsonfileディレクトリのファイル名として受け付ける形式（パス区切り・".."を含まない .json ファイル）
+DATA_FILENAME_PATTERN = re.compile(r'(?!.*\.\.)[^/\\\x00]+\.json', re.DOTALL)
+
+# エクスポート対象のテーブル
+EXPORT_TABLES = ('companies', 'stock_prices', 'financial_metrics', 'price_statistics', 'technical_indicators')
+
+# ファイル一覧・読み込みAPIで返す日時の形式
+FILE_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# ファイル一覧で返せる項目（?fields= で絞り込み可能）
+FILE_INFO_FIELDS = ('filename', 'size', 'modified_date', 'created_date')
+
+
+def _file_info(filename: str, file_stats: os.stat_result) -> dict:
+    """ファイル情報（日時はdatetimeを経由せずローカル時刻で整形）"""
+    return {
+        'filename': filename,
+        'size': file_stats.st_size,
+        'modified_date': time.strftime(FILE_TIMESTAMP_FORMAT, time.localtime(file_stats.st_mtime)),
+        'created_date': time.strftime(FILE_TIMESTAMP_FORMAT, time.localtime(file_stats.st_ctime))
+    }
+
+
+def _export_default(value):
+    """エクスポート時のJSON変換（sqlite3.Rowは辞書、それ以外は文字列）"""
+    return dict(value) if isinstance(value, sqlite3.Row) else str(value)
+
+
+def _dump_json(value) -> bytes:
+    """エクスポート用に値をJSON（UTF-8バイト列）へ変換"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_export_default)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_export_default).encode('utf-8')
+
+
+def _write_json_export(filepath: str, table_rows) -> dict:
+    """
+    テーブルの行を {テーブル名: [行, ...]} 形式のJSONとしてファイルへ逐次書き出す
+    
+    行はfetchmanyで分割取得して1行ずつ書き込むため、メモリ使用量はテーブルの件数に依存しない。
+    書き込み途中のファイルがファイル一覧に出ないよう、一時ファイルに書いてから置き換える。
+    
+    Args:
+        filepath: 出力先ファイルパス
+        table_rows: (テーブル名, 行のイテラブル) のイテラブル
+        
+    Returns:
+        dict: テーブルごとの出力件数
+    """
+    temp_path = filepath + '.tmp'
+    counts = {}
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(b'{')
+            for table_index, (table, rows) in enumerate(table_rows):
+                if table_index:
+                    f.write(b',')
+                f.write(_dump_json(table) + b':[')
+                row_count = 0
+                for row in rows:
+                    if row_count:
+                        f.write(b',')
+                    f.write(_dump_json(row))
+                    row_count += 1
+                f.write(b']')
+                counts[table] = row_count
+            f.write(b'}')
+        os.replace(temp_path, filepath)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return counts
+
+def _table_rows(table: str):
+    """エクスポートするテーブルの全行をid順に逐次取得"""
+    return db_manager.execute_query_iter(f"SELECT * FROM {table} ORDER BY id")
+
+def _write_chunked_export(base_name: str, chunk_rows: int) -> list:
+    """
+    テーブルごとにchunk_rows行ずつ別ファイルへ書き出す
+    
+    各ファイルは通常のエクスポートと同じ {テーブル名: [行, ...]} 形式のため、
+    ファイル単位で読み込み・インポートできる。空のテーブルも1ファイル出力する。
+    
+    Args:
+        base_name: ファイル名の接頭辞（例: kabu_data_export_20240101_000000）
+        chunk_rows: 1ファイルあたりの行数
+        
+    Returns:
+        list: 出力したファイルの一覧（ファイル名・テーブル名・件数・ダウンロードURL）
+    """
+    files = []
+    for table in EXPORT_TABLES:
+        rows = _table_rows(table)
+        try:
+            chunk_index = 1
+            while True:
+                chunk = itertools.islice(rows, chunk_rows)
+                filename = f'{base_name}_{table}_{chunk_index:03d}.json'
+                counts = _write_json_export(os.path.join(EXPORT_DIR, filename), [(table, chunk)])
+                if counts[table] == 0 and chunk_index > 1:
+                    # 前のファイルで行がちょうど尽きた場合は空ファイルを残さない
+                    os.remove(os.path.join(EXPORT_DIR, filename))
+                    break
+                files.append({
+                    'filename': filename,
+                    'table': table,
+                    'rows': counts[table],
+                    'download_url': url_for('api.download_export_file', filename=filename)
+                })
+                if counts[table] < chunk_rows:
+                    break
+                chunk_index += 1
+        finally:
+            rows.close()
+    return files
+
 @api.route('/export', methods=['GET'])
 def export_data():
-    """データベースのJSONエクスポート"""
+    """
+    データベースのJSONエクスポート
+    
+    ?chunk_rows= を指定した場合はテーブルごとに指定行数ずつ別ファイルへ分割し、
+    ファイル一覧（files）を返す。
+    """
     try:
-        # 全テーブルのデータを取得
-        tables = ['companies', 'stock_prices', 'financial_metrics', 'price_statistics', 'technical_indicators']
-        export_data = {}
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base_name = f'kabu_data_export_{timestamp}'
+        os.makedirs(EXPORT_DIR, exist_ok=True)
         
-        for table in tables:
-            query = f"SELECT * FROM {table}"
-            rows = db_manager.execute_query(query)
-            export_data[table] = [dict(row) for row in rows]
+        chunk_rows = request.args.get('chunk_rows', type=int)
+        if chunk_rows is not None:
+            if chunk_rows <= 0:
+                return jsonify({
+                    'success': False,
+                    'error': 'chunk_rowsは1以上で指定してください'
+                }), 400
+            
+            files = _write_chunked_export(base_name, chunk_rows)
+            exported_counts = {table: 0 for table in EXPORT_TABLES}
+            for file_info in files:
+                exported_counts[file_info['table']] += file_info['rows']
+            return jsonify({
+                'success': True,
+                'message': f'データが {len(files)} ファイルに分割してエクスポートされました',
+                'files': files,
+                'exported_counts': exported_counts
+            })
         
-        # JSONファイルとして保存
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'kabu_data_export_{timestamp}.json'
-        filepath = os.path.join('jsonfile', filename)
+        # 全テーブルの行をファイルへ逐次書き出す（全件をメモリに展開しない）
+        filename = f'{base_name}.json'
+        filepath = os.path.join(EXPORT_DIR, filename)
         
-        os.makedirs('jsonfile', exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, ensure_ascii=False, indent=2, default=str)
+        exported_counts = _write_json_export(filepath, ((table, _table_rows(table)) for table in EXPORT_TABLES))
         
+        # 本文にはデータを含めず、ダウンロードは /export/download/<filename> から行う
         return jsonify({
             'success': True,
             'message': f'データが {filename} にエクスポートされました',
             'filename': filename,
-            'export_data': export_data
+            'size_bytes': os.path.getsize(filepath),
+            'exported_counts': exported_counts,
+            'download_url': url_for('api.download_export_file', filename=filename)
         })
     
     except Exception as e:
@@ -477,72 +756,187 @@ def export_data():
             'error': str(e)
         }), 500
 
+def _send_data_file(filename: str, as_attachment: bool = False):
+    """
+    jsonfileディレクトリのファイルを解析せずにそのまま送信
+    
+    send_from_directoryはファイルから直接送信し（サーバーが対応していればsendfile）、
+    Range・If-Modified-Sinceにも対応する。
+    
+    Args:
+        filename: ファイル名
+        as_attachment: ダウンロード（Content-Disposition: attachment）として送るか
+    """
+    # セキュリティ: ファイル名の検証（パストラバーサル攻撃防止）
+    if not DATA_FILENAME_PATTERN.fullmatch(filename):
+        return jsonify({
+            'success': False,
+            'error': '無効なファイル名です'
+        }), 400
+    
+    if not os.path.isfile(os.path.join(EXPORT_DIR, filename)):
+        return jsonify({
+            'success': False,
+            'error': 'ファイルが見つかりません'
+        }), 404
+    
+    return send_from_directory(EXPORT_DIR, filename, as_attachment=as_attachment, mimetype='application/json')
+
+@api.route('/export/download/<filename>', methods=['GET'])
+def download_export_file(filename):
+    """エクスポートファイルをダウンロード"""
+    return _send_data_file(filename, as_attachment=True)
+
+def _import_companies(rows) -> int:
+    """企業データのインポート（既存の株式コードは企業名・業種・市場を更新）"""
+    return company_model.upsert_many(
+        (row['symbol'], row['name'], row.get('sector', ''), row.get('market', ''))
+        for row in rows
+        if isinstance(row, dict) and row.get('symbol') and row.get('name')
+    )
+
+def _import_stock_prices(rows) -> int:
+    """株価データのインポート（同じ企業・日付の既存データは価格・出来高を上書き）"""
+    return stock_price_model.upsert_many(
+        (row['company_id'], row['price'], row['price_date'], row.get('volume', 0))
+        for row in rows
+        if isinstance(row, dict) and all(row.get(key) is not None
+                                         for key in ('company_id', 'price', 'price_date'))
+    )
+
+def _import_financial_metrics(rows) -> int:
+    """財務指標データのインポート（同じ企業・報告日の既存データは全項目を上書き）"""
+    layout = financial_metrics_model.ROW_LAYOUT
+    return financial_metrics_model.upsert_many(
+        tuple(row.get(column) for column in layout)
+        for row in rows
+        if isinstance(row, dict) and row.get('company_id') is not None
+        and row.get('report_date') is not None
+    )
+
+# インポート対象のテーブルと取り込み処理（必須項目が欠けた行は除外し、件数は実際に作成・更新された行数）
+TABLE_IMPORTERS = {
+    'companies': _import_companies,
+    'stock_prices': _import_stock_prices,
+    'financial_metrics': _import_financial_metrics,
+}
+
+# この件数ずつ解析・投入する（ストリーミングインポート時）
+IMPORT_BATCH_SIZE = 1000
+
+# このサイズを超えるリクエストはijsonで逐次解析する（バイト）
+IMPORT_STREAM_THRESHOLD = 1024 * 1024
+
+# 逐次解析するリクエストを一時ファイルへ受信する単位（バイト）
+IMPORT_SPOOL_CHUNK_SIZE = 64 * 1024
+
+def _import_tables(content: dict) -> dict:
+    """
+    エクスポート形式のデータ（{テーブル名: [行, ...]}）を取り込む
+    
+    既存行はINSERTの競合句（ON CONFLICT DO UPDATE）で上書きするため、行ごとの例外処理は行わない。
+    
+    Args:
+        content: 取り込むデータ
+        
+    Returns:
+        dict: テーブルごとの取り込み件数
+    """
+    imported_counts = {}
+    
+    # 全件を1トランザクションでインポート（テーブルごとにexecutemanyで一括投入）
+    with db_manager.transaction():
+        for table, importer in TABLE_IMPORTERS.items():
+            if table in content:
+                imported_counts[table] = importer(content[table])
+    return imported_counts
+
+def _iter_import_batches(stream, batch_size: int = IMPORT_BATCH_SIZE):
+    """
+    エクスポート形式のJSONを読みながら、インポート対象テーブルの行を一定件数ずつ返す
+    
+    行オブジェクトは1件ずつ組み立てるため、メモリ使用量はリクエストサイズに依存しない。
+    
+    Args:
+        stream: JSONのバイトストリーム
+        batch_size: 1回に返す最大件数
+        
+    Yields:
+        tuple: (テーブル名, 行のリスト)（テーブルの配列の開始時は空のリスト）
+    """
+    table, item_prefix, batch, builder = None, None, [], None
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event == 'end_map' and prefix == item_prefix:
+                batch.append(builder.value)
+                builder = None
+                if len(batch) >= batch_size:
+                    yield table, batch
+                    batch = []
+        elif event == 'start_array' and prefix in TABLE_IMPORTERS:
+            # 空の配列のテーブルも取り込み対象として通知する
+            if batch:
+                yield table, batch
+                batch = []
+            yield prefix, []
+        elif event == 'start_map' and prefix.endswith('.item') and prefix[:-5] in TABLE_IMPORTERS:
+            if prefix != item_prefix and batch:
+                yield table, batch
+                batch = []
+            table, item_prefix = prefix[:-5], prefix
+            builder = ObjectBuilder()
+            builder.event(event, value)
+    if batch:
+        yield table, batch
+
+def _import_stream(stream) -> dict:
+    """
+    エクスポート形式のJSONストリームを逐次解析しながら取り込む
+    
+    受信が遅いアップロードの間に書き込みロック（BEGIN IMMEDIATE）を保持しないよう、
+    本文を一時ファイルに受信し終えてからトランザクションを開始する。
+    
+    Args:
+        stream: JSONのバイトストリーム
+        
+    Returns:
+        dict: テーブルごとの取り込み件数（インポート対象のテーブルが無い場合は空）
+    """
+    imported_counts = {}
+    with tempfile.TemporaryFile() as spool:
+        shutil.copyfileobj(stream, spool, IMPORT_SPOOL_CHUNK_SIZE)
+        spool.seek(0)
+        with db_manager.transaction():
+            for table, rows in _iter_import_batches(spool):
+                count = TABLE_IMPORTERS[table](rows) if rows else 0
+                imported_counts[table] = imported_counts.get(table, 0) + count
+    return imported_counts
+
 @api.route('/import', methods=['POST'])
 def import_data():
-    """JSONデータのインポート"""
+    """JSONデータのインポート（大きなリクエストはijsonが利用可能なら逐次解析）"""
     try:
-        data = request.get_json()
+        if ijson is not None and request.content_length != 0 and (
+                request.content_length is None or request.content_length > IMPORT_STREAM_THRESHOLD):
+            imported_counts = _import_stream(request.stream)
+        else:
+            data = request.get_json()
+            
+            if not data:
+                return jsonify({
+                    'success': False,
+                    'error': 'インポートするデータがありません'
+                }), 400
+            
+            imported_counts = _import_tables(data)
         
-        if not data:
+        if not imported_counts:
             return jsonify({
                 'success': False,
-                'error': 'インポートするデータがありません'
+                'error': f'インポート対象のテーブル（{", ".join(TABLE_IMPORTERS)}）がありません'
             }), 400
         
-        imported_counts = {}
-        
-        # 企業データのインポート
-        if 'companies' in data:
-            count = 0
-            for company_data in data['companies']:
-                try:
-                    company_model.create(
-                        company_data['symbol'], company_data['name'],
-                        company_data.get('sector', ''), company_data.get('market', '')
-                    )
-                    count += 1
-                except:
-                    # 重複の場合は更新
-                    existing = company_model.get_by_symbol(company_data['symbol'])
-                    if existing:
-                        company_model.update(existing['id'], **{
-                            k: v for k, v in company_data.items()
-                            if k in ['name', 'sector', 'market']
-                        })
-                        count += 1
-            imported_counts['companies'] = count
-        
-        # 株価データのインポート
-        if 'stock_prices' in data:
-            count = 0
-            for price_data in data['stock_prices']:
-                try:
-                    stock_price_model.create(
-                        price_data['company_id'], price_data['price'],
-                        price_data['price_date'], price_data.get('volume', 0)
-                    )
-                    count += 1
-                except:
-                    pass  # 重複は無視
-            imported_counts['stock_prices'] = count
-        
-        # 財務指標データのインポート
-        if 'financial_metrics' in data:
-            count = 0
-            for metrics_data in data['financial_metrics']:
-                try:
-                    metrics = {k: v for k, v in metrics_data.items() 
-                             if k in ['pbr', 'per', 'equity_ratio', 'roe', 'roa']}
-                    financial_metrics_model.create(
-                        metrics_data['company_id'],
-                        metrics_data['report_date'],
-                        **metrics
-                    )
-                    count += 1
-                except:
-                    pass  # 重複は無視
-            imported_counts['financial_metrics'] = count
-        
         return jsonify({
             'success': True,
             'message': 'データが正常にインポートされました',
@@ -555,17 +949,25 @@ def import_data():
             'error': str(e)
         }), 500
 
+def _process_all_companies_task(processor, force_update: bool, max_companies):
+    """全企業のデータ取得（バックグラウンドタスク用・完了後にレスポンスキャッシュを破棄）"""
+    try:
+        return processor.process_all_companies(force_update, max_companies)
+    finally:
+        invalidate_response_cache()
+
 @api.route('/stock-data/fetch', methods=['POST'])
 def fetch_stock_data():
     """株価・財務データの手動取得"""
     try:
-        # 株価データ処理モジュールのインポート
-        from backend.utils.stock_batch_processor import StockBatchProcessor
+        if StockBatchProcessor is None:
+            raise _STOCK_PROCESSOR_ERROR
         
         data = request.get_json()
         force_update = data.get('force_update', False) if data else False
         max_companies = data.get('max_companies') if data else None
-        specific_symbols = data.get('symbols', []) if data else []
+        # 企業コードは文字列で保存されているため、数値で指定された場合（[7203] など）も文字列にそろえる
+        specific_symbols = [str(symbol) for symbol in data.get('symbols', [])] if data else []
         
         processor = StockBatchProcessor()
         
@@ -574,11 +976,12 @@ def fetch_stock_data():
             results = []
             companies = []
             
-            # 指定されたシンボルの企業情報を取得
+            # 指定されたシンボルの企業情報をまとめて取得
+            found = company_model.get_by_symbols(specific_symbols)
             for symbol in specific_symbols:
-                company = company_model.get_by_symbol(symbol)
+                company = found.get(symbol)
                 if company:
-                    companies.append(dict(company))
+                    companies.append(company)
                 else:
                     results.append({
                         'symbol': symbol,
@@ -586,10 +989,8 @@ def fetch_stock_data():
                         'message': f'企業コード {symbol} は登録されていません'
                     })
             
-            # 見つかった企業を処理
-            for company in companies:
-                result = processor.process_company_data(company, force_update)
-                results.append(result)
+            # 見つかった企業を並列に処理
+            results.extend(processor.process_companies(companies, force_update))
             
             summary = {
                 'total': len(specific_symbols),
@@ -606,7 +1007,17 @@ def fetch_stock_data():
                 'details': results
             })
         
-        # 全企業の一括処理
+        # 全企業の一括処理（async指定時はバックグラウンドで実行し、タスクIDを返す）
+        elif data and data.get('async'):
+            task_id = task_manager.submit(
+                'stock-data-fetch', _process_all_companies_task, processor, force_update, max_companies
+            )
+            return jsonify({
+                'success': True,
+                'message': '全企業のデータ取得をバックグラウンドで開始しました',
+                'task_id': task_id,
+                'status_url': url_for('api.get_task_status', task_id=task_id)
+            }), 202
         else:
             result = processor.process_all_companies(force_update, max_companies)
             return jsonify(result)
@@ -623,11 +1034,27 @@ def fetch_stock_data():
             'error': str(e)
         }), 500
 
+@api.route('/tasks/<task_id>', methods=['GET'])
+def get_task_status(task_id):
+    """バックグラウンドタスクの状態を取得"""
+    task = task_manager.get(task_id)
+    if task is None:
+        return jsonify({
+            'success': False,
+            'error': 'タスクが見つかりません'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'data': task
+    })
+
 @api.route('/stock-data/fetch/<symbol>', methods=['POST'])
 def fetch_single_stock_data(symbol):
     """単一企業の株価・財務データ取得"""
     try:
-        from backend.utils.stock_batch_processor import StockBatchProcessor
+        if StockBatchProcessor is None:
+            raise _STOCK_PROCESSOR_ERROR
         
         data = request.get_json()
         force_update = data.get('force_update', False) if data else False
@@ -641,7 +1068,7 @@ def fetch_single_stock_data(symbol):
             }), 404
         
         processor = StockBatchProcessor()
-        result = processor.process_company_data(dict(company), force_update)
+        result = processor.process_company_data(company, force_update)
         
         return jsonify({
             'success': result['status'] == 'success',
@@ -661,47 +1088,41 @@ def fetch_single_stock_data(symbol):
             'error': str(e)
         }), 500
 
+# 株価データの更新状況（企業ごとの最新株価日をまとめて集計し、1回のクエリで返す）
+# 最新株価日が基準日より前、または株価データが無い企業を「要更新」とする
+STOCK_DATA_STATUS_QUERY = """
+    SELECT
+        COUNT(*) AS total_companies,
+        COUNT(p.latest_date) AS companies_with_price_data,
+        MAX(p.latest_date) AS last_updated,
+        SUM(CASE WHEN p.latest_date IS NULL OR p.latest_date < ? THEN 1 ELSE 0 END) AS companies_need_update,
+        SUM(EXISTS (SELECT 1 FROM financial_metrics f WHERE f.company_id = c.id)) AS companies_with_financial_data
+    FROM companies c
+    LEFT JOIN (
+        SELECT company_id, MAX(price_date) AS latest_date
+        FROM stock_prices
+        GROUP BY company_id
+    ) p ON p.company_id = c.id
+    """
+
 @api.route('/stock-data/status', methods=['GET'])
 def get_stock_data_status():
     """株価データの更新状況を確認"""
     try:
-        companies = company_model.search()
-        total_companies = len(companies)
+        cutoff_date = (datetime.now() - timedelta(days=1)).date().isoformat()
+        
+        total, with_price, last_date, need_update, with_financial = db_manager.execute_query_fast(
+            STOCK_DATA_STATUS_QUERY, (cutoff_date,)
+        )[0]
         
         status_info = {
-            'total_companies': total_companies,
-            'companies_with_price_data': 0,
-            'companies_with_financial_data': 0,
-            'last_updated': None,
-            'companies_need_update': 0
+            'total_companies': total,
+            'companies_with_price_data': with_price,
+            'companies_with_financial_data': with_financial or 0,
+            'last_updated': datetime.fromisoformat(last_date).isoformat() if last_date else None,
+            'companies_need_update': need_update or 0
         }
         
-        from datetime import datetime, timedelta
-        cutoff_date = datetime.now() - timedelta(days=1)
-        
-        for company in companies:
-            company_dict = dict(company)
-            company_id = company_dict['id']
-            
-            # 株価データの確認
-            latest_price = stock_price_model.get_latest_price(company_id)
-            if latest_price:
-                status_info['companies_with_price_data'] += 1
-                
-                price_date = datetime.fromisoformat(latest_price['price_date'])
-                if not status_info['last_updated'] or price_date > datetime.fromisoformat(status_info['last_updated']):
-                    status_info['last_updated'] = price_date.isoformat()
-                
-                if price_date.date() < cutoff_date.date():
-                    status_info['companies_need_update'] += 1
-            else:
-                status_info['companies_need_update'] += 1
-            
-            # 財務データの確認
-            financial_data = financial_metrics_model.get_latest_metrics(company_id)
-            if financial_data:
-                status_info['companies_with_financial_data'] += 1
-        
         return jsonify({
             'success': True,
             'data': status_info
@@ -717,13 +1138,14 @@ def get_stock_data_status():
 def fetch_jquants_data():
     """J-Quants API株価・財務データの手動取得"""
     try:
-        # J-Quants株価データ処理モジュールのインポート
-        from backend.utils.jquants_batch_processor import JQuantsBatchProcessor
+        if JQuantsBatchProcessor is None:
+            raise _JQUANTS_MODULE_ERROR
         
         data = request.get_json()
         force_update = data.get('force_update', False) if data else False
         max_companies = data.get('max_companies') if data else None
-        specific_symbols = data.get('symbols', []) if data else []
+        # 企業コードは文字列で保存されているため、数値で指定された場合（[7203] など）も文字列にそろえる
+        specific_symbols = [str(symbol) for symbol in data.get('symbols', [])] if data else []
         target_date = data.get('date') if data else None  # 特定日付の指定
         
         # 認証情報の取得（環境変数、リクエスト、または保存済みトークンから）
@@ -742,11 +1164,12 @@ def fetch_jquants_data():
             results = []
             companies = []
             
-            # 指定されたシンボルの企業情報を取得
+            # 指定されたシンボルの企業情報をまとめて取得
+            found = company_model.get_by_symbols(specific_symbols)
             for symbol in specific_symbols:
-                company = company_model.get_by_symbol(symbol)
+                company = found.get(symbol)
                 if company:
-                    companies.append(dict(company))
+                    companies.append(company)
                 else:
                     results.append({
                         'symbol': symbol,
@@ -754,10 +1177,8 @@ def fetch_jquants_data():
                         'message': f'企業コード {symbol} は登録されていません'
                     })
             
-            # 見つかった企業を処理
-            for company in companies:
-                result = processor.process_company_data(company, force_update, target_date)
-                results.append(result)
+            # 見つかった企業を並列に処理
+            results.extend(processor.process_companies(companies, force_update, target_date))
             
             summary = {
                 'total': len(specific_symbols),
@@ -795,7 +1216,8 @@ def fetch_jquants_data():
 def fetch_single_jquants_data(symbol):
     """単一企業のJ-Quants API株価・財務データ取得"""
     try:
-        from backend.utils.jquants_batch_processor import JQuantsBatchProcessor
+        if JQuantsBatchProcessor is None:
+            raise _JQUANTS_MODULE_ERROR
         
         data = request.get_json()
         force_update = data.get('force_update', False) if data else False
@@ -815,7 +1237,7 @@ def fetch_single_jquants_data(symbol):
             }), 404
         
         processor = JQuantsBatchProcessor(email, password, refresh_token)
-        result = processor.process_company_data(dict(company), force_update, target_date)
+        result = processor.process_company_data(company, force_update, target_date)
         
         return jsonify({
             'success': result['status'] == 'success',
@@ -839,7 +1261,8 @@ def fetch_single_jquants_data(symbol):
 def get_jquants_status():
     """J-Quants APIの利用状況を確認"""
     try:
-        from backend.utils.jquants_data_fetcher import JQuantsDataFetcher
+        if JQuantsDataFetcher is None:
+            raise _JQUANTS_MODULE_ERROR
         
         # 認証情報なしでステータスのみ確認
         fetcher = JQuantsDataFetcher()
@@ -860,7 +1283,8 @@ def get_jquants_status():
 def test_jquants_auth():
     """J-Quants API認証テスト（デバッグ用）"""
     try:
-        from backend.utils.jquants_data_fetcher import JQuantsDataFetcher
+        if JQuantsDataFetcher is None:
+            raise _JQUANTS_MODULE_ERROR
         
         data = request.get_json()
         refresh_token = data.get('refresh_token')
@@ -909,13 +1333,16 @@ def test_jquants_auth():
             }), 401
             
     except Exception as e:
-        import traceback
         return jsonify({
             'success': False,
             'error': f'認証テスト中にエラーが発生しました: {str(e)}',
             'traceback': traceback.format_exc()
         }), 500
 
+# トークンの文字種チェック（英数字・ハイフン・アンダースコアのみで、英数字を1文字以上含む）
+# 置換で文字列をコピーせずに1回の走査で判定する
+TOKEN_CHARS_PATTERN = re.compile(r'(?=[-_]*[^\W_])[\w-]+')
+
 @api.route('/jquants-data/validate-token', methods=['POST'])
 def validate_jquants_token():
     """J-Quants APIリフレッシュトークンの形式チェック"""
@@ -923,14 +1350,15 @@ def validate_jquants_token():
         data = request.get_json()
         refresh_token = data.get('refresh_token', '')
         
-        # トークンの基本チェック
+        # トークンの基本チェック（長さは1回だけ数える）
+        length = len(refresh_token)
         checks = {
-            'length': len(refresh_token),
-            'not_empty': bool(refresh_token.strip()),
+            'length': length,
+            'not_empty': bool(refresh_token) and not refresh_token.isspace(),
             'no_spaces': ' ' not in refresh_token,
-            'alphanumeric_check': refresh_token.replace('-', '').replace('_', '').isalnum(),
-            'min_length': len(refresh_token) >= 32,
-            'max_length': len(refresh_token) <= 512
+            'alphanumeric_check': TOKEN_CHARS_PATTERN.fullmatch(refresh_token) is not None,
+            'min_length': length >= 32,
+            'max_length': length <= 512
         }
         
         # J-Quants APIの実際の形式チェック（実測値に基づく）
@@ -939,10 +1367,10 @@ def validate_jquants_token():
         if not checks['not_empty']:
             suspected_issues.append('トークンが空です')
         
-        if checks['length'] < 100:
+        if length < 100:
             suspected_issues.append('トークンが短すぎます（100文字未満）')
         
-        if checks['length'] > 2500:
+        if length > 2500:
             suspected_issues.append('トークンが長すぎます（2500文字超過）')
         
         if not checks['no_spaces']:
@@ -959,12 +1387,12 @@ def validate_jquants_token():
         return jsonify({
             'success': True,
             'token_info': {
-                'length': checks['length'],
+                'length': length,
                 'valid_format': len(suspected_issues) == 0,
                 'is_jwt_like': is_jwt_like,
                 'jwt_parts': jwt_parts + 1 if jwt_parts >= 0 else 0,
                 'first_20_chars': refresh_token[:20] if refresh_token else '',
-                'last_20_chars': refresh_token[-20:] if len(refresh_token) >= 20 else '',
+                'last_20_chars': refresh_token[-20:] if length >= 20 else '',
                 'suspected_issues': suspected_issues,
                 'checks': checks
             },
@@ -983,12 +1411,20 @@ def validate_jquants_token():
             'error': str(e)
         }), 500
 
+# トークン管理（初回使用時に作成し、以降のリクエストで再利用）
+_token_manager = None
+
+def _get_token_manager() -> JQuantsTokenManager:
+    """トークン管理を取得（トークンDBの初期化は初回のみ）"""
+    global _token_manager
+    if _token_manager is None:
+        _token_manager = JQuantsTokenManager()
+    return _token_manager
+
 @api.route('/jquants-token/save', methods=['POST'])
 def save_jquants_token():
     """J-Quants APIリフレッシュトークンを保存"""
     try:
-        from backend.utils.token_manager import JQuantsTokenManager
-        
         data = request.get_json()
         refresh_token = data.get('refresh_token')
         plan_type = data.get('plan_type', 'Standard')
@@ -1000,8 +1436,9 @@ def save_jquants_token():
                 'error': 'リフレッシュトークンが提供されていません'
             }), 400
         
-        token_manager = JQuantsTokenManager()
+        token_manager = _get_token_manager()
         success = token_manager.save_refresh_token(refresh_token, user_identifier, plan_type)
+        response_cache.delete(f'jquants_token_status:{user_identifier}')
         
         if success:
             expiry_info = token_manager.check_token_expiry(user_identifier)
@@ -1024,12 +1461,15 @@ def save_jquants_token():
 
 @api.route('/jquants-token/status', methods=['GET'])
 def get_jquants_token_status():
-    """J-Quants APIトークンの状況を確認"""
+    """J-Quants APIトークンの状況を確認（画面からのポーリング向けに短時間キャッシュ）"""
     try:
-        from backend.utils.token_manager import JQuantsTokenManager
-        
         user_identifier = request.args.get('user_identifier', 'default')
-        token_manager = JQuantsTokenManager()
+        cache_key = f'jquants_token_status:{user_identifier}'
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            return cached
+        
+        token_manager = _get_token_manager()
         
         # トークンの有効期限チェック
         expiry_info = token_manager.check_token_expiry(user_identifier)
@@ -1050,10 +1490,16 @@ def get_jquants_token_status():
                 'last_used_at': token_info.get('last_used_at')
             }
         
-        return jsonify({
+        # 有効期限を過ぎてキャッシュが残らないよう、期限までの秒数を上限にする
+        ttl = JQUANTS_TOKEN_STATUS_CACHE_TTL
+        if token_info:
+            seconds_remaining = (datetime.fromisoformat(token_info['expires_at']) - datetime.now()).total_seconds()
+            ttl = max(1, min(ttl, seconds_remaining))
+        
+        return _cache_response(cache_key, {
             'success': True,
             'data': result
-        })
+        }, ttl)
         
     except Exception as e:
         return jsonify({
@@ -1063,32 +1509,40 @@ def get_jquants_token_status():
 
 @api.route('/files/list', methods=['GET'])
 def list_data_files():
-    """jsonfileディレクトリ内のファイル一覧を取得"""
+    """
+    jsonfileディレクトリ内のファイル一覧を取得
+    
+    ?fields=filename,size のように返す項目を指定できる（省略時は全項目）。
+    ファイル名のみの場合はファイルごとのstatを行わない。
+    """
     try:
-        jsonfile_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'jsonfile')
+        fields_param = request.args.get('fields')
+        fields = [field for field in fields_param.split(',') if field in FILE_INFO_FIELDS] if fields_param else []
+        fields = fields or list(FILE_INFO_FIELDS)
+        needs_stat = any(field != 'filename' for field in fields)
         
-        if not os.path.exists(jsonfile_dir):
+        if not os.path.exists(EXPORT_DIR):
             return jsonify({
                 'success': True,
                 'data': [],
                 'message': 'jsonfileディレクトリが見つかりません'
             })
         
-        files = []
-        for filename in os.listdir(jsonfile_dir):
-            if filename.endswith('.json'):
-                filepath = os.path.join(jsonfile_dir, filename)
-                file_stats = os.stat(filepath)
-                
-                files.append({
-                    'filename': filename,
-                    'size': file_stats.st_size,
-                    'modified_date': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                    'created_date': datetime.fromtimestamp(file_stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-                })
-        
-        # 更新日時でソート（新しい順）
-        files.sort(key=lambda x: x['modified_date'], reverse=True)
+        # scandirはディレクトリ読み込み時の情報を使うため、ファイルごとのパス組み立てが不要
+        # 並び順のキー（更新日時、statしない場合はファイル名）とファイル情報の組
+        entries_info = []
+        with os.scandir(EXPORT_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    if needs_stat:
+                        file_stats = entry.stat()
+                        entries_info.append((file_stats.st_mtime, _file_info(entry.name, file_stats)))
+                    else:
+                        entries_info.append((entry.name, {'filename': entry.name}))
+        
+        # 新しい順にソート（エクスポートファイル名は日時を含むため、ファイル名順でも概ね新しい順）
+        entries_info.sort(key=lambda item: item[0], reverse=True)
+        files = [{field: info[field] for field in fields} for _, info in entries_info]
         
         return jsonify({
             'success': True,
@@ -1102,63 +1556,85 @@ def list_data_files():
             'error': str(e)
         }), 500
 
-@api.route('/files/load/<filename>', methods=['GET'])
-def load_data_file(filename):
-    """指定されたJSONファイルの内容を読み込み"""
+def _load_json(raw):
+    """JSON（文字列・バイト列）を解析（orjsonが利用可能な場合はorjsonを使う）"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _read_data_file(filename: str) -> tuple:
+    """
+    jsonfileディレクトリのJSONファイルを読み込む
+    
+    Args:
+        filename: ファイル名
+        
+    Returns:
+        tuple: (レスポンス用の辞書, HTTPステータスコード)
+    """
+    # セキュリティ: ファイル名の検証（パストラバーサル攻撃防止）
+    if not DATA_FILENAME_PATTERN.fullmatch(filename):
+        # 拡張子だけが異なる場合はその旨を返す（不正な名前の判定は失敗時のみ行う）
+        if filename and not any(part in filename for part in ('..', '/', '\\', '\x00')):
+            error = 'JSONファイルのみ読み込み可能です'
+        else:
+            error = '無効なファイル名です'
+        return {
+            'success': False,
+            'error': error
+        }, 400
+    
+    filepath = os.path.join(EXPORT_DIR, filename)
+    
+    # 開いたファイルのfstatで存在・サイズ・日時をまとめて確認する
     try:
-        # セキュリティ: ファイル名の検証（パストラバーサル攻撃防止）
-        if not filename or '..' in filename or '/' in filename or '\\' in filename:
-            return jsonify({
-                'success': False,
-                'error': '無効なファイル名です'
-            }), 400
-        
-        if not filename.endswith('.json'):
-            return jsonify({
-                'success': False,
-                'error': 'JSONファイルのみ読み込み可能です'
-            }), 400
-        
-        jsonfile_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'jsonfile')
-        filepath = os.path.join(jsonfile_dir, filename)
-        
-        if not os.path.exists(filepath):
-            return jsonify({
-                'success': False,
-                'error': 'ファイルが見つかりません'
-            }), 404
+        f = open(filepath, 'rb')
+    except (FileNotFoundError, IsADirectoryError):
+        return {
+            'success': False,
+            'error': 'ファイルが見つかりません'
+        }, 404
+    
+    with f:
+        file_stats = os.fstat(f.fileno())
         
         # ファイルサイズチェック（10MB制限）
-        file_size = os.path.getsize(filepath)
-        if file_size > 10 * 1024 * 1024:  # 10MB
-            return jsonify({
+        if file_stats.st_size > 10 * 1024 * 1024:  # 10MB
+            return {
                 'success': False,
                 'error': 'ファイルサイズが大きすぎます（最大10MB）'
-            }), 413
-        
-        # JSONファイルを読み込み
-        with open(filepath, 'r', encoding='utf-8') as f:
-            file_content = json.load(f)
+            }, 413
         
-        # ファイル情報も含めて返す
-        file_stats = os.stat(filepath)
+        # JSONファイルを読み込み（バイト列のまま解析する）
+        try:
+            file_content = _load_json(f.read())
+        except json.JSONDecodeError as e:  # orjson.JSONDecodeErrorも含む
+            return {
+                'success': False,
+                'error': f'JSONファイルの解析に失敗しました: {str(e)}'
+            }, 400
+    
+    # ファイル情報も含めて返す
+    return {
+        'success': True,
+        'data': file_content,
+        'file_info': _file_info(filename, file_stats)
+    }, 200
+
+@api.route('/files/load/<filename>', methods=['GET'])
+def load_data_file(filename):
+    """
+    指定されたJSONファイルの内容を読み込み
+    
+    ?raw=1 の場合はファイル情報で包まず、ファイルの内容をそのまま返す（解析・再シリアライズしない）。
+    """
+    try:
+        if request.args.get('raw') == '1':
+            return _send_data_file(filename)
         
-        return jsonify({
-            'success': True,
-            'data': file_content,
-            'file_info': {
-                'filename': filename,
-                'size': file_stats.st_size,
-                'modified_date': datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
-                'created_date': datetime.fromtimestamp(file_stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-            }
-        })
+        result, status = _read_data_file(filename)
+        return jsonify(result), status
     
-    except json.JSONDecodeError as e:
-        return jsonify({
-            'success': False,
-            'error': f'JSONファイルの解析に失敗しました: {str(e)}'
-        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1169,69 +1645,16 @@ def load_data_file(filename):
 def load_and_import_file(filename):
     """ファイル読み込みと同時にデータベースにインポート"""
     try:
-        # まずファイルを読み込み
-        load_response = load_data_file(filename)
-        load_data = json.loads(load_response.data)
+        # まずファイルを読み込み（レスポンスを経由せず解析結果をそのまま使う）
+        load_data, status = _read_data_file(filename)
         
         if not load_data['success']:
-            return load_response
+            return jsonify(load_data), status
         
         # インポート処理を実行
         file_content = load_data['data']
         
-        imported_counts = {}
-        
-        # 企業データのインポート
-        if 'companies' in file_content:
-            count = 0
-            for company_data in file_content['companies']:
-                try:
-                    company_model.create(
-                        company_data['symbol'], company_data['name'],
-                        company_data.get('sector', ''), company_data.get('market', '')
-                    )
-                    count += 1
-                except:
-                    # 重複の場合は更新
-                    existing = company_model.get_by_symbol(company_data['symbol'])
-                    if existing:
-                        company_model.update(existing['id'], **{
-                            k: v for k, v in company_data.items()
-                            if k in ['name', 'sector', 'market']
-                        })
-                        count += 1
-            imported_counts['companies'] = count
-        
-        # 株価データのインポート
-        if 'stock_prices' in file_content:
-            count = 0
-            for price_data in file_content['stock_prices']:
-                try:
-                    stock_price_model.create(
-                        price_data['company_id'], price_data['price'],
-                        price_data['price_date'], price_data.get('volume', 0)
-                    )
-                    count += 1
-                except:
-                    pass  # 重複は無視
-            imported_counts['stock_prices'] = count
-        
-        # 財務指標データのインポート
-        if 'financial_metrics' in file_content:
-            count = 0
-            for metrics_data in file_content['financial_metrics']:
-                try:
-                    metrics = {k: v for k, v in metrics_data.items() 
-                             if k in ['pbr', 'per', 'equity_ratio', 'roe', 'roa']}
-                    financial_metrics_model.create(
-                        metrics_data['company_id'],
-                        metrics_data['report_date'],
-                        **metrics
-                    )
-                    count += 1
-                except:
-                    pass  # 重複は無視
-            imported_counts['financial_metrics'] = count
+        imported_counts = _import_tables(file_content)
         
         return jsonify({
             'success': True,
@@ -1262,7 +1685,8 @@ def search_company_by_name():
             }), 400
         
         # J-Quants APIで企業検索
-        from backend.utils.jquants_data_fetcher import JQuantsDataFetcher
+        if JQuantsDataFetcher is None:
+            raise _JQUANTS_MODULE_ERROR
         
         fetcher = JQuantsDataFetcher()
         jquants_results = fetcher.search_companies_by_name(company_name, limit=10)
@@ -1518,10 +1942,10 @@ def delete_company(company_id):
             dependencies['stock_prices'] = cursor.fetchone()[0]
             cursor.execute("DELETE FROM stock_prices WHERE company_id = ?", (company_id,))
             
-            # 企業情報を削除
+            # 企業情報を削除（ブロック終了時にまとめてCOMMIT）
             cursor.execute("DELETE FROM companies WHERE id = ?", (company_id,))
-            
-            conn.commit()
+        
+        company_model.clear_cache()
         
         total_deleted = sum(dependencies.values())
         
@@ -2,9 +2,11 @@
 Webページルーティング（非API）
 """
 from flask import Blueprint, render_template
+from backend.middleware.error_handlers import register_blueprint_error_handlers
 
 # Webページ用ブループリント
 web = Blueprint('web', __name__)
+register_blueprint_error_handlers(web, as_json=False)
 
 
 @web.route('/')
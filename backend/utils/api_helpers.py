@@ -3,7 +3,7 @@ API共通ヘルパー関数
 """
 from functools import wraps
 from flask import jsonify
-from typing import Callable, Any, Tuple, Dict
+from typing import Callable, Any, Tuple, Dict, Iterable
 
 
 class ValidationError(Exception):
@@ -16,6 +16,18 @@ class BusinessLogicError(Exception):
     pass
 
 
+# 例外クラスごとのエラーメッセージ形式とHTTPステータスコード（サブクラスは継承元の設定を使う）
+_ERROR_HANDLERS: Dict[type, Tuple[str, int]] = {
+    ValidationError: ('{}', 400),
+    BusinessLogicError: ('{}', 422),
+    ValueError: ('無効な値です: {}', 400),
+    KeyError: ('必須フィールドが不足しています: {}', 400),
+}
+
+# 必須フィールドで未入力とみなす値
+_EMPTY_VALUES = (None, '')
+
+
 def create_success_response(data: Any = None, message: str = None, **kwargs) -> Dict:
     """
     成功レスポンスを作成
@@ -75,16 +87,13 @@ def handle_api_error(error: Exception, default_status: int = 500) -> Tuple[Dict,
     Returns:
         Tuple[Dict, int]: エラーレスポンスとステータスコード
     """
-    if isinstance(error, ValidationError):
-        return create_error_response(str(error), 400)
-    elif isinstance(error, BusinessLogicError):
-        return create_error_response(str(error), 422)
-    elif isinstance(error, ValueError):
-        return create_error_response(f"無効な値です: {str(error)}", 400)
-    elif isinstance(error, KeyError):
-        return create_error_response(f"必須フィールドが不足しています: {str(error)}", 400)
-    else:
-        return create_error_response(f"サーバーエラーが発生しました: {str(error)}", default_status)
+    # 例外クラスの継承順（具象クラスから順）に対応表を引く
+    for error_class in type(error).__mro__:
+        handler = _ERROR_HANDLERS.get(error_class)
+        if handler is not None:
+            message_format, status = handler
+            return create_error_response(message_format.format(error), status)
+    return create_error_response(f"サーバーエラーが発生しました: {str(error)}", default_status)
 
 
 def api_error_handler(func: Callable) -> Callable:
@@ -112,22 +121,19 @@ def api_error_handler(func: Callable) -> Callable:
     return wrapper
 
 
-def validate_required_fields(data: Dict, required_fields: list) -> None:
+def validate_required_fields(data: Dict, required_fields: Iterable[str]) -> None:
     """
     必須フィールドのバリデーション
     
     Args:
         data: バリデーション対象のデータ
-        required_fields: 必須フィールドのリスト
+        required_fields: 必須フィールド（呼び出し側でモジュール定数のタプル等として定義しておく）
         
     Raises:
         ValidationError: 必須フィールドが不足している場合
     """
-    missing_fields = []
-    
-    for field in required_fields:
-        if field not in data or data[field] is None or data[field] == '':
-            missing_fields.append(field)
+    # 未指定はget()がNoneを返すため、1回の参照で未指定・None・空文字をまとめて判定する
+    missing_fields = [field for field in required_fields if data.get(field) in _EMPTY_VALUES]
     
     if missing_fields:
         raise ValidationError(f"以下の必須フィールドが不足しています: {', '.join(missing_fields)}")
@@ -165,23 +171,58 @@ def validate_json_request(func: Callable) -> Callable:
     return wrapper
 
 
-def paginate_response(data: list, page: int = 1, per_page: int = 20) -> Dict:
+class SqlPageSource:
+    """
+    SQLクエリの結果をデータベース側でページ分割するページネーション用データソース
+    
+    件数は SELECT COUNT(*) で、ページは LIMIT/OFFSET を付けたクエリで取得するため、
+    全件をメモリに展開しない。
+    """
+    
+    def __init__(self, db, base_sql: str, params: tuple = ()):
+        """
+        初期化
+        
+        Args:
+            db: execute_query(query, params) を持つデータベースマネージャー
+            base_sql: ページ分割するSELECT文（並び順はORDER BYで固定しておく）
+            params: base_sql のパラメータ
+        """
+        self.db = db
+        self.base_sql = base_sql
+        self.params = tuple(params)
+    
+    def count(self) -> int:
+        """全件数を取得"""
+        return self.db.execute_query(f"SELECT COUNT(*) FROM ({self.base_sql})", self.params)[0][0]
+    
+    def page(self, offset: int, limit: int) -> list:
+        """指定位置から limit 件を取得"""
+        return self.db.execute_query(f"{self.base_sql} LIMIT ? OFFSET ?", self.params + (limit, offset))
+
+
+def paginate_response(source, page: int = 1, per_page: int = 20) -> Dict:
     """
     ページネーション付きレスポンスを作成
     
     Args:
-        data: ページネーション対象のデータ
+        source: ページネーション対象のデータ（リスト、または count() と page(offset, limit)
+            を持つデータソース。SqlPageSource を渡すと件数とページをSQLiteで取得する）
         page: ページ番号（1から開始）
         per_page: ページあたりのアイテム数
         
     Returns:
         Dict: ページネーション情報付きのレスポンス
     """
-    total = len(data)
     start = (page - 1) * per_page
     end = start + per_page
     
-    paginated_data = data[start:end]
+    if isinstance(source, (list, tuple)):
+        total = len(source)
+        paginated_data = source[start:end]
+    else:
+        total = source.count()
+        paginated_data = source.page(start, per_page) if start < total else []
     
     return create_success_response(
         data=paginated_data,
@@ -0,0 +1,270 @@
+"""
+インプロセスキャッシュユーティリティ
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from config.settings import get_config
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def json_default(value: Any) -> Any:
+    """
+    JSONシリアライズ時の変換（json/orjsonのdefaultに渡す）
+    
+    sqlite3.Rowはdictに変換せずにそのまま返せるよう、シリアライズ時に辞書として出力する。
+    """
+    if isinstance(value, sqlite3.Row):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TTLCache:
+    """
+    件数上限（LRU）と有効期限（TTL）付きのスレッドセーフなキャッシュ
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60.0):
+        """
+        初期化
+
+        Args:
+            maxsize: 最大保持件数（超過時は最も古く使われたものから破棄）
+            ttl: 有効期限（秒）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        値を取得（期限切れの場合はdefault）
+
+        Args:
+            key: キャッシュキー
+            default: 見つからない場合の値
+
+        Returns:
+            Any: キャッシュされた値またはdefault
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        値を保存
+
+        Args:
+            key: キャッシュキー
+            value: 保存する値
+            ttl: 個別の有効期限（秒、省略時は既定値）
+        """
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """
+        条件に一致するキーを削除
+
+        Args:
+            predicate: 削除対象ならTrueを返す関数
+
+        Returns:
+            int: 削除した件数
+        """
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        """全件削除"""
+        with self._lock:
+            self._data.clear()
+
+
+_config = get_config()
+
+# モデル層のレコードキャッシュ（キーの先頭要素はテーブル名）
+# 破棄は自プロセスにしか届かないため、複数ワーカーの場合は件数上限0として保持しない
+record_cache = TTLCache(maxsize=10_000 if _config.WEB_CONCURRENCY == 1 else 0, ttl=60)
+
+
+def bust_table_cache(table_name: str) -> int:
+    """
+    指定テーブルのレコードキャッシュを破棄
+
+    Args:
+        table_name: テーブル名
+
+    Returns:
+        int: 削除した件数
+    """
+    return record_cache.invalidate(lambda key: key[0] == table_name)
+
+
+class ResponseCache:
+    """
+    APIレスポンス用のキャッシュ
+    
+    REDIS_URLが設定されていればRedis（複数プロセス・ワーカーで共有）を使い、
+    未設定・redis未インストール・接続エラー時はインプロセスのTTLCacheで代替する。
+    インプロセスのキャッシュは破棄が他のワーカーに届かないため、複数ワーカーで
+    動かす場合（local_enabled=False）は代替せずキャッシュしない。
+    値はJSONシリアライズ可能なオブジェクトに限る。
+    """
+    
+    def __init__(self, redis_url: Optional[str] = None, key_prefix: str = 'kabu:',
+                 maxsize: int = 1024, ttl: float = 300.0, local_enabled: bool = True):
+        """
+        初期化
+        
+        Args:
+            redis_url: RedisのURL（省略時はインプロセスのみ）
+            key_prefix: Redisキーの接頭辞
+            maxsize: インプロセスキャッシュの最大件数
+            ttl: 既定の有効期限（秒）
+            local_enabled: インプロセスキャッシュを使うか（単一ワーカーの場合のみTrueにする）
+        """
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        # 無効時は件数上限0とし、保存した値を即座に破棄する
+        self._local = TTLCache(maxsize=maxsize if local_enabled else 0, ttl=ttl)
+        self._redis = None
+        self._redis_error: tuple = ()
+        if redis_url:
+            try:
+                import redis
+            except ImportError:
+                logger.warning("redisパッケージが見つからないため、インプロセスキャッシュを使用します")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, decode_responses=True,
+                                                   socket_timeout=0.5, socket_connect_timeout=0.5)
+                self._redis_error = (redis.RedisError,)
+    
+    def get(self, key: str) -> Any:
+        """
+        値を取得
+        
+        Args:
+            key: キャッシュキー
+            
+        Returns:
+            Any: キャッシュされた値（見つからない場合はNone）
+        """
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self.key_prefix + key)
+                return json.loads(raw) if raw is not None else None
+            except self._redis_error as e:
+                logger.warning(f"Redisからの取得に失敗しました（インプロセスキャッシュで代替）: {e}")
+        return self._local.get(key)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        値を保存
+        
+        Args:
+            key: キャッシュキー
+            value: 保存する値（JSONシリアライズ可能なもの）
+            ttl: 有効期限（秒、省略時は既定値）
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self._redis is not None:
+            try:
+                self._redis.set(self.key_prefix + key, json.dumps(value, ensure_ascii=False, default=json_default),
+                                ex=int(ttl))
+                return
+            except self._redis_error as e:
+                logger.warning(f"Redisへの保存に失敗しました（インプロセスキャッシュで代替）: {e}")
+        self._local.set(key, value, ttl=ttl)
+    
+    def get_text(self, key: str) -> Optional[str]:
+        """
+        シリアライズ済みの文字列（レスポンス本文など）をそのまま取得
+        
+        Args:
+            key: キャッシュキー
+            
+        Returns:
+            Optional[str]: キャッシュされた文字列（見つからない場合はNone）
+        """
+        if self._redis is not None:
+            try:
+                return self._redis.get(self.key_prefix + key)
+            except self._redis_error as e:
+                logger.warning(f"Redisからの取得に失敗しました（インプロセスキャッシュで代替）: {e}")
+        return self._local.get(key)
+    
+    def set_text(self, key: str, text: str, ttl: Optional[float] = None) -> None:
+        """
+        シリアライズ済みの文字列を変換せずに保存
+        
+        Args:
+            key: キャッシュキー
+            text: 保存する文字列
+            ttl: 有効期限（秒、省略時は既定値）
+        """
+        ttl = self.ttl if ttl is None else ttl
+        if self._redis is not None:
+            try:
+                self._redis.set(self.key_prefix + key, text, ex=int(ttl))
+                return
+            except self._redis_error as e:
+                logger.warning(f"Redisへの保存に失敗しました（インプロセスキャッシュで代替）: {e}")
+        self._local.set(key, text, ttl=ttl)
+    
+    def delete(self, *keys: str) -> None:
+        """
+        指定キーを削除
+        
+        Args:
+            keys: キャッシュキー
+        """
+        self._local.invalidate(lambda key: key in keys)
+        if self._redis is not None and keys:
+            try:
+                self._redis.delete(*(self.key_prefix + key for key in keys))
+            except self._redis_error as e:
+                logger.warning(f"Redisのキー削除に失敗しました: {e}")
+    
+    def delete_prefix(self, prefix: str) -> None:
+        """
+        接頭辞に一致するキーをすべて削除
+        
+        Args:
+            prefix: キャッシュキーの接頭辞
+        """
+        self._local.invalidate(lambda key: key.startswith(prefix))
+        if self._redis is not None:
+            try:
+                keys = list(self._redis.scan_iter(match=f"{self.key_prefix}{prefix}*", count=500))
+                if keys:
+                    self._redis.delete(*keys)
+            except self._redis_error as e:
+                logger.warning(f"Redisのキー削除に失敗しました: {e}")
+
+
+# APIレスポンスキャッシュ（REDIS_URL未設定時はインプロセス。複数ワーカーの場合はRedisのみ）
+response_cache = ResponseCache(_config.REDIS_URL, local_enabled=_config.WEB_CONCURRENCY == 1)
@@ -2,22 +2,377 @@
 データベース関連ユーティリティ
 """
 import os
+import queue
 import sqlite3
-from typing import Optional
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import quote
 from config.settings import get_config
+from backend.utils.cache import bust_table_cache
+
+T = TypeVar('T')
+
+# データベース単位のPRAGMA（WALで読み書きを並行させる。一度設定すればファイルに保持される）
+DATABASE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+)
+
+# 接続単位のPRAGMA（接続ごとに設定が必要。synchronous=NORMALでfsync回数を削減）
+SESSION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=30000",
+)
+
+# 接続作成時に適用するPRAGMA
+CONNECTION_PRAGMAS = DATABASE_PRAGMAS + SESSION_PRAGMAS
+
+# 健全性チェックで存在を確認するテーブル
+REQUIRED_TABLES = frozenset({'companies', 'stock_prices', 'financial_metrics'})
+
+TABLE_NAMES_QUERY = "SELECT name FROM sqlite_master WHERE type = 'table'"
+
+# 接続ごとのプリペアドステートメントキャッシュ件数（sqlite3の既定は128）
+# 一括取得クエリはIN句のプレースホルダー数ごとに別のSQL文になるため多めに確保する
+STATEMENT_CACHE_SIZE = 512
+
+
+# モデル初期化時に登録される一意キー用インデックス定義（テーブル名, フィールド）
+_registered_indexes: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+
+def register_index(table_name: str, fields: Sequence[str]) -> None:
+    """
+    起動時に作成する複合インデックスを登録
+
+    Args:
+        table_name: テーブル名
+        fields: インデックス対象フィールド
+    """
+    fields = tuple(fields)
+    index_name = f"idx_{table_name}_{'_'.join(fields)}"
+    _registered_indexes[(table_name, fields)] = (
+        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table_name}({', '.join(fields)})"
+    )
+
+
+def _has_index_on(conn: sqlite3.Connection, table_name: str, fields: Tuple[str, ...]) -> bool:
+    """指定フィールドを先頭に持つインデックス（UNIQUE制約の自動インデックス含む）があるか"""
+    for index in conn.execute(f"PRAGMA index_list({table_name})").fetchall():
+        columns = tuple(row[2] for row in conn.execute(f"PRAGMA index_info({index[1]})").fetchall())
+        if columns[:len(fields)] == fields:
+            return True
+    return False
+
+
+def apply_registered_indexes(conn: sqlite3.Connection) -> int:
+    """
+    登録済みインデックスのうち未作成のものを作成
+
+    Args:
+        conn: データベース接続
+
+    Returns:
+        int: 作成したインデックス数
+    """
+    created = 0
+    for (table_name, fields), ddl in list(_registered_indexes.items()):
+        try:
+            if not _has_index_on(conn, table_name, fields):
+                conn.execute(ddl)
+                created += 1
+        except sqlite3.OperationalError as e:
+            # テーブル未作成などの場合はスキップ
+            print(f"インデックス作成をスキップしました ({table_name}): {e}")
+    return created
+
+
+# 列名の組み合わせごとに生成したnamedtuple型のキャッシュ
+_row_types: Dict[Tuple[str, ...], type] = {}
+
+
+def namedtuple_row_factory(cursor: sqlite3.Cursor, row: tuple) -> tuple:
+    """
+    行をnamedtupleに変換するrow_factory
+
+    sqlite3.Rowより属性アクセスが速く、イミュータブルなためキャッシュにもそのまま保持できる。
+    """
+    columns = tuple(column[0] for column in cursor.description)
+    row_type = _row_types.get(columns)
+    if row_type is None:
+        row_type = _row_types.setdefault(columns, namedtuple('Row', columns, rename=True))
+    return row_type._make(row)
 
 
 def get_db_connection(db_path: Optional[str] = None):
-    """データベース接続を取得"""
+    """データベース接続を新規作成（呼び出し側でclose()する。繰り返し使う場合はdb_conn()を使う）"""
     if db_path is None:
         config = get_config()
         db_path = config.DATABASE_PATH
     
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
     conn.row_factory = sqlite3.Row  # 辞書形式でアクセス可能
+    # プール外の接続もWAL・busy_timeoutを揃え、プールの書き込みと競合しても待機させる
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
 
+# db_conn()で再利用する接続の保持数（データベースファイルごと）
+UTILITY_POOL_SIZE = 4
+
+# データベースファイルごとの再利用待ち接続
+_utility_pools: Dict[str, "queue.LifoQueue[sqlite3.Connection]"] = {}
+_utility_pools_lock = threading.Lock()
+
+
+def _utility_pool(db_path: str) -> "queue.LifoQueue[sqlite3.Connection]":
+    """データベースファイルに対応する再利用待ち接続のキューを取得"""
+    with _utility_pools_lock:
+        pool = _utility_pools.get(db_path)
+        if pool is None:
+            pool = _utility_pools[db_path] = queue.LifoQueue(maxsize=UTILITY_POOL_SIZE)
+        return pool
+
+
+@contextmanager
+def db_conn(db_path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """
+    get_db_connection()の接続を使い回して借りる（返却時に未確定の変更はロールバック）
+
+    接続を開き直さないため、ページキャッシュとステートメントキャッシュが呼び出しをまたいで残る。
+    プールが一杯の場合、返却された接続は閉じる。
+
+    Args:
+        db_path: データベースファイルパス（省略時は設定値）
+    """
+    if db_path is None:
+        db_path = get_config().DATABASE_PATH
+    pool = _utility_pool(db_path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = get_db_connection(db_path)
+
+    try:
+        yield conn
+    except BaseException:
+        conn.close()
+        raise
+
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
+def close_pool() -> None:
+    """db_conn()で保持している接続をすべて閉じる（終了時用）"""
+    with _utility_pools_lock:
+        pools = list(_utility_pools.values())
+        _utility_pools.clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class ConnectionPool:
+    """
+    SQLite接続プール（書き込み1本 + 読み取り専用(mode=ro)N本）
+
+    接続はアプリケーション起動時にまとめて作成し、リクエストをまたいで再利用する。
+    SELECTは読み取り接続、INSERT/UPDATE/DELETEは書き込み接続に振り分ける。
+    接続を使い回すため、パラメータ化したSQLは接続ごとのステートメントキャッシュで
+    2回目以降の準備（prepare）が省略される。
+    """
+
+    def __init__(self, db_path: str, reader_count: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            db_path: データベースファイルパス
+            reader_count: 読み取り接続数（省略時は min(CPU数, 4)）
+        """
+        self.db_path = db_path
+        if reader_count is None:
+            reader_count = min(os.cpu_count() or 1, 4)
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        # 同一スレッド内でのトランザクション中に再取得できるようRLockを使用
+        self._write_lock = threading.RLock()
+        self._local = threading.local()
+        self._writer = self._connect()
+
+        # インメモリDBは接続ごとに別DBになるため書き込み接続を共用する
+        self._readers: Optional[queue.Queue] = None
+        if db_path != ':memory:' and reader_count > 0:
+            self._readers = queue.Queue(maxsize=reader_count)
+            for _ in range(reader_count):
+                self._readers.put(self._connect(read_only=True))
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """
+        プール用の接続を作成
+
+        Args:
+            read_only: 読み取り専用接続にするか
+
+        Returns:
+            sqlite3.Connection: PRAGMA適用済みの接続
+        """
+        if read_only:
+            # mode=ro でOSレベルでも読み取り専用として開く（WALのため書き込み中も読み取り可能）
+            # 共有キャッシュ(cache=shared)はテーブル単位のロックで読み書きが直列化されるため使わない
+            database = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+            pragmas = SESSION_PRAGMAS
+        else:
+            database = self.db_path
+            pragmas = CONNECTION_PRAGMAS
+        conn = sqlite3.connect(database, check_same_thread=False, isolation_level=None,
+                               cached_statements=STATEMENT_CACHE_SIZE, uri=read_only)
+        conn.row_factory = sqlite3.Row  # 辞書形式でアクセス可能
+        for pragma in pragmas:
+            conn.execute(pragma)
+        return conn
+
+    def in_transaction(self) -> bool:
+        """現在のスレッドが書き込みトランザクション中か"""
+        return getattr(self._local, 'transaction_depth', 0) > 0
+
+    @contextmanager
+    def acquire_read(self) -> Iterator[sqlite3.Connection]:
+        """読み取り用接続を借りる（トランザクション中は書き込み接続を使用）"""
+        if self._readers is None or self.in_transaction():
+            with self.acquire_write() as conn:
+                yield conn
+            return
+
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def acquire_write(self) -> Iterator[sqlite3.Connection]:
+        """書き込み用接続を借りる（同時に1スレッドのみ）"""
+        with self._write_lock:
+            yield self._writer
+
+    @contextmanager
+    def write_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        BEGIN IMMEDIATE で書き込みトランザクションを開始し、終了時にCOMMIT/ROLLBACK
+
+        入れ子で呼ばれた場合は外側のトランザクションに参加する。
+        """
+        with self.acquire_write() as conn:
+            depth = getattr(self._local, 'transaction_depth', 0)
+            if depth > 0:
+                self._local.transaction_depth = depth + 1
+                try:
+                    yield conn
+                finally:
+                    self._local.transaction_depth = depth
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            self._local.transaction_depth = 1
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            else:
+                conn.execute("COMMIT")
+            finally:
+                self._local.transaction_depth = 0
+
+    def bust_cache(self, table_name: str) -> int:
+        """
+        指定テーブルのレコードキャッシュを明示的に破棄
+
+        Args:
+            table_name: テーブル名
+
+        Returns:
+            int: 削除したキャッシュ件数
+        """
+        return bust_table_cache(table_name)
+
+    def close(self) -> None:
+        """プール内の全接続を閉じる"""
+        if self._readers is not None:
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
+        self._writer.close()
+
+
+def is_busy_error(error: Exception) -> bool:
+    """SQLITE_BUSY / SQLITE_LOCKED 由来のエラーか判定"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(func: Callable[[], T], max_wait: float = 30.0,
+                  initial_delay: float = 0.05) -> T:
+    """
+    SQLITE_BUSY発生時に指数バックオフで再試行
+
+    Args:
+        func: 実行する処理
+        max_wait: 再試行を続ける最大秒数
+        initial_delay: 初回の待機秒数
+
+    Returns:
+        T: funcの戻り値
+    """
+    deadline = time.monotonic() + max_wait
+    delay = initial_delay
+    while True:
+        try:
+            return func()
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or time.monotonic() + delay > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 2.0)
+
+
+# 読み込み済みのスキーマ（(ファイルパス, 更新時刻) をキーとしたSQL）
+_schema_cache: Dict[Tuple[str, int], str] = {}
+
+
+def _read_schema(schema_path: str) -> str:
+    """スキーマファイルを読み込み（パスと更新時刻が同じ間は再読み込みしない）"""
+    key = (os.path.abspath(schema_path), os.stat(schema_path).st_mtime_ns)
+    schema = _schema_cache.get(key)
+    if schema is None:
+        with open(schema_path, 'r', encoding='utf-8') as f:
+            schema = f.read()
+        _schema_cache[key] = schema
+    return schema
+
+
 def init_database(db_path: Optional[str] = None, schema_path: Optional[str] = None) -> bool:
     """
     データベースの初期化
@@ -47,15 +402,16 @@ def init_database(db_path: Optional[str] = None, schema_path: Optional[str] = No
         return False
     
     try:
-        # スキーマの読み込み
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = f.read()
+        # スキーマの読み込み（変更されていなければ前回読み込んだ内容を使う）
+        schema = _read_schema(schema_path)
         
         # データベースの初期化
-        conn = get_db_connection(db_path)
-        # スキーマを実行（IF NOT EXISTSにより既存テーブルがあっても安全）
-        conn.executescript(schema)
-        conn.close()
+        with db_conn(db_path) as conn:
+            # スキーマを実行（IF NOT EXISTSにより既存テーブルがあっても安全）
+            conn.executescript(schema)
+            # モデルが登録した一意キー用インデックスを作成
+            apply_registered_indexes(conn)
+            conn.commit()
         
         print("データベースが正常に初期化されました。")
         return True
@@ -84,23 +440,14 @@ def check_database_health(db_path: Optional[str] = None) -> bool:
         db_path = config.DATABASE_PATH
     
     try:
-        conn = get_db_connection(db_path)
-        
-        # 基本テーブルの存在確認
-        cursor = conn.execute("""
-            SELECT name FROM sqlite_master 
-            WHERE type='table' AND name IN ('companies', 'stock_prices', 'financial_metrics')
-        """)
-        
-        tables = [row[0] for row in cursor.fetchall()]
-        required_tables = ['companies', 'stock_prices', 'financial_metrics']
-        
-        conn.close()
+        with db_conn(db_path) as conn:
+            # 基本テーブルの存在確認
+            tables = {row[0] for row in conn.execute(TABLE_NAMES_QUERY)}
         
         # 必要なテーブルがすべて存在するかチェック
-        missing_tables = set(required_tables) - set(tables)
+        missing_tables = REQUIRED_TABLES - tables
         if missing_tables:
-            print(f"不足しているテーブル: {missing_tables}")
+            print(f"不足しているテーブル: {sorted(missing_tables)}")
             return False
         
         return True
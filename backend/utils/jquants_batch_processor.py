@@ -4,13 +4,12 @@ J-Quants API株価データ一括処理ユーティリティ
 """
 
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
 from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime, timedelta
-import sys
-import os
-
-# パスの設定
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.utils.jquants_data_fetcher import JQuantsDataFetcher
 from backend.models.database import (
@@ -23,25 +22,46 @@ logger = logging.getLogger(__name__)
 class JQuantsBatchProcessor:
     """J-Quants API株価データ一括処理クラス"""
     
-    def __init__(self, email: str = None, password: str = None, refresh_token: str = None):
+    # 並列に処理する企業数の上限（リクエスト数はフェッチャー側の流量制限で抑える）
+    MAX_WORKERS = 8
+    
+    # 更新が必要な企業がこの数以上の場合のみ全銘柄の日次株価を一括取得する
+    # （全銘柄分はページングで複数回の問い合わせになるため、少数なら企業ごとに取得する方が軽い）
+    BULK_QUOTES_MIN_COMPANIES = 20
+    
+    def __init__(self, email: str = None, password: str = None, refresh_token: str = None,
+                 max_workers: Optional[int] = None):
         self.fetcher = JQuantsDataFetcher(email, password, refresh_token)
+        self.max_workers = max_workers or self.MAX_WORKERS
         self.success_count = 0
         self.error_count = 0
         self.skip_count = 0
         self.processing_results = []
+        self._count_lock = threading.Lock()
+        # 一括処理中の企業ごとの最新株価日（process_companies の間だけ保持）
+        self._latest_dates: Optional[Dict[int, str]] = None
+    
+    def _count(self, status: str):
+        """処理結果の件数を加算（複数スレッドから呼ばれるためロックする）"""
+        with self._count_lock:
+            if status == 'success':
+                self.success_count += 1
+            elif status == 'error':
+                self.error_count += 1
+            else:
+                self.skip_count += 1
     
-    def get_all_companies(self) -> List[Dict[str, Any]]:
+    def get_all_companies(self) -> List[sqlite3.Row]:
         """
         データベースから全ての登録済み企業を取得
         
         Returns:
-            List[Dict]: 企業情報のリスト
+            List[sqlite3.Row]: 企業情報のリスト（辞書に変換せず行のまま返す）
         """
         try:
             companies = company_model.search()
-            company_list = [dict(company) for company in companies]
-            logger.info(f"登録済み企業数: {len(company_list)}")
-            return company_list
+            logger.info(f"登録済み企業数: {len(companies)}")
+            return companies
         except Exception as e:
             logger.error(f"企業一覧取得エラー: {str(e)}")
             return []
@@ -58,22 +78,27 @@ class JQuantsBatchProcessor:
             bool: 更新が必要な場合True
         """
         try:
-            # 最新の株価データを確認
-            latest_price = stock_price_model.get_latest_price(company_id)
+            # 最新の株価日を確認（一括処理中はまとめて取得済みの値を使う）
+            if self._latest_dates is not None:
+                latest_date = self._latest_dates.get(company_id)
+            else:
+                latest_price = stock_price_model.get_latest_price(company_id)
+                latest_date = latest_price['price_date'] if latest_price else None
             
-            if not latest_price:
+            if not latest_date:
                 return True  # データが存在しない場合は更新
             
-            last_update = datetime.fromisoformat(latest_price['price_date'])
-            cutoff_date = datetime.now() - timedelta(days=last_update_days)
+            # price_dateはISO形式（YYYY-MM-DD...）のため、日付部分の文字列比較で判定する
+            cutoff_date = (datetime.now() - timedelta(days=last_update_days)).date().isoformat()
             
-            return last_update.date() < cutoff_date.date()
+            return str(latest_date)[:10] < cutoff_date
             
         except Exception as e:
             logger.warning(f"更新判定エラー（company_id={company_id}）: {str(e)}")
             return True  # エラー時は更新
     
-    def process_company_data(self, company: Dict[str, Any], force_update: bool = False, date: str = None) -> Dict[str, Any]:
+    def process_company_data(self, company: Dict[str, Any], force_update: bool = False, date: str = None,
+                             quote: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         単一企業の株価・財務データを処理
         
@@ -81,10 +106,31 @@ class JQuantsBatchProcessor:
             company (Dict): 企業情報
             force_update (bool): 強制更新フラグ
             date (str): 取得日付（YYYY-MM-DD形式、Noneの場合は最新）
+            quote (Dict): 一括取得済みの日次株価（Noneの場合は企業ごとに取得）
             
         Returns:
             Dict: 処理結果
         """
+        result, stock_data = self._fetch_company_data(company, force_update, date, quote)
+        if stock_data is not None:
+            self._save_fetched_data([(result, stock_data)])
+        return result
+    
+    def _fetch_company_data(self, company: Dict[str, Any], force_update: bool = False, date: str = None,
+                            quote: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        単一企業の株価・財務データを取得（データベースへの保存は _save_fetched_data で行う）
+        
+        Args:
+            company (Dict): 企業情報
+            force_update (bool): 強制更新フラグ
+            date (str): 取得日付（YYYY-MM-DD形式、Noneの場合は最新）
+            quote (Dict): 一括取得済みの日次株価（Noneの場合は企業ごとに取得）
+            
+        Returns:
+            Tuple[Dict, Optional[Dict]]: (処理結果, 保存する株価・財務データ)。
+                スキップ・エラーの場合は件数を加算済みで、データはNone
+        """
         company_id = company['id']
         symbol = company['symbol']
         
@@ -105,19 +151,19 @@ class JQuantsBatchProcessor:
                     'status': 'skipped',
                     'message': '最新データが既に存在'
                 })
-                self.skip_count += 1
-                return result
+                self._count('skipped')
+                return result, None
             
             # J-Quants APIからデータ取得
-            stock_data = self.fetcher.get_stock_info(symbol, date)
+            stock_data = self.fetcher.get_stock_info(symbol, date, quote)
             
             if not stock_data:
                 result.update({
                     'status': 'error',
                     'message': 'J-Quants APIからデータを取得できませんでした'
                 })
-                self.error_count += 1
-                return result
+                self._count('error')
+                return result, None
             
             # データの妥当性チェック
             if not self.fetcher.validate_stock_data(stock_data):
@@ -125,147 +171,102 @@ class JQuantsBatchProcessor:
                     'status': 'error',
                     'message': '取得したデータが無効です'
                 })
-                self.error_count += 1
-                return result
-            
-            # 株価データの更新
-            stock_result = self._update_stock_price(company_id, stock_data)
-            if stock_result['success']:
-                result['data_updated'] = True
-            else:
-                result['errors'].append(f"株価更新エラー: {stock_result['message']}")
-            
-            # 財務指標の更新
-            financial_result = self._update_financial_metrics(company_id, stock_data)
-            if financial_result['success']:
-                result['data_updated'] = True
-            else:
-                result['errors'].append(f"財務指標更新エラー: {financial_result['message']}")
-            
-            # 価格統計の更新
-            self._update_price_statistics(company_id)
+                self._count('error')
+                return result, None
             
-            # 企業情報の更新（sector, marketが取得できた場合）
-            if stock_data.get('sector') or stock_data.get('market'):
-                self._update_company_info(company_id, stock_data)
-            
-            result.update({
-                'status': 'success',
-                'message': f"J-Quants APIでデータ更新完了（株価: {stock_data['price']}円）",
-                'latest_price': stock_data['price'],
-                'price_date': stock_data['price_date']
-            })
-            self.success_count += 1
+            return result, stock_data
             
         except Exception as e:
             result.update({
                 'status': 'error',
                 'message': f'処理エラー: {str(e)}'
             })
-            self.error_count += 1
+            self._count('error')
             logger.error(f"企業データ処理エラー（{symbol}）: {str(e)}")
-        
-        return result
-    
-    def _update_stock_price(self, company_id: int, stock_data: Dict[str, Any]) -> Dict[str, Any]:
-        """株価データを更新"""
-        try:
-            price_result = stock_price_model.create_or_update(
-                company_id=company_id,
-                price=stock_data['price'],
-                price_date=stock_data['price_date'],
-                volume=stock_data.get('volume', 0)
-            )
-            
-            return {
-                'success': True,
-                'action': price_result.get('action', 'unknown'),
-                'message': price_result.get('message', 'success')
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'message': str(e)
-            }
+            return result, None
     
-    def _update_financial_metrics(self, company_id: int, stock_data: Dict[str, Any]) -> Dict[str, Any]:
-        """財務指標データを更新"""
+    def _save_fetched_data(self, fetched: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        取得済みの株価・財務データを1トランザクションでまとめて保存
+        
+        株価・財務指標はそれぞれexecutemanyの1回のUPSERTで書き込み、
+        同じ企業・日付の既存データは取得した値で上書きする。
+        
+        Args:
+            fetched: (処理結果, 株価・財務データ) のリスト（処理結果は保存後に更新する）
+        """
+        if not fetched:
+            return
+        
+        price_rows = []
+        financial_rows = []
+        for result, stock_data in fetched:
+            company_id = result['company_id']
+            price_rows.append((company_id, stock_data['price'], stock_data['price_date'], stock_data.get('volume', 0)))
+            financial_row = self._financial_row(company_id, stock_data)
+            if financial_row is not None:
+                financial_rows.append(financial_row)
+        
         try:
-            # 財務指標のマッピング
-            financial_data = {}
-            
-            if stock_data.get('pbr') is not None:
-                financial_data['pbr'] = float(stock_data['pbr'])
-            
-            if stock_data.get('per') is not None:
-                financial_data['per'] = float(stock_data['per'])
-            
-            if stock_data.get('roe') is not None:
-                financial_data['roe'] = float(stock_data['roe'])
-            
-            if stock_data.get('equity_ratio') is not None:
-                financial_data['equity_ratio'] = float(stock_data['equity_ratio'])
-            
-            if stock_data.get('roa') is not None:
-                financial_data['roa'] = float(stock_data['roa'])
-            
-            if stock_data.get('net_sales') is not None:
-                financial_data['net_sales'] = float(stock_data['net_sales'])
-            
-            if stock_data.get('operating_profit') is not None:
-                financial_data['operating_profit'] = float(stock_data['operating_profit'])
-            
-            # データがある場合のみ更新
-            if financial_data:
-                # 財務データの基準日を使用（価格日とは別）
-                report_date = stock_data.get('report_date') or stock_data['price_date']
-                
-                result_info = financial_metrics_model.create_or_update(
-                    company_id=company_id,
-                    report_date=report_date,
-                    **financial_data
-                )
-                
-                # 同一日データで差異がある場合は強制更新
-                if result_info.get('status') == 'warning':
-                    logger.info(f"既存データに差異があるため強制更新を実行: {result_info['message']}")
-                    financial_metrics_model.force_update(
-                        company_id=company_id,
-                        report_date=report_date,
-                        **financial_data
-                    )
+            # DB更新は1トランザクションにまとめる（COMMITは1回）
+            with db_manager.transaction():
+                stock_price_model.upsert_many(price_rows)
+                if financial_rows:
+                    financial_metrics_model.upsert_many(financial_rows)
                 
-                logger.info(f"財務指標保存: 企業ID={company_id}, 基準日={report_date}, データ={financial_data}")
-                
-                return {
-                    'success': True,
-                    'message': f"財務指標更新: {list(financial_data.keys())}"
-                }
-            else:
-                return {
-                    'success': True,
-                    'message': "更新可能な財務指標なし"
-                }
+                # 価格統計の更新（期間ごとに全企業分をまとめて集計）
+                self._update_price_statistics([result['company_id'] for result, _ in fetched])
                 
+                for result, stock_data in fetched:
+                    # 企業情報の更新（sector, marketが取得できた場合）
+                    if stock_data.get('sector') or stock_data.get('market'):
+                        self._update_company_info(result['company_id'], stock_data)
+            
         except Exception as e:
-            return {
-                'success': False,
-                'message': str(e)
-            }
+            logger.error(f"取得データの一括保存エラー（{len(fetched)}社）: {str(e)}")
+            for result, _ in fetched:
+                result.update({
+                    'status': 'error',
+                    'message': f'処理エラー: {str(e)}'
+                })
+                self._count('error')
+            return
+        
+        logger.info(f"J-Quantsデータ保存: 株価{len(price_rows)}件, 財務指標{len(financial_rows)}件")
+        for result, stock_data in fetched:
+            result.update({
+                'status': 'success',
+                'message': f"J-Quants APIでデータ更新完了（株価: {stock_data['price']}円）",
+                'data_updated': True,
+                'latest_price': stock_data['price'],
+                'price_date': stock_data['price_date']
+            })
+            self._count('success')
     
-    def _update_price_statistics(self, company_id: int):
-        """価格統計を更新"""
+    def _financial_row(self, company_id: int, stock_data: Dict[str, Any]) -> Optional[tuple]:
+        """取得データから財務指標の行タプル（FinancialMetrics.ROW_LAYOUT の列順）を作成（指標が無い場合はNone）"""
+        financial_data = {
+            field: float(stock_data[field])
+            for field in financial_metrics_model.VALUE_FIELDS
+            if stock_data.get(field) is not None
+        }
+        if not financial_data:
+            return None
+        
+        financial_data['company_id'] = company_id
+        # 財務データの基準日を使用（価格日とは別）
+        financial_data['report_date'] = stock_data.get('report_date') or stock_data['price_date']
+        return tuple(map(financial_data.get, financial_metrics_model.ROW_LAYOUT))
+    
+    def _update_price_statistics(self, company_ids: List[int]):
+        """価格統計を更新（当月・当年の期間は1回だけ算出し、3期間を1回の集計で書き込む）"""
         try:
             current_month = datetime.now().strftime('%Y-%m')
-            current_year = datetime.now().strftime('%Y')
             
-            price_statistics_model.update_statistics(company_id, 'monthly', current_month)
-            price_statistics_model.update_statistics(company_id, 'yearly', current_year)
-            price_statistics_model.update_statistics(company_id, 'all_time', 'all')
+            price_statistics_model.update_current_statistics_bulk(company_ids, current_month)
             
         except Exception as e:
-            logger.warning(f"価格統計更新エラー（company_id={company_id}）: {str(e)}")
+            logger.warning(f"価格統計更新エラー（{len(company_ids)}社）: {str(e)}")
     
     def _update_company_info(self, company_id: int, stock_data: Dict[str, Any]):
         """企業情報を更新"""
@@ -284,6 +285,53 @@ class JQuantsBatchProcessor:
         except Exception as e:
             logger.warning(f"企業情報更新エラー（company_id={company_id}）: {str(e)}")
     
+    def process_companies(self, companies: List[Dict[str, Any]], force_update: bool = False, date: str = None,
+                          quotes: Optional[Dict[str, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        複数企業のデータをスレッドプールで並列に取得し、まとめて保存
+        
+        Args:
+            companies (List[Dict]): 企業情報のリスト
+            force_update (bool): 強制更新フラグ
+            date (str): 取得日付（YYYY-MM-DD形式、Noneの場合は最新）
+            quotes (Dict): 企業コード別の一括取得済み日次株価（無い企業は個別に取得）
+            
+        Returns:
+            List[Dict]: 処理結果のリスト（companiesと同じ順序）
+        """
+        if not companies:
+            return []
+        
+        total = len(companies)
+        completed = count(1)
+        
+        def fetch(company: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+            logger.info(f"処理中: {company['symbol']} - {company['name']}")
+            quote = quotes.get(company['symbol']) if quotes else None
+            fetched = self._fetch_company_data(company, force_update, date, quote)
+            
+            # 進捗ログ
+            done = next(completed)
+            if done % 5 == 0:
+                logger.info(f"取得進捗: {done}/{total} 完了 "
+                           f"(エラー:{self.error_count}, スキップ:{self.skip_count})")
+            return fetched
+        
+        # 更新判定用の最新株価日を全企業分まとめて取得（呼び出し側で取得済みの場合はそれを使う）
+        if not force_update and self._latest_dates is None:
+            self._latest_dates = stock_price_model.get_latest_price_dates()
+        try:
+            # 1段階目: 外部APIからの取得を並列に行う
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, total)) as executor:
+                fetched = list(executor.map(fetch, companies))
+        finally:
+            # 2段階目の保存で最新株価日が変わるため破棄する
+            self._latest_dates = None
+        
+        # 2段階目: 取得できた企業のデータを1トランザクションでまとめて保存
+        self._save_fetched_data([(result, stock_data) for result, stock_data in fetched if stock_data is not None])
+        return [result for result, _ in fetched]
+    
     def process_all_companies(self, force_update: bool = False, max_companies: Optional[int] = None, date: str = None) -> Dict[str, Any]:
         """
         全ての登録済み企業の株価データを一括処理
@@ -331,17 +379,24 @@ class JQuantsBatchProcessor:
         
         logger.info(f"J-Quants API株価データ一括処理開始: {len(companies)}社")
         
-        # 各企業を処理
-        for i, company in enumerate(companies):
-            logger.info(f"処理中 ({i+1}/{len(companies)}): {company['symbol']} - {company['name']}")
-            
-            result = self.process_company_data(company, force_update, date)
-            self.processing_results.append(result)
-            
-            # 進捗ログ
-            if (i + 1) % 5 == 0:  # J-Quants APIはレート制限があるため5件ごと
-                logger.info(f"進捗: {i+1}/{len(companies)} 完了 "
-                           f"(成功:{self.success_count}, エラー:{self.error_count}, スキップ:{self.skip_count})")
+        # 更新が必要な企業数を数える（最新株価日は process_companies でもそのまま使う）
+        if force_update:
+            pending = len(companies)
+        else:
+            self._latest_dates = stock_price_model.get_latest_price_dates()
+            pending = sum(1 for company in companies if self.should_update_data(company['id']))
+        
+        # 更新対象が多い場合のみ全銘柄の日次株価を1回の問い合わせで取得（取得できない企業は個別に取得する）
+        quotes = None
+        if pending >= self.BULK_QUOTES_MIN_COMPANIES:
+            quote_date, quotes = self.fetcher.get_daily_quotes_bulk(date)
+            if quotes:
+                date = quote_date
+        else:
+            logger.info(f"更新対象が{pending}社のため、日次株価は企業ごとに取得します")
+        
+        # 各企業を並列に処理（外部APIの応答待ちを重ねる）
+        self.processing_results = self.process_companies(companies, force_update, date, quotes)
         
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
@@ -4,13 +4,68 @@ J-Quants API株価・財務データ取得ユーティリティ
 """
 
 import logging
-from typing import Dict, Optional, Any, List
+import threading
+from typing import Dict, Optional, Any, List, Tuple
 from datetime import datetime, timedelta
 import os
 from decimal import Decimal
 
+from backend.utils.rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
+# J-Quants APIへの接続プール（ホストあたりの保持接続数）とリトライ設定
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 50
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.3
+
+# J-Quants APIへの1秒あたりのリクエスト数の上限（全フェッチャー・全スレッド合計、0以下で無制限）
+JQUANTS_REQUESTS_PER_SECOND = float(os.getenv('JQUANTS_REQUESTS_PER_SECOND', 5))
+
+_http_adapter = None
+_http_adapter_lock = threading.Lock()
+
+# J-Quants APIへのリクエスト流量制限（共有HTTPAdapterの送信時に適用）
+request_limiter = RateLimiter(JQUANTS_REQUESTS_PER_SECOND)
+
+
+def _shared_http_adapter():
+    """
+    全セッションで共有するHTTPAdapterを取得（初回のみ作成）
+    
+    フェッチャーはリクエストごとに作成されるため、接続プールを持つアダプターを
+    モジュールで1つだけ作成して各セッションにマウントし、TCP/TLS接続を再利用する。
+    """
+    global _http_adapter
+    if _http_adapter is None:
+        with _http_adapter_lock:
+            if _http_adapter is None:
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+                
+                class RateLimitedAdapter(HTTPAdapter):
+                    """送信前に流量制限のトークンを取得するHTTPAdapter"""
+                    
+                    def send(self, request, **kwargs):
+                        request_limiter.acquire()
+                        return super().send(request, **kwargs)
+                
+                # 接続エラーと一時的なサーバーエラーのみ再試行（POSTは再試行しない）
+                retry = Retry(
+                    total=HTTP_MAX_RETRIES,
+                    backoff_factor=HTTP_RETRY_BACKOFF,
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False
+                )
+                _http_adapter = RateLimitedAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=retry
+                )
+    return _http_adapter
+
+
 class JQuantsDataFetcher:
     """J-Quants API株価・財務データ取得クラス"""
     
@@ -20,6 +75,9 @@ class JQuantsDataFetcher:
         self.refresh_token = refresh_token or os.getenv('JQUANTS_REFRESH_TOKEN')
         self.client = None
         self.is_authenticated = False
+        # 一括処理では複数スレッドから同時に呼ばれるため、認証は1回に限定しセッションはスレッドごとに持つ
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
         
         # 保存済みトークンがない場合、データベースから取得を試行
         if not self.refresh_token:
@@ -45,14 +103,28 @@ class JQuantsDataFetcher:
         except Exception as e:
             logger.warning(f"保存済みトークン読み込みエラー: {str(e)}")
     
+    @property
+    def session(self):
+        """スレッドごとのHTTPセッション（requests.Sessionはスレッド間で共有せず、接続プールのみ共有する）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = self._local.session = requests.Session()
+            session.mount('https://', _shared_http_adapter())
+        return session
+    
+    def _ensure_client(self) -> bool:
+        """未認証の場合のみクライアントを初期化（同時に呼ばれても認証は1回だけ行う）"""
+        if self.is_authenticated:
+            return True
+        with self._auth_lock:
+            return self.is_authenticated or self._initialize_client()
+    
     def _initialize_client(self):
         """J-Quants APIクライアントを初期化（直接API実装）"""
         try:
             # 直接HTTP APIを使用したシンプルな実装
-            import requests
-            
             self.base_url = "https://api.jquants.com/v1"
-            self.session = requests.Session()
             self.id_token = None
             
             # 認証を実行
@@ -141,18 +213,19 @@ class JQuantsDataFetcher:
             logger.error(f"メール・パスワード認証エラー: {str(e)}")
             return False
     
-    def get_stock_info(self, symbol: str, date: str = None) -> Optional[Dict[str, Any]]:
+    def get_stock_info(self, symbol: str, date: str = None, quote: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """
         指定された企業コードの株価・財務情報を取得
         
         Args:
             symbol (str): 企業コード（例: '7203'）
             date (str): 取得日付（YYYY-MM-DD形式、Noneの場合は最新）
+            quote (Dict): get_daily_quotes_bulk で取得済みの日次株価（指定時は株価の取得を省略）
             
         Returns:
             Dict[str, Any]: 株価・財務データ、取得できない場合はNone
         """
-        if not self.is_authenticated and not self._initialize_client():
+        if not self._ensure_client():
             logger.error("J-Quants APIの初期化に失敗しました")
             return None
         
@@ -165,14 +238,15 @@ class JQuantsDataFetcher:
             
             logger.info(f"J-Quants APIでデータ取得開始: {symbol} ({target_date})")
             
-            # 株価データの取得
-            stock_data = self._get_daily_quotes(symbol, target_date)
+            # 株価データの取得（一括取得済みの場合はそのまま使う）
+            stock_data = quote or self._get_daily_quotes(symbol, target_date)
             if not stock_data:
                 logger.warning(f"株価データが取得できませんでした: {symbol}")
                 return None
             
-            # 財務データの取得（四半期決算データ）
-            financial_data = self._get_financial_statements(symbol)
+            # 財務データの取得（四半期決算データ、一括取得済みの終値をPBR・PERの計算に使う）
+            prefetched_price = float(quote['Close']) if quote and quote.get('Close') else None
+            financial_data = self._get_financial_statements(symbol, prefetched_price)
             
             # 結果をマッピング
             result = {
@@ -280,13 +354,74 @@ class JQuantsDataFetcher:
             logger.error(f"日次株価データ取得エラー: {symbol}, {str(e)}")
             return None
     
-    def _get_financial_statements(self, symbol: str) -> Dict[str, Any]:
-        """財務諸表データを取得"""
+    def get_daily_quotes_bulk(self, date: str = None) -> Tuple[Optional[str], Dict[str, Dict[str, Any]]]:
+        """
+        指定日の全銘柄の日次株価を1回の問い合わせで取得
+        
+        データが無い日（休日・未公開）は過去7日まで遡る。
+        
+        Args:
+            date (str): 取得日付（YYYY-MM-DD形式、Noneの場合は最新の営業日）
+            
+        Returns:
+            Tuple[Optional[str], Dict[str, Dict]]: (株価の日付, 企業コード別の日次株価)。
+                企業コードは5桁（'72030'）と4桁（'7203'）の両方で引ける。取得できない場合は (None, {})
+        """
+        if not self._ensure_client():
+            logger.error("J-Quants APIの初期化に失敗しました")
+            return None, {}
+        
+        target_date = date or self._get_latest_business_date()
+        url = f"{self.base_url}/prices/daily_quotes"
+        headers = {
+            "Authorization": f"Bearer {self.id_token}",
+            "Content-Type": "application/json"
+        }
+        
+        try:
+            for days_back in range(0, 8):
+                quote_date = (datetime.strptime(target_date, '%Y-%m-%d') - timedelta(days=days_back)).strftime('%Y-%m-%d')
+                params = {"date": quote_date}
+                quotes = {}
+                
+                # 件数が多い場合はpagination_keyで続きを取得する
+                while True:
+                    response = self.session.get(url, headers=headers, params=params, timeout=60)
+                    if response.status_code != 200:
+                        logger.warning(f"日次株価の一括取得エラー ({response.status_code}): {quote_date}")
+                        return None, {}
+                    
+                    data = response.json()
+                    for quote in data.get("daily_quotes", []):
+                        code = str(quote.get("Code", ''))
+                        quotes[code] = quote
+                        # 末尾0の5桁コードは登録済みの4桁コードでも引けるようにする
+                        if len(code) == 5 and code.endswith('0'):
+                            quotes[code[:4]] = quote
+                    
+                    pagination_key = data.get("pagination_key")
+                    if not pagination_key:
+                        break
+                    params["pagination_key"] = pagination_key
+                
+                if quotes:
+                    logger.info(f"日次株価を一括取得しました: {quote_date} ({len(quotes)}件)")
+                    return quote_date, quotes
+            
+            logger.warning(f"日次株価の一括取得でデータがありませんでした: {target_date}")
+            return None, {}
+            
+        except Exception as e:
+            logger.error(f"日次株価の一括取得エラー: {target_date}, {str(e)}")
+            return None, {}
+    
+    def _get_financial_statements(self, symbol: str, current_price: Optional[float] = None) -> Dict[str, Any]:
+        """財務諸表データを取得（current_price指定時はPBR・PERの計算に使い、株価の再取得を省略）"""
         try:
             # 認証が完了していない場合は初期化を試行
             if not hasattr(self, 'id_token') or not self.id_token:
                 logger.info("認証トークンがないため、認証を試行します")
-                if not self._initialize_client():
+                if not self._ensure_client():
                     logger.warning("認証に失敗したため財務データをスキップします")
                     return {}
             
@@ -367,7 +502,8 @@ class JQuantsDataFetcher:
                 
                 # 株価を取得してPBR, PERを計算
                 try:
-                    current_price = self._get_current_stock_price(symbol)
+                    if not current_price:
+                        current_price = self._get_current_stock_price(symbol)
                     
                     # 株価取得失敗の場合、データベースから最新株価を取得
                     if not current_price:
@@ -588,7 +724,7 @@ class JQuantsDataFetcher:
     def get_api_status(self) -> Dict[str, Any]:
         """J-Quants APIの状況を確認"""
         try:
-            if not self.is_authenticated and not self._initialize_client():
+            if not self._ensure_client():
                 return {
                     'available': False,
                     'message': 'J-Quants APIの認証に失敗（認証情報を確認してください）',
@@ -636,10 +772,9 @@ class JQuantsDataFetcher:
         Returns:
             List[Dict]: 企業情報のリスト
         """
-        if not self.is_authenticated:
-            if not self._initialize_client():
-                logger.error("J-Quants APIの初期化に失敗しました")
-                return []
+        if not self._ensure_client():
+            logger.error("J-Quants APIの初期化に失敗しました")
+            return []
         
         try:
             logger.info(f"J-Quants APIで企業名検索: {company_name}")
@@ -721,10 +856,9 @@ class JQuantsDataFetcher:
         Returns:
             List[Dict]: 企業情報のリスト
         """
-        if not self.is_authenticated:
-            if not self._initialize_client():
-                logger.error("J-Quants APIの初期化に失敗しました")
-                return []
+        if not self._ensure_client():
+            logger.error("J-Quants APIの初期化に失敗しました")
+            return []
         
         try:
             logger.info("J-Quants APIで全上場企業一覧を取得中...")
@@ -0,0 +1,65 @@
+"""
+JSONシリアライズユーティリティ（orjsonによるjsonifyの高速化）
+"""
+import sqlite3
+from typing import Any
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson未導入の環境ではFlask標準のプロバイダーを使う
+    orjson = None
+
+
+class RowJSONProvider(DefaultJSONProvider):
+    """sqlite3.Rowをそのままjsonify()に渡せるJSONプロバイダー"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """sqlite3.Rowは辞書として、それ以外はFlask標準の変換でシリアライズ"""
+        if isinstance(o, sqlite3.Row):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(RowJSONProvider):
+    """
+    orjsonでシリアライズするJSONプロバイダー
+
+    jsonify()の出力は標準プロバイダーと同じ内容になるよう、キーの並び替え（sort_keys）と
+    日付・Decimal等の変換（default）は標準プロバイダーの設定・処理をそのまま使う。
+    レスポンスはorjsonが出力したバイト列を文字列に戻さずに返す。
+    """
+
+    def _option(self) -> int:
+        """orjsonのオプション（日時型はFlask標準の形式で変換するためdefaultに渡す）"""
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """オブジェクトをJSON文字列に変換"""
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        """JSON文字列・バイト列をオブジェクトに変換"""
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """jsonify()のレスポンスを作成"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self._option()),
+            mimetype=self.mimetype
+        )
+
+
+def configure_json_provider(app) -> None:
+    """
+    アプリケーションのJSONプロバイダーを差し替える（orjsonが利用可能な場合はorjsonを使う）
+
+    Args:
+        app: Flaskアプリケーション
+    """
+    app.json = OrjsonProvider(app) if orjson is not None else RowJSONProvider(app)
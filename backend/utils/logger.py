@@ -1,8 +1,11 @@
 """
 ログ管理ユーティリティ
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 from datetime import datetime
 from typing import Optional
 from config.settings import get_config
@@ -29,12 +32,25 @@ class CustomFormatter(logging.Formatter):
         return super().format(record)
 
 
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """キューが満杯のときはレコードを破棄するQueueHandler（呼び出し元をブロックしない）"""
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
 class KabuLogger:
     """株式検索システム専用ロガー"""
     
     _instance = None
     _loggers = {}
     
+    # ログキューの最大件数
+    QUEUE_MAXSIZE = 10000
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
@@ -61,6 +77,9 @@ class KabuLogger:
         for handler in root_logger.handlers[:]:
             root_logger.removeHandler(handler)
         
+        # 実際の出力ハンドラーはバックグラウンドのリスナーで処理する
+        handlers = []
+        
         # フォーマッター
         file_formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
@@ -73,20 +92,44 @@ class KabuLogger:
         file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(file_formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
         
         # ファイルハンドラー（エラーのみ）
         error_handler = logging.FileHandler(self.error_log_file, encoding='utf-8')
         error_handler.setLevel(logging.ERROR)
         error_handler.setFormatter(file_formatter)
-        root_logger.addHandler(error_handler)
+        handlers.append(error_handler)
         
         # コンソールハンドラー（開発環境のみ）
         if self.config.DEBUG:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(logging.DEBUG)
             console_handler.setFormatter(console_formatter)
-            root_logger.addHandler(console_handler)
+            handlers.append(console_handler)
+        
+        # リクエスト処理スレッドはキューへの投入のみ行う
+        log_queue = queue.Queue(maxsize=self.QUEUE_MAXSIZE)
+        root_logger.addHandler(DroppingQueueHandler(log_queue))
+        self.listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        self._listener_started = False
+        self.start_listener()
+    
+    def start_listener(self):
+        """ログ出力用のバックグラウンドリスナーを開始（多重起動しない）"""
+        if self._listener_started:
+            return
+        self.listener.start()
+        self._listener_started = True
+        atexit.register(self.stop_listener)
+    
+    def stop_listener(self):
+        """リスナーを停止し、キューに残ったログを出力"""
+        if not self._listener_started:
+            return
+        self.listener.stop()
+        self._listener_started = False
     
     def get_logger(self, name: str) -> logging.Logger:
         """
@@ -127,6 +170,15 @@ def get_logger(name: str = 'kabu_system') -> logging.Logger:
     return _kabu_logger.get_logger(name)
 
 
+def start_log_listener() -> None:
+    """ログ設定を初期化し、バックグラウンドのログリスナーを開始"""
+    global _kabu_logger
+    
+    if _kabu_logger is None:
+        _kabu_logger = KabuLogger()
+    _kabu_logger.start_listener()
+
+
 def log_api_access(endpoint: str, method: str, status_code: int, 
                   execution_time: float, user_id: Optional[str] = None):
     """
@@ -166,6 +218,8 @@ def log_database_operation(operation: str, table: str, record_id: Optional[int]
         error: エラーメッセージ
     """
     logger = get_logger('database')
+    if not logger.isEnabledFor(logging.ERROR if error else logging.INFO):
+        return
     
     log_message = f"{operation} {table}"
     if record_id:
@@ -0,0 +1,39 @@
+"""
+外部APIへのリクエスト流量制限ユーティリティ
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """トークンバケット方式の流量制限（複数スレッドから共有して使う）"""
+    
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        初期化
+        
+        Args:
+            rate: 1秒あたりに補充するトークン数（0以下の場合は制限しない）
+            burst: 連続して送れるリクエスト数の上限（省略時は1秒分）
+        """
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """トークンを1つ取得（無い場合は補充されるまで待機）"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,111 @@
+"""
+価格統計の非同期更新ユーティリティ
+
+株価登録APIのレスポンスを待たせないよう、価格統計（当月・当年・全期間）の再計算を
+バックグラウンドの1スレッドで順に実行する。書き込み接続は1つのため、消費側を
+1スレッドに限定して書き込みの競合を避ける。
+予約から計算までは短い待機時間を置き、その間に届いた同じ期間の更新を1回の再計算にまとめる。
+"""
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional, Set, Tuple
+from backend.models.database import db_manager, price_statistics_model
+
+logger = logging.getLogger(__name__)
+
+StatisticsKey = Tuple[int, str, str]
+
+# 予約から再計算までの待機時間（秒）
+COALESCE_SECONDS = 2.0
+
+
+class StatisticsUpdateQueue:
+    """
+    価格統計の更新キュー
+
+    同じ (企業ID, 期間タイプ, 期間) の更新が処理待ちの間に何度要求されても1回にまとめる。
+    """
+
+    def __init__(self, coalesce_seconds: float = COALESCE_SECONDS):
+        """
+        初期化
+
+        Args:
+            coalesce_seconds: 予約から再計算までの待機時間（秒）
+        """
+        self.coalesce_seconds = coalesce_seconds
+        # (再計算を開始できる時刻, 更新キー) を予約順に保持する
+        self._queue: "queue.Queue[Tuple[float, StatisticsKey]]" = queue.Queue()
+        self._pending: Set[StatisticsKey] = set()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        # キューが空になった時に呼ぶ処理（レスポンスキャッシュの破棄など）
+        self.on_drained: Optional[Callable[[], None]] = None
+
+    def schedule(self, company_id: int, price_date=None) -> None:
+        """
+        株価日を含む月・年と全期間の統計更新を予約
+
+        Args:
+            company_id: 企業ID
+            price_date: 株価日（'YYYY-MM-DD' 形式またはdate、省略時は今日）
+        """
+        if price_date is None:
+            price_date = datetime.now().date()
+        current_month = str(price_date)[:7]
+        keys = (
+            (company_id, 'monthly', current_month),
+            (company_id, 'yearly', current_month[:4]),
+            (company_id, 'all_time', 'all'),
+        )
+
+        ready_at = time.monotonic() + self.coalesce_seconds
+        with self._lock:
+            for key in keys:
+                if key not in self._pending:
+                    self._pending.add(key)
+                    self._queue.put((ready_at, key))
+            self._ensure_worker()
+
+    def join(self) -> None:
+        """予約済みの更新がすべて終わるまで待機"""
+        self._queue.join()
+
+    def _ensure_worker(self) -> None:
+        """消費スレッドを起動（初回のみ）"""
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name='statistics-updater', daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        """キューから取り出した統計を順に再計算"""
+        while True:
+            ready_at, key = self._queue.get()
+            # 予約順に取り出すため、先頭の待機が終われば後続も順に開始時刻を迎える
+            wait = ready_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with self._lock:
+                # 処理中に届いた同じ更新は再度キューに入るよう、計算前に処理待ちから外す
+                self._pending.discard(key)
+            try:
+                # 読み取りと書き込みを1トランザクションで行い、確定済みの株価で計算する
+                with db_manager.transaction():
+                    price_statistics_model.update_statistics(*key)
+            except Exception:
+                logger.exception(f"価格統計の更新に失敗しました: {key}")
+            finally:
+                self._queue.task_done()
+
+            if self._queue.empty() and self.on_drained is not None:
+                try:
+                    self.on_drained()
+                except Exception:
+                    logger.exception("価格統計更新後の処理に失敗しました")
+
+
+# 価格統計の更新キュー
+statistics_queue = StatisticsUpdateQueue()
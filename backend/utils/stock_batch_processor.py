@@ -4,13 +4,12 @@
 """
 
 import logging
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
 from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime, timedelta
-import sys
-import os
-
-# パスの設定
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from backend.utils.stock_data_fetcher import StockDataFetcher
 from backend.models.database import (
@@ -23,25 +22,40 @@ logger = logging.getLogger(__name__)
 class StockBatchProcessor:
     """株価データ一括処理クラス"""
     
+    # 並列に処理する企業数の上限（リクエスト数はフェッチャー側の流量制限で抑える）
+    MAX_WORKERS = 8
+    
     def __init__(self):
         self.fetcher = StockDataFetcher()
         self.success_count = 0
         self.error_count = 0
         self.skip_count = 0
         self.processing_results = []
+        self._count_lock = threading.Lock()
+        # 一括処理中の企業ごとの最新株価日（process_companies の間だけ保持）
+        self._latest_dates: Optional[Dict[int, str]] = None
+    
+    def _count(self, status: str):
+        """処理結果の件数を加算（複数スレッドから呼ばれるためロックする）"""
+        with self._count_lock:
+            if status == 'success':
+                self.success_count += 1
+            elif status == 'error':
+                self.error_count += 1
+            else:
+                self.skip_count += 1
     
-    def get_all_companies(self) -> List[Dict[str, Any]]:
+    def get_all_companies(self) -> List[sqlite3.Row]:
         """
         データベースから全ての登録済み企業を取得
         
         Returns:
-            List[Dict]: 企業情報のリスト
+            List[sqlite3.Row]: 企業情報のリスト（辞書に変換せず行のまま返す）
         """
         try:
             companies = company_model.search()
-            company_list = [dict(company) for company in companies]
-            logger.info(f"登録済み企業数: {len(company_list)}")
-            return company_list
+            logger.info(f"登録済み企業数: {len(companies)}")
+            return companies
         except Exception as e:
             logger.error(f"企業一覧取得エラー: {str(e)}")
             return []
@@ -58,16 +72,20 @@ class StockBatchProcessor:
             bool: 更新が必要な場合True
         """
         try:
-            # 最新の株価データを確認
-            latest_price = stock_price_model.get_latest_price(company_id)
+            # 最新の株価日を確認（一括処理中はまとめて取得済みの値を使う）
+            if self._latest_dates is not None:
+                latest_date = self._latest_dates.get(company_id)
+            else:
+                latest_price = stock_price_model.get_latest_price(company_id)
+                latest_date = latest_price['price_date'] if latest_price else None
             
-            if not latest_price:
+            if not latest_date:
                 return True  # データが存在しない場合は更新
             
-            last_update = datetime.fromisoformat(latest_price['price_date'])
-            cutoff_date = datetime.now() - timedelta(days=last_update_days)
+            # price_dateはISO形式（YYYY-MM-DD...）のため、日付部分の文字列比較で判定する
+            cutoff_date = (datetime.now() - timedelta(days=last_update_days)).date().isoformat()
             
-            return last_update.date() < cutoff_date.date()
+            return str(latest_date)[:10] < cutoff_date
             
         except Exception as e:
             logger.warning(f"更新判定エラー（company_id={company_id}）: {str(e)}")
@@ -103,7 +121,7 @@ class StockBatchProcessor:
                     'status': 'skipped',
                     'message': '最新データが既に存在'
                 })
-                self.skip_count += 1
+                self._count('skipped')
                 return result
             
             # 外部APIからデータ取得
@@ -114,7 +132,7 @@ class StockBatchProcessor:
                     'status': 'error',
                     'message': '外部APIからデータを取得できませんでした'
                 })
-                self.error_count += 1
+                self._count('error')
                 return result
             
             # データの妥当性チェック
@@ -123,29 +141,31 @@ class StockBatchProcessor:
                     'status': 'error',
                     'message': '取得したデータが無効です'
                 })
-                self.error_count += 1
+                self._count('error')
                 return result
             
-            # 株価データの更新
-            stock_result = self._update_stock_price(company_id, stock_data)
-            if stock_result['success']:
-                result['data_updated'] = True
-            else:
-                result['errors'].append(f"株価更新エラー: {stock_result['message']}")
-            
-            # 財務指標の更新
-            financial_result = self._update_financial_metrics(company_id, stock_data)
-            if financial_result['success']:
-                result['data_updated'] = True
-            else:
-                result['errors'].append(f"財務指標更新エラー: {financial_result['message']}")
-            
-            # 価格統計の更新
-            self._update_price_statistics(company_id)
-            
-            # 企業情報の更新（sector, marketが取得できた場合）
-            if stock_data.get('sector') or stock_data.get('market'):
-                self._update_company_info(company_id, stock_data)
+            # DB更新は1トランザクションにまとめる（COMMITは1回）
+            with db_manager.transaction():
+                # 株価データの更新
+                stock_result = self._update_stock_price(company_id, stock_data)
+                if stock_result['success']:
+                    result['data_updated'] = True
+                else:
+                    result['errors'].append(f"株価更新エラー: {stock_result['message']}")
+                
+                # 財務指標の更新
+                financial_result = self._update_financial_metrics(company_id, stock_data)
+                if financial_result['success']:
+                    result['data_updated'] = True
+                else:
+                    result['errors'].append(f"財務指標更新エラー: {financial_result['message']}")
+                
+                # 価格統計の更新
+                self._update_price_statistics(company_id)
+                
+                # 企業情報の更新（sector, marketが取得できた場合）
+                if stock_data.get('sector') or stock_data.get('market'):
+                    self._update_company_info(company_id, stock_data)
             
             result.update({
                 'status': 'success',
@@ -153,14 +173,14 @@ class StockBatchProcessor:
                 'latest_price': stock_data['price'],
                 'price_date': stock_data['price_date']
             })
-            self.success_count += 1
+            self._count('success')
             
         except Exception as e:
             result.update({
                 'status': 'error',
                 'message': f'処理エラー: {str(e)}'
             })
-            self.error_count += 1
+            self._count('error')
             logger.error(f"企業データ処理エラー（{symbol}）: {str(e)}")
         
         return result
@@ -241,7 +261,7 @@ class StockBatchProcessor:
         """価格統計を更新"""
         try:
             current_month = datetime.now().strftime('%Y-%m')
-            current_year = datetime.now().strftime('%Y')
+            current_year = current_month[:4]
             
             price_statistics_model.update_statistics(company_id, 'monthly', current_month)
             price_statistics_model.update_statistics(company_id, 'yearly', current_year)
@@ -267,6 +287,44 @@ class StockBatchProcessor:
         except Exception as e:
             logger.warning(f"企業情報更新エラー（company_id={company_id}）: {str(e)}")
     
+    def process_companies(self, companies: List[Dict[str, Any]], force_update: bool = False) -> List[Dict[str, Any]]:
+        """
+        複数企業のデータをスレッドプールで並列に処理
+        
+        Args:
+            companies (List[Dict]): 企業情報のリスト
+            force_update (bool): 強制更新フラグ
+            
+        Returns:
+            List[Dict]: 処理結果のリスト（companiesと同じ順序）
+        """
+        if not companies:
+            return []
+        
+        total = len(companies)
+        completed = count(1)
+        
+        def process(company: Dict[str, Any]) -> Dict[str, Any]:
+            logger.info(f"処理中: {company['symbol']} - {company['name']}")
+            result = self.process_company_data(company, force_update)
+            
+            # 進捗ログ
+            done = next(completed)
+            if done % 10 == 0:
+                logger.info(f"進捗: {done}/{total} 完了 "
+                           f"(成功:{self.success_count}, エラー:{self.error_count}, スキップ:{self.skip_count})")
+            return result
+        
+        # 更新判定用の最新株価日を全企業分まとめて取得（各企業の処理は1回のみのため処理中も有効）
+        if not force_update:
+            self._latest_dates = stock_price_model.get_latest_price_dates()
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, total)) as executor:
+                return list(executor.map(process, companies))
+        finally:
+            # 処理後は株価が更新されているため破棄する
+            self._latest_dates = None
+    
     def process_all_companies(self, force_update: bool = False, max_companies: Optional[int] = None) -> Dict[str, Any]:
         """
         全ての登録済み企業の株価データを一括処理
@@ -302,17 +360,8 @@ class StockBatchProcessor:
         
         logger.info(f"株価データ一括処理開始: {len(companies)}社")
         
-        # 各企業を処理
-        for i, company in enumerate(companies):
-            logger.info(f"処理中 ({i+1}/{len(companies)}): {company['symbol']} - {company['name']}")
-            
-            result = self.process_company_data(company, force_update)
-            self.processing_results.append(result)
-            
-            # 進捗ログ
-            if (i + 1) % 10 == 0:
-                logger.info(f"進捗: {i+1}/{len(companies)} 完了 "
-                           f"(成功:{self.success_count}, エラー:{self.error_count}, スキップ:{self.skip_count})")
+        # 各企業を並列に処理（外部APIの応答待ちを重ねる）
+        self.processing_results = self.process_companies(companies, force_update)
         
         end_time = datetime.now()
         processing_time = (end_time - start_time).total_seconds()
@@ -5,26 +5,45 @@
 
 import yfinance as yf
 import logging
+import os
+import threading
 from typing import Dict, Optional, Any, List
 from datetime import datetime, timedelta
 import requests
 from time import sleep
 import random
 
+from backend.utils.rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
+# yfinance（Yahoo Finance）への1秒あたりのリクエスト数の上限（全フェッチャー・全スレッド合計、0以下で無制限）
+YFINANCE_REQUESTS_PER_SECOND = float(os.getenv('YFINANCE_REQUESTS_PER_SECOND', 2))
+
+# 一括処理の並列取得でYahoo側のレート制限（429）を受けないよう、全スレッドで共有する
+request_limiter = RateLimiter(YFINANCE_REQUESTS_PER_SECOND)
+
 class StockDataFetcher:
     """株価・財務データ取得クラス"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        # 一括処理では複数スレッドから同時に呼ばれるため、セッションはスレッドごとに持つ
+        self._local = threading.local()
         self.rate_limit_delay = 2  # APIコール間の待機時間（秒）
         self.max_retries = 3  # 最大リトライ回数
         self.retry_delays = [2, 5, 10]  # リトライ間隔（秒）
     
+    @property
+    def session(self) -> requests.Session:
+        """スレッドごとのHTTPセッション（requests.Sessionはスレッド間で共有しない）"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            })
+        return session
+    
     def _format_jp_symbol(self, symbol: str) -> str:
         """日本株式コードをyfinance形式に変換"""
         # 4桁の株式コードに'.T'（東証）を付加
@@ -61,6 +80,7 @@ class StockDataFetcher:
                 ticker = yf.Ticker(formatted_symbol)
                 
                 # 基本情報の取得
+                request_limiter.acquire()
                 info = ticker.info
                 if not info or len(info) < 3:  # 空のレスポンスチェックを改善
                     if attempt < self.max_retries:
@@ -71,6 +91,7 @@ class StockDataFetcher:
                         return None
                 
                 # 最新の株価データを取得（過去5日分）
+                request_limiter.acquire()
                 hist = ticker.history(period="5d")
                 if hist.empty:
                     if attempt < self.max_retries:
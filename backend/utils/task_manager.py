@@ -0,0 +1,142 @@
+"""
+バックグラウンドタスク管理ユーティリティ
+
+全企業の一括取得など時間のかかる処理をリクエストから切り離して実行し、
+クライアントはタスクIDで進捗（完了・失敗）を問い合わせる。
+"""
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from backend.models.database import db_manager
+from backend.utils.cache import json_default
+
+logger = logging.getLogger(__name__)
+
+# タスク状態の保存先（件数上限のあるレスポンスキャッシュとは分け、期限切れまで保持する）
+TASK_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS background_tasks (
+        task_id TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """
+
+TASK_SAVE_QUERY = """
+    INSERT INTO background_tasks (task_id, state, expires_at) VALUES (?, ?, ?)
+    ON CONFLICT(task_id) DO UPDATE SET state = excluded.state, expires_at = excluded.expires_at
+    """
+
+TASK_GET_QUERY = "SELECT state FROM background_tasks WHERE task_id = ? AND expires_at >= ?"
+
+TASK_PURGE_QUERY = "DELETE FROM background_tasks WHERE expires_at < ?"
+
+
+def _state_default(value: Any) -> Any:
+    """タスク状態のJSON変換（sqlite3.Rowは辞書、日付などその他の値は文字列で保存）"""
+    try:
+        return json_default(value)
+    except TypeError:
+        return str(value)
+
+
+class TaskManager:
+    """
+    バックグラウンドタスクの実行と状態管理
+
+    状態はデータベースのテーブルに保存するため、複数のgunicornワーカー間で
+    同じタスクIDを参照でき、他のキャッシュ項目に押し出されることもない。
+    """
+
+    def __init__(self, max_workers: int = 2, ttl: float = 3600.0):
+        """
+        初期化
+
+        Args:
+            max_workers: 同時に実行するタスク数の上限
+            ttl: タスク状態の保持期間（秒）
+        """
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='task')
+        self._table_ready = False
+        self._table_lock = threading.Lock()
+
+    def submit(self, name: str, func: Callable[..., Any], *args, **kwargs) -> str:
+        """
+        タスクを登録してバックグラウンドで実行
+
+        Args:
+            name: タスク名（状態の表示用）
+            func: 実行する関数（戻り値はJSONシリアライズ可能なもの）
+
+        Returns:
+            str: タスクID
+        """
+        self._ensure_table()
+        # 期限切れのタスク状態は登録のついでに削除する
+        db_manager.execute_update(TASK_PURGE_QUERY, (time.time(),))
+
+        task_id = uuid.uuid4().hex
+        self._save(task_id, {
+            'task_id': task_id,
+            'name': name,
+            'status': 'pending',
+            'created_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'result': None,
+            'error': None
+        })
+        self._executor.submit(self._run, task_id, func, args, kwargs)
+        return task_id
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        タスクの状態を取得
+
+        Args:
+            task_id: タスクID
+
+        Returns:
+            Optional[Dict[str, Any]]: タスクの状態（見つからない・期限切れの場合はNone）
+        """
+        self._ensure_table()
+        rows = db_manager.execute_query_fast(TASK_GET_QUERY, (task_id, time.time()))
+        return json.loads(rows[0][0]) if rows else None
+
+    def _run(self, task_id: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        """タスクを実行して結果を保存"""
+        state = self.get(task_id) or {'task_id': task_id}
+        state['status'] = 'running'
+        self._save(task_id, state)
+        try:
+            state['result'] = func(*args, **kwargs)
+            state['status'] = 'completed'
+        except Exception as e:
+            logger.exception(f"バックグラウンドタスクの実行に失敗しました: {task_id}")
+            state['error'] = str(e)
+            state['status'] = 'failed'
+        state['finished_at'] = datetime.now().isoformat()
+        self._save(task_id, state)
+
+    def _save(self, task_id: str, state: Dict[str, Any]) -> None:
+        """タスクの状態を保存"""
+        db_manager.execute_update(TASK_SAVE_QUERY, (
+            task_id, json.dumps(state, ensure_ascii=False, default=_state_default), time.time() + self.ttl
+        ))
+
+    def _ensure_table(self) -> None:
+        """タスク状態のテーブルを作成（プロセスごとに初回のみ）"""
+        if self._table_ready:
+            return
+        with self._table_lock:
+            if not self._table_ready:
+                db_manager.execute_update(TASK_TABLE_QUERY)
+                self._table_ready = True
+
+
+# バックグラウンドタスク管理
+task_manager = TaskManager()
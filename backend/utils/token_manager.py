@@ -10,7 +10,9 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from pathlib import Path
 import sqlite3
-from typing import List
+from contextlib import contextmanager
+from typing import Iterator, List
+from backend.utils.database_utils import CONNECTION_PRAGMAS
 
 logger = logging.getLogger(__name__)
 
@@ -22,13 +24,30 @@ class JQuantsTokenManager:
         self.token_table = 'jquants_tokens'
         self._initialize_db()
     
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        トークン管理DBへの接続を取得
+        
+        WAL・busy_timeoutを設定し、並列処理中の同時アクセスでも即座にロックエラーにしない。
+        ブロックを正常に抜けるとCOMMIT、例外時はROLLBACKし、接続は必ず閉じる。
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+    
     def _initialize_db(self):
         """トークン管理用データベースを初期化"""
         try:
             # ディレクトリが存在しない場合は作成
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute(f'''
                     CREATE TABLE IF NOT EXISTS {self.token_table} (
@@ -64,7 +83,7 @@ class JQuantsTokenManager:
             # 有効期限を計算（1週間後）
             expires_at = datetime.now() + timedelta(days=7)
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # 既存のトークンを無効化
@@ -101,7 +120,7 @@ class JQuantsTokenManager:
             Optional[Dict]: トークン情報、見つからない場合はNone
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row  # 辞書形式で結果を取得
                 cursor = conn.cursor()
                 
@@ -205,7 +224,7 @@ class JQuantsTokenManager:
     def get_all_tokens(self) -> List[Dict[str, Any]]:
         """全てのトークン情報を取得（管理用）"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
@@ -234,7 +253,7 @@ class JQuantsTokenManager:
     def cleanup_expired_tokens(self) -> int:
         """期限切れトークンのクリーンアップ"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 # 30日以上前に期限切れになったトークンを削除
@@ -259,7 +278,7 @@ class JQuantsTokenManager:
     def invalidate_token(self, user_identifier: str = 'default') -> bool:
         """トークンを無効化"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute(f'''
@@ -25,6 +25,12 @@ class Config:
     # エクスポート設定
     EXPORT_DIRECTORY = 'jsonfile'
     
+    # キャッシュ設定（未設定時はプロセス内キャッシュのみ）
+    REDIS_URL = os.environ.get('REDIS_URL')
+    
+    # gunicornのワーカー数（gunicorn.conf.pyと同じ既定値。2以上の場合プロセス内キャッシュは使わない）
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 4 if REDIS_URL else 1))
+    
     # デバッグ設定
     DEBUG = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
     
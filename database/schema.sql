@@ -71,11 +71,14 @@ CREATE TABLE IF NOT EXISTS technical_indicators (
 );
 
 -- インデックス作成（パフォーマンス向上）
-CREATE INDEX IF NOT EXISTS idx_companies_symbol ON companies(symbol);
-CREATE INDEX IF NOT EXISTS idx_stock_prices_company_date ON stock_prices(company_id, price_date DESC);
-CREATE INDEX IF NOT EXISTS idx_financial_metrics_company_date ON financial_metrics(company_id, report_date DESC);
-CREATE INDEX IF NOT EXISTS idx_price_statistics_company_period ON price_statistics(company_id, period_type, period_value);
-CREATE INDEX IF NOT EXISTS idx_technical_indicators_company_date ON technical_indicators(company_id, indicator_date DESC);
+-- companies.symbol は UNIQUE 制約の自動インデックスで検索されるため個別のインデックスは作らない
+-- 最新株価の取得がテーブル本体を読まずに済むよう価格・出来高を含めたカバリングインデックス
+-- 価格統計の月間・年間集計も price_date の範囲条件でこのインデックスのみを走査する
+-- （年月の生成列は不要。strftime()で列を加工すると使われなくなるため範囲条件で書くこと）
+CREATE INDEX IF NOT EXISTS idx_stock_prices_company_date_covering ON stock_prices(company_id, price_date DESC, price, volume);
+-- price_statistics の (company_id, period_type, period_value) も UNIQUE 制約の自動インデックスで検索される
+-- financial_metrics・technical_indicators の (company_id, 日付) の検索・最新行の取得も
+-- UNIQUE(company_id, 日付) の自動インデックス（逆順走査）で処理されるため個別のインデックスは作らない
 
 -- トリガー：updated_atの自動更新
 CREATE TRIGGER IF NOT EXISTS update_companies_updated_at 
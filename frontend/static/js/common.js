@@ -71,20 +71,14 @@ function exportData() {
             if (data.success) {
                 showAlert(data.message, 'success');
                 
-                // ダウンロードリンクを作成（オプション）
-                if (data.export_data) {
-                    const dataStr = JSON.stringify(data.export_data, null, 2);
-                    const dataBlob = new Blob([dataStr], {type: 'application/json'});
-                    const url = URL.createObjectURL(dataBlob);
-                    
+                // エクスポートファイルをサーバーから直接ダウンロード
+                if (data.download_url) {
                     const downloadLink = document.createElement('a');
-                    downloadLink.href = url;
-                    downloadLink.download = data.filename || 'kabu_data_export.json';
+                    downloadLink.href = data.download_url;
+                    downloadLink.download = data.filename;
                     document.body.appendChild(downloadLink);
                     downloadLink.click();
                     document.body.removeChild(downloadLink);
-                    
-                    URL.revokeObjectURL(url);
                 }
             } else {
                 showAlert('エクスポートに失敗しました: ' + data.error, 'danger');
@@ -59,7 +59,7 @@ async function loadCompanies() {
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({})  // 空で全件検索
+            body: JSON.stringify({ include_details: true })  // 条件なしで全件検索（詳細付き）
         });
         const result = await response.json();
         
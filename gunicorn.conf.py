@@ -0,0 +1,23 @@
+"""
+gunicorn設定（`gunicorn app:app` 実行時にカレントディレクトリから自動で読み込まれる）
+
+株価・J-Quantsの取得APIは外部HTTPの応答待ちが大半を占めるため、
+geventワーカーで1プロセスあたり多数のリクエストを同時に処理する。
+geventワーカーは起動時にmonkey patchを適用するため、requests/yfinanceの通信も協調的に待機する。
+"""
+import os
+
+try:
+    import gevent  # noqa: F401
+    worker_class = 'gevent'
+except ImportError:  # gevent未導入の環境ではスレッドワーカーで代替
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+# キャッシュはREDIS_URL未設定時はプロセス内のみでワーカー間で共有できないため、既定は1ワーカー
+workers = int(os.environ.get('WEB_CONCURRENCY', 4 if os.environ.get('REDIS_URL') else 1))
+# 1ワーカーあたりの同時接続数（geventワーカーのみ有効）
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+# 全企業の一括取得など長時間のリクエストで切断されないよう余裕を持たせる
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
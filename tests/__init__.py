@@ -0,0 +1,15 @@
+"""
+テスト共通設定
+
+モデル層の db_manager はインポート時の DATABASE_PATH で作成されるため、
+backend をインポートする前に一時ディレクトリのデータベースを指定する。
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+TEST_DATA_DIR = tempfile.mkdtemp(prefix='kabu_test_')
+atexit.register(shutil.rmtree, TEST_DATA_DIR, ignore_errors=True)
+os.environ['DATABASE_PATH'] = os.path.join(TEST_DATA_DIR, 'kabu_system.db')
+os.environ.setdefault('FLASK_ENV', 'development')
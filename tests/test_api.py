@@ -0,0 +1,122 @@
+"""
+APIルートのテスト（Flaskが無い環境ではスキップ）
+
+実行: python -m unittest discover tests
+"""
+import importlib.util
+import unittest
+from unittest import mock
+
+from tests import TEST_DATA_DIR  # noqa: F401（DATABASE_PATHを一時ディレクトリに設定する）
+
+HAS_FLASK = importlib.util.find_spec('flask') is not None
+
+
+class FakeBatchProcessor:
+    """外部APIに接続せず、受け取った企業を成功として返す一括処理"""
+
+    def __init__(self, *args, **kwargs):
+        self.processed = []
+
+    def process_companies(self, companies, force_update=False, date=None):
+        self.processed.extend(companies)
+        return [{'symbol': company['symbol'], 'status': 'success'} for company in companies]
+
+
+@unittest.skipUnless(HAS_FLASK, 'Flaskが未インストール')
+class ApiTestCase(unittest.TestCase):
+    """スキーマ（サンプル企業を含む）で初期化したデータベースに対するAPIテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        from backend.utils.database_utils import init_database
+        from backend.app_factory import create_app
+
+        init_database()
+        cls.app = create_app()
+        cls.client = cls.app.test_client()
+
+    def _registered_symbol(self) -> str:
+        """登録済み（数字のみ）の企業コードを1つ取得"""
+        from backend.models.database import company_model
+
+        symbols = [row['symbol'] for row in company_model.search() if row['symbol'].isdigit()]
+        self.assertTrue(symbols, 'スキーマに数字の企業コードがありません')
+        return symbols[0]
+
+
+class FetchSymbolsTest(ApiTestCase):
+    """株価データ取得APIの企業コード指定"""
+
+    def _post_symbols(self, path: str, processor_name: str, symbols: list):
+        processor = FakeBatchProcessor()
+        with mock.patch(f'backend.routes.api.{processor_name}', return_value=processor):
+            response = self.client.post(path, json={'symbols': symbols})
+        return response, processor
+
+    def test_stock_fetch_accepts_integer_symbols(self):
+        symbol = self._registered_symbol()
+        response, processor = self._post_symbols('/api/stock-data/fetch', 'StockBatchProcessor', [int(symbol)])
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['summary']['found_companies'], 1)
+        self.assertEqual(body['summary']['error'], 0)
+        self.assertEqual([company['symbol'] for company in processor.processed], [symbol])
+
+    def test_jquants_fetch_accepts_integer_symbols(self):
+        symbol = self._registered_symbol()
+        response, processor = self._post_symbols('/api/jquants-data/fetch', 'JQuantsBatchProcessor', [int(symbol)])
+
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['summary']['found_companies'], 1)
+        self.assertEqual([company['symbol'] for company in processor.processed], [symbol])
+
+    def test_unknown_symbol_is_reported(self):
+        response, processor = self._post_symbols('/api/stock-data/fetch', 'StockBatchProcessor', [99999999])
+
+        body = response.get_json()
+        self.assertEqual(body['summary']['found_companies'], 0)
+        self.assertEqual(body['details'][0]['symbol'], '99999999')
+        self.assertEqual(body['details'][0]['status'], 'error')
+        self.assertEqual(processor.processed, [])
+
+
+
+class CompanyPaginationTest(ApiTestCase):
+    """企業一覧のページ番号指定（?page=&per_page=）"""
+
+    def test_pages_follow_symbol_order(self):
+        from backend.models.database import company_model
+
+        symbols = [row['symbol'] for row in company_model.search()]
+        per_page = 2
+        collected = []
+        for page in range(1, (len(symbols) + per_page - 1) // per_page + 1):
+            response = self.client.get(f'/api/companies?page={page}&per_page={per_page}')
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            pagination = body['pagination']
+            self.assertEqual(pagination['total'], len(symbols))
+            self.assertEqual(pagination['page'], page)
+            self.assertEqual(pagination['has_prev'], page > 1)
+            self.assertEqual(pagination['has_next'], page * per_page < len(symbols))
+            collected.extend(company['symbol'] for company in body['data'])
+        self.assertEqual(collected, symbols)
+
+    def test_page_past_end_is_empty(self):
+        response = self.client.get('/api/companies?page=1000&per_page=10')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data'], [])
+
+    def test_invalid_page_is_rejected(self):
+        response = self.client.get('/api/companies?page=0')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()